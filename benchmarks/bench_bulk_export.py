@@ -0,0 +1,68 @@
+"""
+    Measures Export All: the graphs and logs of N devices written one after the other on one
+    thread, the way repeated Save Graph / Save Log calls would, vs. the background ExportWorker
+    rendering the graphs in a process pool. No simulators needed.
+
+    Usage: python benchmarks/bench_bulk_export.py [--devices N] [--samples N] [--processes N]
+
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import numpy as np
+
+from bulk_export import ExportWorker, render_graph, write_log
+
+
+def make_jobs(directory, devices, samples):
+    rng = np.random.default_rng(0)
+    graphs = []
+    logs = []
+    for n in range(devices):
+        serial = f"SN{n:04d}"
+        time_ms = np.arange(samples, dtype=np.int64) * 10
+        mv = 4500 + np.cumsum(rng.normal(0, 1, samples))
+        ma = 100 + rng.normal(0, 5, samples)
+        graphs.append((os.path.join(directory, f"graph_{serial}.png"), f"Live Test Data for {serial}", (time_ms, mv, ma)))
+        logs.append((os.path.join(directory, f"log_{serial}.txt"), [f"STATUS;TIME={t};MV=4500.0;MA=100.0;" for t in range(0, 10 * samples, 10)]))
+    return graphs, logs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--devices", type=int, default=50)
+    parser.add_argument("--samples", type=int, default=100000)
+    parser.add_argument("--processes", type=int, default=None, help="rendering processes (default: one per core)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        graphs, logs = make_jobs(directory, args.devices, args.samples)
+
+        start = time.perf_counter()
+        for job in graphs:
+            render_graph(*job)
+        for job in logs:
+            write_log(*job)
+        serial_s = time.perf_counter() - start
+
+        worker = ExportWorker(graphs, logs, args.processes)
+        result = {}
+        worker.finished_signal.connect(lambda written, errors: result.update(written=written, errors=errors))
+        start = time.perf_counter()
+        worker.run()
+        pool_s = time.perf_counter() - start
+
+    print(f"{args.devices} devices x {args.samples} samples, {os.cpu_count()} CPU core(s)")
+    print(f"  one after the other: {serial_s:6.2f} s ({serial_s / args.devices * 1000:.0f} ms per device)")
+    print(f"  ExportWorker ({worker.processes} processes): {pool_s:6.2f} s, {result['written']} files, "
+          f"{len(result['errors'])} errors")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+    End-to-end fleet benchmark: discovery and concurrent tests against N device_sim instances.
+
+    Launches N simulators with distinct serials and --deterministic, discovers them through
+    DeviceManager and runs one test per device at every requested rate through DeviceWorker,
+    with the worker signals delivered to a Qt event loop on the main thread like in the GUI.
+    Reports samples/s, dropped samples, arrival-to-handler latency percentiles, CPU time per
+    device and peak RSS, and writes them to a JSON file for comparison between releases.
+
+    The "shards" mode runs the tests in --shards processes through a ShardPool; the CPU time of
+    the shard processes is reported separately from the CPU time of this (the GUI) process.
+
+    Usage: python benchmarks/bench_fleet.py [--devices N] [--rates MS,MS,...] [--duration S]
+                                            [--modes engine,threads,shards] [--shards N] [--output FILE]
+
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import sys
+import threading
+import time
+
+import numpy as np
+from PyQt5.QtCore import QCoreApplication, QEventLoop, QTimer
+
+from sim_fleet import SimFleet
+import constants
+from device_worker import DeviceWorker
+from receive_engine import ReceiveEngine
+from shard_pool import ShardPool, ShardedWorker
+
+
+class DeviceStats:
+    """
+        Samples and delivery latencies seen by the main-thread handlers for one device.
+
+    """
+
+    def __init__(self):
+        self.samples = 0
+        self.latencies = []
+
+    def add_block(self, block):
+        # a block is handed over batch_interval after its first message, plus the queueing delay
+        self.latencies.append(time.perf_counter() - block.first_arrival)
+        self.samples += len(block)
+
+    def add_sample(self, *_):
+        self.samples += 1
+
+
+def peak_rss_mb():
+    """
+        Returns the peak resident set size of this process so far, in MiB.
+
+    """
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 if sys.platform != "darwin" else peak / (1024 * 1024)
+
+
+def wait_until(predicate, deadline):
+    """
+        Runs the Qt event loop until predicate() is true or the deadline passes.
+
+        :param predicate (callable) Condition to wait for, checked every 50 ms.
+        :param deadline (float) time.perf_counter() value to give up at.
+
+    """
+
+    loop = QEventLoop()
+    timer = QTimer()
+    timer.timeout.connect(lambda: (predicate() or time.perf_counter() >= deadline) and loop.quit())
+    timer.start(50)
+    if not predicate():
+        loop.exec_()
+    timer.stop()
+
+
+def run_fleet(devices, duration, rate, mode, batch_ms, shards=1):
+    """
+        Runs one test per device at the same time and returns the measured numbers.
+
+        :param devices (list of Device) Devices to test.
+        :param duration (int) Test duration in seconds.
+        :param rate (int) Status rate in milliseconds.
+        :param mode (str) "engine" for the shared ReceiveEngine, "threads" for a thread per device,
+        "shards" for a ShardPool of `shards` processes.
+        :param batch_ms (int) Batch interval of the workers in milliseconds, 0 for per-message delivery.
+        :param shards (int) Number of shard processes in "shards" mode.
+
+    """
+
+    stats = {d.serial: DeviceStats() for d in devices}
+    finished = []
+    workers = []
+
+    pool = ShardPool(shards) if mode == "shards" else None
+    if pool is not None:
+        pool.start()
+        pool.ready.wait(30)    # the shard processes' startup is not part of the measurement
+
+    for device in devices:
+        if pool is not None:
+            worker = ShardedWorker(device, duration, rate, pool.ring(device.serial), batch_interval_ms=batch_ms)
+        else:
+            worker = DeviceWorker(device, duration=duration, rate=rate, batch_interval_ms=batch_ms)
+        s = stats[device.serial]
+        # connected without a connection type, so the handlers run queued on the main thread
+        worker.block_signal.connect(s.add_block)
+        worker.data_signal.connect(s.add_sample)
+        worker.finished_signal.connect(lambda serial=device.serial: finished.append(serial))
+        workers.append(worker)
+
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    children0 = resource.getrusage(resource.RUSAGE_CHILDREN)
+    engine = None
+    if pool is not None:
+        pool.submit_batch(workers)
+    elif mode == "engine":
+        engine = ReceiveEngine()
+        for worker in workers:
+            engine.submit(worker)
+    else:
+        for worker in workers:
+            threading.Thread(target=worker.start_test, daemon=True).start()
+
+    # a lost STATE=IDLE datagram would otherwise keep a worker waiting forever
+    wait_until(lambda: len(finished) == len(workers), wall0 + duration + 5)
+    wall = time.perf_counter() - wall0
+    unfinished = len(workers) - len(finished)
+    for worker in workers:
+        if worker.running:
+            worker.cancel()
+    wait_until(lambda: len(finished) == len(workers), time.perf_counter() + 2.5)
+    cpu = time.process_time() - cpu0
+
+    if engine is not None:
+        engine.shutdown()
+    shard_cpu = None
+    if pool is not None:
+        pool.shutdown()    # the shards' CPU time is only counted once they have exited
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        shard_cpu = (children.ru_utime + children.ru_stime) - (children0.ru_utime + children0.ru_stime)
+
+    expected = duration * 1000 // rate
+    received = sum(s.samples for s in stats.values())
+    dropped = sum(max(0, expected - s.samples) for s in stats.values())
+    latencies = np.array([lat for s in stats.values() for lat in s.latencies]) * 1000
+
+    def percentile(q):
+        return round(float(np.percentile(latencies, q)), 3) if len(latencies) else None
+
+    return {
+        "mode": mode,
+        "rate_ms": rate,
+        "batch_ms": batch_ms,
+        "devices": len(devices),
+        "duration_s": duration,
+        "samples_expected": expected * len(devices),
+        "samples_received": received,
+        "samples_dropped": dropped,
+        "drop_ratio": round(dropped / (expected * len(devices)), 6) if expected and devices else 0,
+        "samples_per_s": round(received / wall, 1),
+        "latency_ms": {"p50": percentile(50), "p90": percentile(90), "p99": percentile(99),
+                       "max": round(float(latencies.max()), 3) if len(latencies) else None},
+        "cpu_s": round(cpu, 3),
+        "cpu_ms_per_device": round(1000 * cpu / len(devices), 3) if devices else None,
+        "cpu_us_per_sample": round(1e6 * cpu / received, 3) if received else None,
+        "shards": shards if pool is not None else None,
+        "shard_cpu_s": round(shard_cpu, 3) if shard_cpu is not None else None,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "unfinished": unfinished,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--devices", type=int, default=20)
+    parser.add_argument("--rates", default="100,20,10", help="comma-separated status rates in ms")
+    parser.add_argument("--duration", type=int, default=5)
+    parser.add_argument("--modes", default="engine", help="comma-separated: engine, threads, shards")
+    parser.add_argument("--shards", type=int, default=os.cpu_count(), help="shard processes in shards mode")
+    parser.add_argument("--batch-ms", type=int, default=constants.BATCH_INTERVAL_MS,
+                        help="worker batch interval in ms, 0 for per-message delivery (no latency figures)")
+    parser.add_argument("--output", default="fleet_benchmark.json", help="JSON results file")
+    args = parser.parse_args()
+
+    rates = [int(r) for r in args.rates.split(',')]
+    modes = args.modes.split(',')
+    app = QCoreApplication(sys.argv[:1])
+
+    report = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "host": {"platform": platform.platform(), "python": platform.python_version(), "cpus": os.cpu_count()},
+        "args": vars(args),
+        "runs": [],
+    }
+
+    with SimFleet(args.devices) as fleet:
+        start = time.perf_counter()
+        devices = fleet.discover()
+        report["discovery"] = {"devices": args.devices, "found": len(devices),
+                               "seconds": round(time.perf_counter() - start, 3)}
+        print(f"discovered {len(devices)}/{args.devices} simulators in {report['discovery']['seconds']}s")
+
+        for rate in rates:
+            for mode in modes:
+                r = run_fleet(devices, args.duration, rate, mode, args.batch_ms, args.shards)
+                report["runs"].append(r)
+                lat = r["latency_ms"]
+                print(f"{mode:>8} @ {rate:>4}ms: {r['samples_per_s']:>9.0f} samples/s, "
+                      f"{r['samples_dropped']} dropped, latency p50 {lat['p50']} / p99 {lat['p99']} ms, "
+                      f"cpu {r['cpu_ms_per_device']} ms/device, rss {r['peak_rss_mb']} MiB")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {args.output}")
+    del app
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+    Measures the memory held by a device's log: every STATUS message kept as a string, as the
+    log used to store them, vs. LogBuffer's compact records. Also times filling the buffer from
+    worker blocks, rendering one screen of lines and rendering the whole log for saving.
+
+    Usage: python benchmarks/bench_log_buffer.py [--lines N]
+
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import numpy as np
+
+import status_parser
+from device_worker import SampleBlock
+from log_buffer import LogBuffer
+
+
+def make_blocks(lines, per_block=100):
+    """
+        Builds the SampleBlocks a worker would emit for a test of the given number of STATUS lines.
+
+    """
+
+    rng = np.random.default_rng(0)
+    mv = 4500 + np.cumsum(rng.normal(0, 15, lines))
+    ma = 100 + np.cumsum(rng.normal(0, 30, lines))
+    blocks = []
+    for start in range(0, lines, per_block):
+        block = SampleBlock()
+        for i in range(start, min(start + per_block, lines)):
+            data = f"STATUS;TIME={10 * (i + 1)};MV={mv[i]:.1f};MA={ma[i]:.1f};".encode('latin-1')
+            time_ms, v, a, fmt = status_parser.parse_record(data)
+            if not fmt:
+                block.text[len(block.log_formats)] = str(data, 'latin-1')
+            block.log_formats.append(fmt)
+            block.log_samples.append(len(block.time_ms))
+            block.time_ms.append(time_ms)
+            block.mv.append(v)
+            block.ma.append(a)
+        blocks.append(block)
+    return blocks
+
+
+def measure(fill):
+    tracemalloc.start()
+    log = fill()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return log, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1000000)
+    args = parser.parse_args()
+
+    blocks = make_blocks(args.lines)
+
+    def fill_strings():
+        lines = []
+        for block in blocks:
+            lines.extend(block.status_lines)    # renders the records, as a list of strings would hold them
+        return lines
+
+    def fill_records():
+        buffer = LogBuffer()
+        for block in blocks:
+            buffer.extend_block(block)
+        return buffer
+
+    strings, string_bytes = measure(fill_strings)
+    records, record_bytes = measure(fill_records)
+    start = time.perf_counter()
+    fill_records()    # timed without tracemalloc, which slows allocations down
+    fill_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    screen = records[-40:]
+    screen_ms = 1000 * (time.perf_counter() - start)
+    start = time.perf_counter()
+    text = '\n'.join(records)
+    save_s = time.perf_counter() - start
+    assert screen == strings[-40:] and text == '\n'.join(strings)
+
+    print(f"{args.lines} STATUS lines")
+    print(f"  strings:        {string_bytes / 1e6:8.1f} MB ({string_bytes / args.lines:.0f} bytes/line)")
+    print(f"  LogBuffer:      {record_bytes / 1e6:8.1f} MB ({record_bytes / args.lines:.0f} bytes/line), "
+          f"{string_bytes / record_bytes:.1f}x smaller")
+    print(f"  fill from blocks: {fill_s * 1e9 / args.lines:.0f} ns/line, render 40 lines: {screen_ms:.2f} ms, "
+          f"render all for saving: {save_s:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+    Measures the redraw cost of the live plot backends.
+
+    Feeds synthetic 10 ms samples of N devices into SampleStores, one frame at a time, and
+    redraws the main live plot plus one dashboard panel per device through every backend,
+    the way MainWindow and Dashboard do. Reports the mean and worst time per frame and the
+    frame rate that leaves for everything else. Runs offscreen, no simulators needed.
+
+    Usage: python benchmarks/bench_plot_backends.py [--devices N] [--seconds S] [--frame-ms MS]
+
+"""
+
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import numpy as np
+from PyQt5.QtWidgets import QApplication
+
+import plot_backends
+from dashboard import DevicePanel
+from downsample import MinMaxDecimator
+from sample_store import SampleStore
+
+
+def run_backend(name, devices, seconds, frame_ms, rate_ms=10):
+    """
+        Simulates seconds of live data at one frame per frame_ms and times the redraws.
+
+        :param name (str) Backend name.
+        :param devices (int) Number of devices, each with a dashboard panel.
+        :param seconds (float) Simulated test length.
+        :param frame_ms (int) Simulated frame interval.
+        :param rate_ms (int) Simulated status rate of the devices.
+
+    """
+
+    import constants
+    constants.PLOT_BACKEND = name
+
+    main = plot_backends.create_plot(name)
+    main.resize(1100, 300)
+    main.show()
+    panels = [DevicePanel(f"DEV{i:03d}") for i in range(devices)]
+    for panel in panels:
+        panel.resize(360, 180)
+        panel.show()
+    stores = [SampleStore() for _ in range(devices)]
+    mv_dec, ma_dec = MinMaxDecimator(), MinMaxDecimator()
+
+    per_frame = max(1, frame_ms // rate_ms)
+    frames = int(seconds * 1000 / frame_ms)
+    times = []
+    t = 0
+    for _ in range(frames):
+        new_t = np.arange(t + rate_ms, t + rate_ms * (per_frame + 1), rate_ms)
+        t = int(new_t[-1])
+        mv = 4400 + 100 * np.sin(new_t / 500)
+        ma = 100 * np.cos(new_t / 300)
+        for store in stores:
+            store.extend(new_t, mv, ma)
+
+        start = time.perf_counter()
+        # main plot, as MainWindow.set_plot_lines and rescale_plot do
+        store = stores[0]
+        time_ms, mv_vals, ma_vals = store.arrays()
+        width = main.plot_width()
+        if len(store) <= width:
+            mv_idx = ma_idx = slice(None)
+        else:
+            mv_dec.set_target(width)
+            ma_dec.set_target(width)
+            mv_idx = mv_dec.update(mv_vals, store.first_index) - store.first_index
+            ma_idx = ma_dec.update(ma_vals, store.first_index) - store.first_index
+        main.set_series(time_ms[mv_idx], mv_vals[mv_idx], time_ms[ma_idx], ma_vals[ma_idx])
+        main.set_limits(time_ms[0], time_ms[-1] * 1.25, 4250, 4550)
+        main.set_has_data(True)
+        main.draw()
+        for panel, store in zip(panels, stores):
+            panel.render(store)
+        times.append(time.perf_counter() - start)
+
+    times = np.array(times) * 1000
+    main.close()
+    for panel in panels:
+        panel.close()
+    return {"backend": name, "mean_ms": times.mean(), "max_ms": times.max(), "fps": 1000 / times.mean()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--devices", type=int, default=6)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--frame-ms", type=int, default=16)
+    parser.add_argument("--backends", default="qt,matplotlib", help="comma-separated backend names")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv[:1])
+    print(f"main plot + {args.devices} panels, {args.seconds}s of 10 ms samples, one redraw per {args.frame_ms} ms")
+    for name in args.backends.split(','):
+        r = run_backend(name, args.devices, args.seconds, args.frame_ms)
+        print(f"{r['backend']:>10}: {r['mean_ms']:.2f} ms per frame (max {r['max_ms']:.2f}), "
+              f"up to {r['fps']:.0f} fps")
+    del app
+
+
+if __name__ == "__main__":
+    main()
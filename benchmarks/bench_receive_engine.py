@@ -0,0 +1,98 @@
+"""
+    Compares the thread-per-device receive model against the shared ReceiveEngine.
+
+    Launches N device_sim instances, runs one test per device in each mode and reports
+    received samples, samples/s and the CPU time this process spent receiving them.
+
+    Usage: python benchmarks/bench_receive_engine.py [--devices N] [--duration S] [--rate MS]
+
+"""
+
+import argparse
+import threading
+import time
+
+from PyQt5.QtCore import Qt
+
+from sim_fleet import SimFleet
+from device_worker import DeviceWorker
+from receive_engine import ReceiveEngine
+
+
+def run_mode(mode, devices, duration, rate):
+    """
+        Runs one test per device in the given mode and returns the measured numbers.
+
+        :param mode (str) Either "threads" or "engine".
+        :param devices (list of Device) Devices to test.
+        :param duration (int) Test duration in seconds.
+        :param rate (int) Status rate in milliseconds.
+
+    """
+
+    counts = {d.serial: 0 for d in devices}
+    done = threading.Semaphore(0)
+    workers = []
+
+    for device in devices:
+        worker = DeviceWorker(device, duration=duration, rate=rate)
+        # no Qt event loop runs here, so slots are called directly in the receiving thread
+        worker.data_signal.connect(lambda t, mv, ma, s=device.serial: counts.__setitem__(s, counts[s] + 1),
+                                   Qt.DirectConnection)
+        worker.finished_signal.connect(done.release, Qt.DirectConnection)
+        workers.append(worker)
+
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    if mode == "engine":
+        engine = ReceiveEngine()
+        for worker in workers:
+            engine.submit(worker)
+    else:
+        for worker in workers:
+            threading.Thread(target=worker.start_test, daemon=True).start()
+
+    # a lost STATE=IDLE datagram would otherwise keep a worker waiting forever
+    deadline = wall0 + duration + 5
+    finished = 0
+    while finished < len(workers) and done.acquire(timeout=max(0, deadline - time.perf_counter())):
+        finished += 1
+    cpu, wall = time.process_time() - cpu0, time.perf_counter() - wall0
+    for worker in workers:
+        if worker.running:
+            worker.cancel()
+
+    if mode == "engine":
+        engine.shutdown()
+
+    samples = sum(counts.values())
+    return {
+        "mode": mode,
+        "samples": samples,
+        "samples_per_s": samples / wall,
+        "cpu_s": cpu,
+        "cpu_us_per_sample": 1e6 * cpu / samples if samples else float("nan"),
+        "threads_peak": len(workers) if mode == "threads" else 1,
+        "unfinished": len(workers) - finished,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--devices", type=int, default=20)
+    parser.add_argument("--duration", type=int, default=5)
+    parser.add_argument("--rate", type=int, default=10)
+    args = parser.parse_args()
+
+    with SimFleet(args.devices) as fleet:
+        devices = fleet.discover()
+        expected = len(devices) * args.duration * 1000 // args.rate
+        print(f"{len(devices)} devices, {args.duration}s @ {args.rate}ms, ~{expected} samples expected")
+        for mode in ("threads", "engine"):
+            r = run_mode(mode, devices, args.duration, args.rate)
+            print(f"{r['mode']:>8}: {r['samples']} samples, {r['samples_per_s']:.0f} samples/s, "
+                  f"cpu {r['cpu_s']:.2f}s ({r['cpu_us_per_sample']:.1f} us/sample), "
+                  f"{r['threads_peak']} receive thread(s), {r['unfinished']} missed IDLE")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+    Measures how fast archived test runs are indexed and reopened for plotting.
+
+    Archives RUNS short runs plus one run of SAMPLES samples in a temporary directory, then times
+    rebuilding the archive index from the file headers, opening the long run memory-mapped and
+    downsampling it for a plot the way MainWindow does. For comparison, the same samples are
+    read back from a SampleRecorder recording, which loads the whole file. No simulators needed.
+
+    Usage: python benchmarks/bench_run_archive.py [--samples N] [--runs N] [--width PX]
+
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import numpy as np
+
+from downsample import lttb
+from run_archive import RunArchive
+from sample_recorder import SampleRecorder, read_samples
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, 1000 * (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--samples", type=int, default=5_000_000)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--width", type=int, default=1000, help="plot width in pixels")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    time_ms = np.arange(args.samples, dtype=np.int64) * 10
+    mv = 4400 + np.cumsum(rng.normal(0, 0.5, args.samples))
+    ma = 300 + rng.normal(0, 5, args.samples)
+
+    with tempfile.TemporaryDirectory() as directory:
+        archive = RunArchive(directory)
+        short = np.arange(100)
+        for n in range(args.runs):
+            archive.add(f"SN{n % 20:04d}", "Sim", 1.7e9 + n, 10, 1, "completed", short, short, short)
+        _, write_ms = timed(lambda: archive.add("SN9999", "Sim", 1.8e9, 10, args.samples // 100, "completed",
+                                                time_ms, mv, ma))
+
+        recording = os.path.join(directory, "SN9999.samples")
+        recorder = SampleRecorder(recording, sync=False)
+        recorder.write(time_ms, mv, ma)
+        recorder.close()
+
+        # a fresh archive, as when the application starts
+        archive, index_ms = timed(lambda: RunArchive(directory))
+        info = archive.runs("SN9999")[0]
+        run, open_ms = timed(lambda: archive.open(info))
+        _, plot_ms = timed(lambda: (lttb(run.time_ms, run.mv, 2 * args.width),
+                                    lttb(run.time_ms, run.ma, 2 * args.width)))
+        run.close()
+
+        def reload_recording():
+            samples = read_samples(recording)
+            return lttb(samples["time_ms"], samples["mv"], 2 * args.width), \
+                lttb(samples["time_ms"], samples["ma"], 2 * args.width)
+        _, recording_ms = timed(reload_recording)
+
+    print(f"{args.runs + 1} archived runs, the longest with {args.samples} samples")
+    print(f"  archive the long run:       {write_ms:8.1f} ms")
+    print(f"  build the index:            {index_ms:8.1f} ms")
+    print(f"  open the long run (mmap):   {open_ms:8.2f} ms")
+    print(f"  downsample it for the plot: {plot_ms:8.1f} ms")
+    print(f"  open + plot from archive:   {open_ms + plot_ms:8.1f} ms")
+    print(f"  read + plot the recording:  {recording_ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
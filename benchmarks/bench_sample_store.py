@@ -0,0 +1,78 @@
+"""
+    Measures memory per sample of the old list-of-tuples plot storage against SampleStore.
+
+    Usage: python benchmarks/bench_sample_store.py [--samples N]
+
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from sample_store import SampleStore
+
+
+def samples(n):
+    """
+        Yields n (time_ms, mv, ma) samples shaped like the simulator output.
+
+        :param n (int) Number of samples to generate.
+
+    """
+
+    for i in range(n):
+        yield i * 10, 4500.0 + (i % 97) * 0.1, 100.0 - (i % 89) * 0.1
+
+
+def measure(label, n, fill):
+    """
+        Fills a container with n samples and prints the memory it holds and the append rate.
+
+        :param label (str) Name printed for this storage variant.
+        :param n (int) Number of samples.
+        :param fill (callable) Function taking the sample iterator and returning the filled container.
+
+    """
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    container = fill(samples(n))
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:>28}: {current / n:7.1f} bytes/sample, {n / elapsed / 1e6:5.2f} M appends/s")
+    return container
+
+
+def fill_list(it):
+    data = []
+    for t, mv, ma in it:
+        data.append((t, mv, ma))
+    return data
+
+
+def fill_store(it, capacity=None):
+    store = SampleStore(capacity)
+    for t, mv, ma in it:
+        store.append(t, mv, ma)
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--samples", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    n = args.samples
+    print(f"{n} samples per device")
+    measure("list of tuples (old)", n, fill_list)
+    measure("SampleStore, unbounded", n, fill_store)
+    measure("SampleStore, ring of 100k", n, lambda it: fill_store(it, 100_000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+    Measures the GUI's startup milestones in fresh processes.
+
+    Launches device_sim simulators, then starts the GUI several times in a new Python process,
+    offscreen, with a scan on startup, and reports the time from process start to each
+    milestone recorded by startup_timing: imports done, window created, first paint, live
+    plot ready and first discovery result. Compare the medians against STARTUP_BUDGET_MS.
+
+    Usage: python benchmarks/bench_startup.py [--runs N] [--devices N] [--backend qt|matplotlib]
+
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from sim_fleet import SimFleet, ROOT
+
+# Runs in the child process: shows the window and waits for the last milestone
+CHILD = r"""
+import json, sys
+sys.path.insert(0, sys.argv[1])
+import constants
+constants.SCAN_ON_STARTUP = True
+constants.PLOT_BACKEND = sys.argv[2]
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QTimer
+app = QApplication(sys.argv[:1])
+import main_window
+window = main_window.MainWindow()
+window.show()
+check = QTimer()
+check.timeout.connect(lambda: "first_discovery_result" in main_window.startup.marks
+                      and "plot_ready" in main_window.startup.marks and app.quit())
+check.start(5)
+QTimer.singleShot(10000, app.quit)
+app.exec_()
+print(json.dumps(main_window.startup.to_dict()))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--devices", type=int, default=3)
+    parser.add_argument("--backend", default="qt")
+    args = parser.parse_args()
+
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    runs = []
+    with SimFleet(args.devices):
+        for _ in range(args.runs):
+            out = subprocess.run([sys.executable, "-c", CHILD, os.path.join(ROOT, "src"), args.backend],
+                                 env=env, capture_output=True, text=True, timeout=60)
+            lines = out.stdout.strip().splitlines()
+            if out.returncode != 0 or not lines:
+                print(out.stderr, file=sys.stderr)
+                sys.exit(1)
+            runs.append(json.loads(lines[-1]))
+
+    print(f"{args.runs} startups, {args.backend} plot backend, {args.devices} simulators (ms from process start)")
+    for name in runs[0]:
+        values = np.array([r[name] for r in runs if name in r])
+        print(f"{name:>24}: median {np.median(values):7.0f}   min {values.min():7.0f}   max {values.max():7.0f}")
+
+
+if __name__ == "__main__":
+    main()
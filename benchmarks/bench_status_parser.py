@@ -0,0 +1,138 @@
+"""
+    Measures STATUS datagram parsing throughput of the old split-based code against status_parser.
+
+    Usage: python benchmarks/bench_status_parser.py [--samples N] [--burst N]
+
+"""
+
+import argparse
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import status_parser
+
+
+def datagrams(n):
+    """
+        Returns n STATUS datagrams formatted like the simulator output.
+
+        :param n (int) Number of datagrams.
+
+    """
+
+    return [f"STATUS;TIME={i * 10:.0f};MV={4500.0 + (i % 97) * 0.1:.1f};MA={100.0 - (i % 89) * 0.1:.1f};".encode('latin-1')
+            for i in range(n)]
+
+
+def parse_legacy(data):
+    """
+        The parsing code DeviceWorker.handle_datagram used before status_parser.
+
+    """
+
+    message = data.decode('latin-1')
+    if message.startswith("STATUS;"):
+        parts = message.split(';')
+        time_ms = None
+        mv = None
+        ma = None
+        for part in parts:
+            if part.startswith("TIME="):
+                time_ms = int(part.split('=')[1])
+            elif part.startswith("MV="):
+                mv = float(part.split('=')[1])
+            elif part.startswith("MA="):
+                ma = float(part.split('=')[1])
+        if time_ms is not None and mv is not None and ma is not None:
+            return time_ms, mv, ma
+    return None
+
+
+def report(label, n, elapsed):
+    print(f"{label:>36}: {n / elapsed / 1e3:8.1f} k samples/s per core")
+
+
+def bench_parse(messages):
+    """
+        Times parsing alone, over datagrams that are already in memory.
+
+    """
+
+    n = len(messages)
+    start = time.process_time()
+    for data in messages:
+        parse_legacy(data)
+    report("parse: decode + split (old)", n, time.process_time() - start)
+
+    views = [memoryview(data) for data in messages]
+    parse_sample = status_parser.parse_sample
+    start = time.process_time()
+    for view in views:
+        parse_sample(view)
+    report("parse: status_parser.parse_sample", n, time.process_time() - start)
+
+
+def bench_receive(messages, burst):
+    """
+        Times receiving and parsing over a local datagram socket pair. The datagrams are
+        queued in bursts before each drain, so only the receive side is timed.
+
+    """
+
+    sender, receiver = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    receiver.setblocking(False)
+    buffer = bytearray(1024)
+    view = memoryview(buffer)
+
+    def drain_legacy():
+        while True:
+            try:
+                data, _ = receiver.recvfrom(1024)
+            except BlockingIOError:
+                return
+            parse_legacy(data)
+
+    def drain_fast():
+        parse_sample = status_parser.parse_sample
+        while True:
+            try:
+                nbytes, _ = receiver.recvfrom_into(buffer)
+            except BlockingIOError:
+                return
+            data = view[:nbytes]
+            str(data, 'latin-1')    # the worker still keeps the decoded line for the log
+            parse_sample(data)
+
+    for label, drain in (("recvfrom + decode + split (old)", drain_legacy),
+                         ("recvfrom_into + parse_sample", drain_fast)):
+        elapsed = 0.0
+        for i in range(0, len(messages), burst):
+            for data in messages[i:i + burst]:
+                sender.send(data)
+            start = time.process_time()
+            drain()
+            elapsed += time.process_time() - start
+        report(label, len(messages), elapsed)
+
+    sender.close()
+    receiver.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--samples", type=int, default=500_000)
+    parser.add_argument("--burst", type=int, default=100, help="datagrams queued before each receive drain")
+    args = parser.parse_args()
+
+    messages = datagrams(args.samples)
+    print(f"{args.samples} STATUS datagrams")
+    bench_parse(messages)
+    bench_receive(messages, args.burst)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+    Measures how long stopping running tests takes, from the stop call to finished_signal.
+
+    Launches N device_sim instances, starts a long test on each, then stops all of them at
+    once and reports the time stop_test took to return and the stop-to-finished latency
+    percentiles, for the thread-per-device and the ReceiveEngine modes.
+
+    Usage: python benchmarks/bench_stop_latency.py [--devices N] [--rate MS] [--run S]
+
+"""
+
+import argparse
+import threading
+import time
+
+import numpy as np
+from PyQt5.QtCore import Qt
+
+from sim_fleet import SimFleet
+from device_worker import DeviceWorker
+from receive_engine import ReceiveEngine
+
+
+def run_mode(mode, devices, rate, run):
+    """
+        Starts one test per device, stops them all after run seconds and returns the measured numbers.
+
+        :param mode (str) Either "threads" or "engine".
+        :param devices (list of Device) Devices to test.
+        :param rate (int) Status rate in milliseconds.
+        :param run (float) Seconds to let the tests run before stopping them.
+
+    """
+
+    finished_at = {}
+    done = threading.Semaphore(0)
+    workers = []
+
+    for device in devices:
+        # long enough that every test is still running when it is stopped
+        worker = DeviceWorker(device, duration=run + 60, rate=rate, batch_interval_ms=33)
+
+        def on_finished(serial=device.serial):
+            finished_at[serial] = time.perf_counter()
+            done.release()
+
+        # no Qt event loop runs here, so slots are called directly in the receiving thread
+        worker.finished_signal.connect(on_finished, Qt.DirectConnection)
+        workers.append(worker)
+
+    engine = None
+    if mode == "engine":
+        engine = ReceiveEngine()
+        engine.submit_batch(workers)
+    else:
+        for worker in workers:
+            threading.Thread(target=worker.start_test, daemon=True).start()
+    time.sleep(run)
+
+    stop_start = time.perf_counter()
+    for worker in workers:
+        worker.stop_test()
+    call_time = time.perf_counter() - stop_start
+
+    finished = 0
+    while finished < len(workers) and done.acquire(timeout=5):
+        finished += 1
+    if engine is not None:
+        engine.shutdown()
+
+    latencies = np.array([finished_at[w.device.serial] - stop_start for w in workers
+                          if w.device.serial in finished_at]) * 1000
+    acks = np.array([w.stop_latency for w in workers if w.stop_latency is not None]) * 1000
+    return {
+        "mode": mode,
+        "call_ms": 1000 * call_time,
+        "p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else float("nan"),
+        "p99_ms": float(np.percentile(latencies, 99)) if len(latencies) else float("nan"),
+        "max_ms": float(latencies.max()) if len(latencies) else float("nan"),
+        "ack_p50_ms": float(np.percentile(acks, 50)) if len(acks) else float("nan"),
+        "acknowledged": len(acks),
+        "unfinished": len(workers) - finished,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--devices", type=int, default=20)
+    parser.add_argument("--rate", type=int, default=10)
+    parser.add_argument("--run", type=float, default=1.0, help="seconds the tests run before being stopped")
+    args = parser.parse_args()
+
+    with SimFleet(args.devices) as fleet:
+        devices = fleet.discover()
+        print(f"{len(devices)} devices @ {args.rate}ms, stopped after {args.run}s")
+        for mode in ("threads", "engine"):
+            r = run_mode(mode, devices, args.rate, args.run)
+            print(f"{r['mode']:>8}: stop calls took {r['call_ms']:.1f} ms, stop to finished p50 {r['p50_ms']:.1f} / "
+                  f"p99 {r['p99_ms']:.1f} / max {r['max_ms']:.1f} ms, ack p50 {r['ack_p50_ms']:.1f} ms, "
+                  f"{r['acknowledged']}/{len(devices)} acknowledged, {r['unfinished']} unfinished")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+    Measures the end-of-test analysis (statistics, drift, settling time, out-of-limits time and
+    the pass/fail verdict) on synthetic runs of increasing length. No simulators needed.
+
+    Usage: python benchmarks/bench_test_analytics.py [--samples N,N,...] [--repeat N]
+
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import numpy as np
+
+from sample_store import SampleStore
+from test_analytics import RunAnalysis
+
+# every check enabled, so the worst case is measured
+LIMITS = {
+    "mv": (4000.0, 5000.0),
+    "ma": (-600.0, 600.0),
+    "max_out_of_limits_ms": 500,
+    "max_mv_drift": 1.0,
+    "max_ma_drift": 1.0,
+    "settle_band_mv": 50.0,
+    "max_settle_ms": 2000,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--samples", default="10000,100000,1000000,5000000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for n in (int(x) for x in args.samples.split(',')):
+        store = SampleStore(initial_size=n)
+        time_ms = np.arange(n, dtype=np.int64) * 10
+        mv = 4500 + rng.normal(0, 5, n)
+        mv[:n // 100] = 3900    # a slow start, so the run has an excursion and a settling time
+        store.extend(time_ms, mv, 100 + rng.normal(0, 2, n))
+
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            analysis = RunAnalysis(store, LIMITS)
+            times.append(1000 * (time.perf_counter() - start))
+        print(f"{n:>9} samples: {min(times):8.2f} ms (best of {args.repeat}), "
+              f"{1e6 * min(times) / n:.1f} ns/sample, {analysis.verdict()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+    Helpers for launching a fleet of device_sim simulators on this host for benchmarking.
+
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIM_DIR = os.path.join(ROOT, "device_sim")
+SIM_BINARY = os.path.join(SIM_DIR, "device")
+
+# benchmarks import the application modules the same way main_window.py does
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from device_manager import DeviceManager
+
+
+class SimFleet:
+    """
+        Launches N device_sim instances with distinct serials and stops them again on exit.
+
+        :attribute count (int) Number of simulator processes to launch.
+
+        :attribute prefix (str) Serial number prefix, each simulator gets <prefix><index>.
+
+        :attribute processes (list of subprocess.Popen) Running simulator processes.
+    """
+
+    def __init__(self, count, prefix="BENCH", model="SIM", deterministic=True):
+        self.count = count
+        self.prefix = prefix
+        self.model = model
+        self.deterministic = deterministic
+        self.processes = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def serials(self):
+        """
+            Returns the serial numbers assigned to the simulators.
+
+        """
+
+        return [f"{self.prefix}{i:04d}" for i in range(self.count)]
+
+    def start(self):
+        """
+            Builds the simulator if needed and launches one process per serial.
+
+        """
+
+        if not os.path.exists(SIM_BINARY):
+            subprocess.check_call(["make", "-C", SIM_DIR, "device"], stdout=subprocess.DEVNULL)
+
+        for serial in self.serials():
+            cmd = [SIM_BINARY, "-M", self.model, "-S", serial]
+            if self.deterministic:
+                cmd.append("--deterministic")
+            self.processes.append(subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+
+        time.sleep(0.2)    # give every simulator time to join the multicast group
+
+    def stop(self):
+        """
+            Terminates every simulator process and waits for it to exit.
+
+        """
+
+        for proc in self.processes:
+            proc.terminate()
+        for proc in self.processes:
+            proc.wait()
+        self.processes = []
+
+    def discover(self, timeout=2):
+        """
+            Discovers the fleet through DeviceManager, ignoring devices that are not part of it.
+
+            :param timeout (int, optional) Time in seconds to wait for device responses
+
+        """
+
+        wanted = set(self.serials())
+        devices = [d for d in DeviceManager().discover_devices(timeout, expected_serials=wanted) if d.serial in wanted]
+        if len(devices) != self.count:
+            print(f"warning: discovered {len(devices)} of {self.count} simulators", file=sys.stderr)
+        return devices
@@ -0,0 +1,87 @@
+import time
+
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QPushButton,
+    QTableWidget, QTableWidgetItem, QHeaderView
+)
+from PyQt5.QtCore import Qt
+
+class ArchiveBrowser(QDialog):
+    """
+        Dialog listing the archived test runs, newest first, optionally only those of one device.
+
+        :attribute archive (RunArchive) Archive whose runs are listed.
+
+        :attribute runs (list of dict) Header fields of the listed runs, in table order.
+    """
+
+    def __init__(self, archive, serial=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Archived Test Runs")
+        self.resize(800, 400)
+        self.archive = archive
+        self.runs = []
+
+        self.serial_box = QComboBox()
+        self.serial_box.addItem("All devices", None)
+        for s in archive.serials():
+            self.serial_box.addItem(s, s)
+        if serial is not None and self.serial_box.findData(serial) >= 0:
+            self.serial_box.setCurrentIndex(self.serial_box.findData(serial))
+        self.serial_box.currentIndexChanged.connect(self.fill_table)
+
+        self.table = QTableWidget(0, 6)
+        self.table.setHorizontalHeaderLabels(["Serial", "Model", "Started", "Samples", "Rate (ms)", "Result"])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.setSelectionMode(QTableWidget.SingleSelection)
+        self.table.cellDoubleClicked.connect(lambda *_: self.accept())
+
+        self.open_button = QPushButton("Open")
+        self.open_button.clicked.connect(self.accept)
+        cancel_button = QPushButton("Cancel")
+        cancel_button.clicked.connect(self.reject)
+
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("Device:"))
+        filter_layout.addWidget(self.serial_box)
+        filter_layout.addStretch()
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        button_layout.addWidget(self.open_button)
+        button_layout.addWidget(cancel_button)
+
+        layout = QVBoxLayout(self)
+        layout.addLayout(filter_layout)
+        layout.addWidget(self.table)
+        layout.addLayout(button_layout)
+
+        self.fill_table()
+
+    def fill_table(self):
+        """
+            Lists the runs of the selected device, or of every device.
+
+        """
+
+        self.runs = self.archive.runs(self.serial_box.currentData())
+        self.table.setRowCount(len(self.runs))
+        for row, info in enumerate(self.runs):
+            started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(info["start_time"]))
+            texts = (info["serial"], info["model"], started, str(info["samples"]), str(info["rate"]), info["result"])
+            for col, text in enumerate(texts):
+                item = QTableWidgetItem(text)
+                item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)
+                self.table.setItem(row, col, item)
+        if self.runs:
+            self.table.selectRow(0)
+        self.open_button.setEnabled(bool(self.runs))
+
+    def selected_run(self):
+        """
+            Returns the header fields of the selected run, or None.
+
+        """
+
+        rows = self.table.selectionModel().selectedRows()
+        return self.runs[rows[0].row()] if rows else None
@@ -0,0 +1,167 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from PyQt5.QtCore import pyqtSignal, QObject
+
+import constants
+
+def render_graph(path, title, source):
+    """
+        Renders one device's graph to an image file. Runs in a pool process, so the matplotlib
+        rendering of long runs does not hold the GUI process's interpreter.
+
+        :param path (str) Image file path.
+        :param title (str) Plot title.
+        :param source (tuple or str) (time_ms, mv, ma) arrays of the samples, or the path of an archived run.
+
+        :return (str) The image file path.
+    """
+
+    import plot_backends
+    from run_archive import ArchivedRun
+    from sample_store import SampleStore
+
+    if isinstance(source, str):
+        store = ArchivedRun(source)    # mapped in this process, the samples are never pickled
+    else:
+        store = SampleStore(initial_size=max(1, len(source[0])))
+        store.extend(*source)
+    try:
+        plot_backends.save_figure(path, title, store)
+    finally:
+        if isinstance(store, ArchivedRun):
+            store.close()
+    return path
+
+
+def write_log(path, lines):
+    """
+        Writes one device's log to a text file, the way MainWindow.save_log does.
+
+        :param path (str) Text file path.
+        :param lines (LogBuffer or list of str) Log lines.
+
+        :return (str) The text file path.
+    """
+
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines))
+    return path
+
+
+def export_jobs(manager, directory):
+    """
+        Collects what Export All writes for every device: the graph and log of each device in the
+        testing set, and the graph of the latest archived run of devices without data in memory.
+        The samples and log lines are copied, so the export does not race with running tests.
+
+        :param manager (DeviceManager) Manager holding the devices' data.
+        :param directory (str) Directory the files are written to.
+
+        :return (tuple of (list, list)) Graph jobs as (path, title, source) and log jobs as (path, lines).
+    """
+
+    graphs = []
+    logs = []
+    plotted = set()
+    for device in manager.running_devices:
+        serial = device.serial
+        store = manager.get_plot_data(serial)
+        if len(store):
+            arrays = tuple(column.copy() for column in store.arrays())
+            graphs.append((os.path.join(directory, f"graph_{serial}.png"), f"Live Test Data for {serial}", arrays))
+            plotted.add(serial)
+        lines = manager.get_log(serial)
+        if len(lines):
+            # copied without rendering; the export thread renders the lines as it writes them
+            logs.append((os.path.join(directory, f"log_{serial}.txt"), lines.copy()))
+
+    if manager.archive is not None:
+        for serial in manager.archive.serials():
+            if serial in plotted:
+                continue
+            info = manager.archive.runs(serial)[0]
+            started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(info["start_time"]))
+            graphs.append((os.path.join(directory, f"graph_{serial}_archived.png"),
+                           f"Archived Test Data for {serial} ({started})", info["path"]))
+    return graphs, logs
+
+
+class ExportWorker(QObject):
+    """
+        Worker class for exporting many graphs and logs in a background thread.
+
+        Graphs are rendered in a pool of processes, so long runs of several devices are rendered
+        at the same time on separate cores; logs are written from a thread pool. Progress is
+        reported per file written.
+
+        :signal progress_signal (pyqtSignal(int, int, str)) Emitted after each file, with the number
+        of files done, the total and the path written (or the error).
+
+        :signal finished_signal (pyqtSignal(int, list)) Emitted when the export ends, with the number of
+        files written and the list of error messages.
+
+        :attributes graphs (list of tuple) Graph jobs, see export_jobs.
+
+        :attributes logs (list of tuple) Log jobs, see export_jobs.
+
+        :attributes processes (int) Maximum number of rendering processes.
+
+        :attributes running (bool) Flag indicating whether the export is running; clear it to cancel the files not started yet.
+
+    """
+
+    progress_signal = pyqtSignal(int, int, str)
+    finished_signal = pyqtSignal(int, list)
+
+    def __init__(self, graphs, logs, processes=None):
+        super().__init__()
+        self.graphs = graphs
+        self.logs = logs
+        self.processes = processes or constants.EXPORT_PROCESSES or os.cpu_count() or 1
+        self.running = False
+
+    def run(self):
+        """
+            Runs the export, emitting progress after every file, then emits finished_signal.
+
+        """
+
+        self.running = True
+        total = len(self.graphs) + len(self.logs)
+        done = 0
+        errors = []
+        # spawned rather than forked: forking a process that runs Qt and receive threads is unsafe
+        context = multiprocessing.get_context("spawn")
+        processes = ProcessPoolExecutor(max(1, min(self.processes, len(self.graphs))), mp_context=context)
+        threads = ThreadPoolExecutor(4)
+        try:
+            futures = {processes.submit(render_graph, *job): job[0] for job in self.graphs}
+            futures.update({threads.submit(write_log, *job): job[0] for job in self.logs})
+            for future in as_completed(futures):
+                done += 1
+                try:
+                    message = future.result()
+                except Exception as e:    # a failed file must not end the export of the others
+                    message = f"{futures[future]}: {e}"
+                    errors.append(message)
+                self.progress_signal.emit(done, total, message)
+                if not self.running:
+                    for pending in futures:
+                        pending.cancel()
+                    break
+        finally:
+            processes.shutdown(wait=True, cancel_futures=True)
+            threads.shutdown(wait=True, cancel_futures=True)
+            self.running = False
+            self.finished_signal.emit(done - len(errors), errors)
+
+    def stop(self):
+        """
+            Cancels the export. Files being written are finished, the others are skipped.
+
+        """
+
+        self.running = False
@@ -1,3 +1,136 @@
 MULTICAST_ADDR = "224.3.11.15"
 MULTICAST_PORT = 31115
-BUFFER_SIZE = 1024
\ No newline at end of file
+BUFFER_SIZE = 1024
+
+# Run every device test from one shared receive loop instead of a thread per device
+USE_RECEIVE_ENGINE = False
+
+# Number of processes the device tests are spread over, each receiving and parsing the streams of its share
+# of the devices and writing their samples to shared memory. 0 runs every test in this process.
+SHARD_PROCESSES = 0
+
+# Number of samples per device kept in shared memory for plotting when SHARD_PROCESSES is set and
+# PLOT_HISTORY_SAMPLES is None; the full test is in the recording file, if recording is enabled.
+SHARD_RING_SAMPLES = 100000
+
+# Minimum time between live plot redraws, in milliseconds
+PLOT_FRAME_MS = 16
+
+# Live plot drawing: "qt" paints the lines with QPainter, "matplotlib" renders the whole figure with Agg
+PLOT_BACKEND = "qt"
+
+# Time the plots may spend redrawing per frame, in milliseconds; plots left over are drawn in the next frame
+RENDER_BUDGET_MS = 16
+
+# Number of device plots per row of the All Devices dashboard
+DASHBOARD_COLUMNS = 3
+
+# Interval at which the rate, jitter and missed sample columns of running tests are refreshed, in milliseconds
+STATS_REFRESH_MS = 500
+
+# Interval at which workers deliver batched status messages and data points to the GUI,
+# in milliseconds (33 ms is about 30 Hz). 0 delivers every message as it arrives.
+BATCH_INTERVAL_MS = 33
+
+# Number of samples kept per device for plotting. None keeps the whole test; a number
+# turns the per-device store into a ring buffer holding only the most recent samples.
+PLOT_HISTORY_SAMPLES = None
+
+# Directory where every test's samples are streamed to a recording file as they arrive.
+# None keeps samples in memory only.
+RECORD_DIR = None
+
+# Directory where every finished test run is archived for reopening later, one .run file per run.
+# None disables the archive.
+ARCHIVE_DIR = None
+
+# Pass/fail limits applied to every finished test, by device model. Models without an entry, and keys
+# missing from a model's entry, use "default". A key set to None, or left out, skips that check.
+#   mv, ma: allowed (low, high) range of the channel
+#   max_out_of_limits_ms: time a channel may spend outside its range before the test fails; None fails on any sample
+#   max_mv_drift, max_ma_drift: largest allowed linear drift over the test, in units per second
+#   settle_band_mv, max_settle_ms: the voltage must stay within settle_band_mv of its final value
+#   after at most max_settle_ms from the first sample
+# No limits are set by default, so every completed test passes; add an entry per device model,
+# e.g. "M001": {"mv": (4000.0, 5000.0), "ma": (-600.0, 600.0)}
+TEST_LIMITS = {
+    "default": {
+        "mv": None,
+        "ma": None,
+        "max_out_of_limits_ms": None,
+        "max_mv_drift": None,
+        "max_ma_drift": None,
+        "settle_band_mv": None,
+        "max_settle_ms": None,
+    },
+}
+
+# Rules checked on every sample while a test runs, by device model. Models without an entry, and keys
+# missing from a model's entry, use "default". A rule set to None is not checked.
+#   mv, ma: (low, high) range the smoothed value must stay in
+#   max_mv_rate, max_ma_rate: largest allowed rate of change of the smoothed value, in units per second
+#   ewma_alpha: smoothing factor of the values (0 to 1); 1 checks the raw samples
+#   grace_ms: test time before the rules are checked, e.g. while the part powers up
+# No rules are set by default, so samples are not monitored; add an entry per device model,
+# e.g. "M001": {"mv": (3000.0, 6000.0)}
+MONITOR_RULES = {
+    "default": {
+        "mv": None,
+        "ma": None,
+        "max_mv_rate": None,
+        "max_ma_rate": None,
+        "ewma_alpha": 0.2,
+        "grace_ms": 0,
+    },
+}
+
+# Send STOP to a device as soon as one of its monitoring rules is violated, instead of only reporting it
+STOP_ON_ALARM = False
+
+# Number of processes rendering graphs for Export All. None uses one per CPU core.
+EXPORT_PROCESSES = None
+
+# Recordings are flushed to disk once this many samples are pending or this many milliseconds have passed
+RECORD_FLUSH_SAMPLES = 4096
+RECORD_FLUSH_INTERVAL_MS = 1000
+
+# Number of samples kept in memory per device while a test is recorded (when PLOT_HISTORY_SAMPLES is None);
+# the full test is in the recording file.
+RECORDED_HISTORY_SAMPLES = 100000
+
+# Live plot lines only show sample markers while points are at least this many pixels apart
+PLOT_MARKER_SPACING_PX = 6
+
+# Number of log lines kept per device; older lines are dropped. None keeps the whole log.
+LOG_SCROLLBACK_LINES = 100000
+
+# Time to wait for devices to acknowledge a START command sent with Start All, in milliseconds
+START_ACK_TIMEOUT_MS = 1000
+
+# Time to wait for a device to acknowledge a STOP command before its test is ended anyway, in milliseconds
+STOP_ACK_TIMEOUT_MS = 2000
+
+# Number of UDP sockets shared by every device test; commands and streams are routed by device address
+SOCKET_POOL_SIZE = 1
+
+# Discovery ends once no new device has answered for this many seconds
+DISCOVERY_IDLE_TIMEOUT = 0.5
+
+# Upper bound on the length of a discovery scan, in seconds
+DISCOVERY_MAX_SECONDS = 10
+
+# Scans from the GUI end early once this many devices have answered. None waits for the idle timeout.
+DISCOVERY_EXPECTED_COUNT = None
+
+# Scans from the GUI end early once every serial number in this list has answered. None waits for the idle timeout.
+DISCOVERY_EXPECTED_SERIALS = None
+
+# Start a device scan as soon as the window is shown
+SCAN_ON_STARTUP = False
+
+# Print the time taken to reach each startup milestone (imports, first paint, plot ready, first discovery result)
+STARTUP_REPORT = False
+
+# Maximum time allowed to reach startup milestones, in milliseconds from process start; slower ones are
+# reported with STARTUP_REPORT. first_discovery_result is only measured with SCAN_ON_STARTUP.
+STARTUP_BUDGET_MS = {"first_paint": 1500, "first_discovery_result": 3000}
@@ -0,0 +1,149 @@
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QGridLayout
+
+import constants
+import plot_backends
+from downsample import MinMaxDecimator
+
+class DevicePanel(QWidget):
+    """
+        Small voltage plot of one device, one cell of the dashboard grid.
+
+        :attribute serial (str) Serial number of the plotted device.
+
+        :attribute plot (QWidget) Compact plot widget of the PLOT_BACKEND backend.
+    """
+
+    def __init__(self, serial, parent=None):
+        super().__init__(parent)
+        self.serial = serial
+        self.plot = plot_backends.create_plot(constants.PLOT_BACKEND, compact=True)
+        self.plot.set_title(serial)
+        self.decimator = MinMaxDecimator()
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.plot)
+        self.setMinimumHeight(160)
+
+    def render(self, store):
+        """
+            Redraws the panel with the current samples of the device, decimated to about one
+            min/max pair per pixel of panel width.
+
+            :param store (SampleStore) Samples of the device.
+
+        """
+
+        width = self.plot.plot_width()
+        time_ms, mv_vals, _ = store.arrays()
+        n = len(store)
+
+        if n == 0:
+            self.decimator.reset()
+            self.plot.set_series([], [])
+            self.plot.set_title(self.serial)
+            self.plot.set_limits(0, 1, 0, 1)
+            self.plot.set_has_data(False)
+            self.plot.draw()
+            return
+
+        if n <= width:
+            idx = slice(None)
+        else:
+            first = store.first_index
+            self.decimator.set_target(width)
+            idx = self.decimator.update(mv_vals, first) - first
+        self.plot.set_series(time_ms[idx], mv_vals[idx])
+
+        t_min, t_max = int(time_ms[0]), int(time_ms[-1])
+        mv_min, mv_max = store.mv_range()
+        mv_range = (mv_max - mv_min) or max(abs(mv_max) * 0.01, 1.0)
+        self.plot.set_limits(t_min, max(t_max, t_min + 1), mv_min - 0.1 * mv_range, mv_max + 0.1 * mv_range)
+        self.plot.set_title(f"{self.serial}  {mv_vals[-1]:.1f} mV")
+        self.plot.set_has_data(True)
+        self.plot.draw()
+
+
+class Dashboard(QWidget):
+    """
+        Grid of small voltage plots, one per device in test, redrawn through a RenderScheduler.
+
+        New samples only mark a device's panel dirty; the scheduler redraws dirty panels once
+        per frame within its budget. While the dashboard is hidden nothing is drawn, and the
+        panels that changed meanwhile are redrawn when it is shown again.
+
+        :attribute manager (DeviceManager) Manager holding the plot data of the devices.
+
+        :attribute scheduler (RenderScheduler) Scheduler the panel redraws are requested from.
+
+        :attribute columns (int) Number of panels per grid row.
+
+        :attribute panels (dict of str -> DevicePanel) Panels by serial number, in grid order.
+    """
+
+    def __init__(self, manager, scheduler, columns=3, parent=None):
+        super().__init__(parent)
+        self.manager = manager
+        self.scheduler = scheduler
+        self.columns = max(1, columns)
+        self.panels = {}
+        self.stale = set()    # serials whose data changed while the dashboard was hidden
+        self.grid = QGridLayout(self)
+
+    def add_panel(self, serial):
+        """
+            Adds a panel for a device at the end of the grid.
+
+            :param serial (str) Serial number of the device.
+
+        """
+
+        if serial in self.panels:
+            return
+        panel = DevicePanel(serial, self)
+        position = len(self.panels)
+        self.panels[serial] = panel
+        self.grid.addWidget(panel, position // self.columns, position % self.columns)
+        self.mark_dirty(serial)
+
+    def remove_panel(self, serial):
+        """
+            Removes a device's panel and closes the gap it leaves in the grid.
+
+            :param serial (str) Serial number of the device.
+
+        """
+
+        panel = self.panels.pop(serial, None)
+        if panel is None:
+            return
+        self.scheduler.discard(panel)
+        self.stale.discard(serial)
+        self.grid.removeWidget(panel)
+        panel.deleteLater()
+
+        for position, other in enumerate(self.panels.values()):
+            self.grid.removeWidget(other)
+            self.grid.addWidget(other, position // self.columns, position % self.columns)
+
+    def mark_dirty(self, serial):
+        """
+            Schedules a redraw of a device's panel after its data changed.
+
+            :param serial (str) Serial number of the device.
+
+        """
+
+        panel = self.panels.get(serial)
+        if panel is None:
+            return
+        if not self.isVisible():
+            self.stale.add(serial)
+            return
+        self.scheduler.request(panel, lambda: panel.render(self.manager.get_plot_data(serial)))
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        stale, self.stale = self.stale, set()
+        for serial in stale:
+            self.mark_dirty(serial)
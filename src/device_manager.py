@@ -1,6 +1,31 @@
+import os
 import socket
+import threading
+import time
 import constants
 from device import Device
+from device_registry import DeviceRegistry
+from sample_store import SampleStore
+from log_buffer import LogBuffer
+from sample_recorder import SampleRecorder, read_samples
+from run_archive import RunArchive
+
+def run_result(worker):
+    """
+        Returns how a finished test ended: "completed", "stopped", "error" or "no_response".
+
+        :param worker (DeviceWorker) Worker whose test has finished.
+
+    """
+
+    if worker.error is not None:
+        return "error"
+    if worker.completed:
+        return "completed"
+    if worker.stop_sent is not None:
+        return "stopped"
+    return "no_response"
+
 
 class DeviceManager:
     """
@@ -9,72 +34,153 @@ class DeviceManager:
         This class is responsible for discovering devices, tracking which devices are running,
         managing their worker threads, collecting log and plot data, and maintaining test statuses.
 
-        :attribute devices (list of Device) ist of all discovered devices.
+        :attribute devices (DeviceRegistry) ist of all discovered devices.
 
-        :attribute drunning_devices (list of Device) List of devices that are currently added to the testing set.
+        :attribute drunning_devices (DeviceRegistry) List of devices that are currently added to the testing set.
 
         :attribute dworkers (dict of str -> DeviceWorker) Mapping of device serial numbers to their corresponding test workers.
 
         :attribute dthreads (dict of str -> threading.Thread) Mapping of device serial numbers to their active testing threads.
 
-        :attribute dplot_data (dict of str -> list of (int, float)) Mapping of device serial numbers to their time-series test data
+        :attribute dplot_data (dict of str -> SampleStore) Mapping of device serial numbers to their time-series test data
 
-        :attribute dlog_lines (dict of str -> list of str) Mapping of device serial numbers to their log messages.
+        :attribute log_lines (dict of str -> LogBuffer) Mapping of device serial numbers to their log messages.
 
         :attribute dstatuses (dict of str -> str) Mapping of device serial numbers to their current test status.
+
+        :attribute recordings (dict of str -> str) Mapping of device serial numbers to the file their last test was recorded to.
+
+        :attribute analyses (dict of str -> RunAnalysis) Mapping of device serial numbers to the pass/fail analysis of their last test.
+
+        :attribute archive (RunArchive or None) Archive of finished test runs, if constants.ARCHIVE_DIR is set.
     """
 
     def __init__(self):
-        self.devices = []
-        self.running_devices = []
+        self.devices = DeviceRegistry()
+        self.running_devices = DeviceRegistry()
         self.workers = {}
         self.threads = {}
         self.plot_data = {}
         self.log_lines = {}
         self.statuses = {}
+        self.recordings = {}
+        self.analyses = {}
+        self.archive = RunArchive(constants.ARCHIVE_DIR) if constants.ARCHIVE_DIR else None
          
-    def discover_devices(self, timeout=2):
+    def discover_devices(self, timeout=2, idle_timeout=None, expected_count=None, expected_serials=None):
         """
             Discovers devices on the network by broadcasting a UDP message and listening for responses.
+            Blocks until discovery completes; see iter_discovery for the completion rules.
 
-            :param timeout (int, optional) Time in seconds to wait for device responses
+            :param timeout (int, optional) Time in seconds to wait for the first device response
+            :param idle_timeout (float, optional) Time in seconds without a new response after which discovery ends
+            :param expected_count (int, optional) Number of devices after which discovery ends early
+            :param expected_serials (iterable of str, optional) Serial numbers after which discovery ends early
 
         """
 
         self.clear_devices()
+        for device in self.iter_discovery(timeout, idle_timeout, expected_count, expected_serials):
+            self.add_device(device)
+
+        return self.devices
+
+    def iter_discovery(self, timeout=2, idle_timeout=None, expected_count=None, expected_serials=None):
+        """
+            Broadcasts a UDP discovery message and yields each responding device as soon as its reply arrives.
+
+            Discovery ends when no new device has answered for idle_timeout seconds (timeout seconds
+            before the first answer), when the expected devices have all answered, or after
+            constants.DISCOVERY_MAX_SECONDS. Repeated replies from the same serial are ignored, and so
+            are replies that are not well-formed ID responses. This method does not modify the device
+            list, so it can be run from a background thread.
+
+            :param timeout (int, optional) Time in seconds to wait for the first device response
+            :param idle_timeout (float, optional) Time in seconds without a new response after which discovery ends
+            :param expected_count (int, optional) Number of devices after which discovery ends early
+            :param expected_serials (iterable of str, optional) Serial numbers after which discovery ends early
+
+        """
+
+        if idle_timeout is None:
+            idle_timeout = constants.DISCOVERY_IDLE_TIMEOUT
+        missing = set(expected_serials) if expected_serials else None
+        seen = set()
+
         # Create a UDP socket for multicast communication
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
-        sock.settimeout(timeout)
         message = b"ID;"
         sock.sendto(message, (constants.MULTICAST_ADDR, constants.MULTICAST_PORT))
 
+        start = time.monotonic()
+        deadline = start + constants.DISCOVERY_MAX_SECONDS
+        idle_deadline = start + timeout
+
         try:
             while True:
-                # Listen for responses from devices
-                data, (ip, port) = sock.recvfrom(constants.BUFFER_SIZE)
-                decoded = data.decode('latin-1')    # decode message
-
-                parts = decoded.split(';')
-                model = parts[1].split('=')[1]
-                serial = parts[2].split('=')[1]
+                now = time.monotonic()
+                wait = min(idle_deadline, deadline) - now
+                if wait <= 0:
+                    break
+                sock.settimeout(wait)
 
-                self.add_device(Device(ip, port, model, serial))
-        except socket.timeout:
-            pass
+                # Listen for responses from devices
+                try:
+                    data, (ip, port) = sock.recvfrom(constants.BUFFER_SIZE)
+                except socket.timeout:
+                    break
+
+                device = self.parse_id_reply(data, ip, port)
+                if device is None or device.serial in seen:
+                    continue
+                seen.add(device.serial)
+                idle_deadline = time.monotonic() + idle_timeout
+
+                yield device
+
+                if missing is not None:
+                    missing.discard(device.serial)
+                    if not missing:
+                        break
+                if expected_count is not None and len(seen) >= expected_count:
+                    break
         finally:
             sock.close()
 
-        return self.devices
+    def parse_id_reply(self, data, ip, port):
+        """
+            Builds a Device from an ID reply ("ID;MODEL=...;SERIAL=...;").
+
+            :param data (bytes) Raw reply payload.
+            :param ip (str) IP address the reply came from.
+            :param port (int) Port the reply came from.
+
+            :return (Device or None) The responding device, or None if the reply is not a valid ID reply.
+        """
+
+        decoded = data.decode('latin-1')    # decode message
+        parts = decoded.split(';')
+        if parts[0] != "ID":
+            return None
+
+        fields = dict(part.split('=', 1) for part in parts[1:] if '=' in part)
+        if "MODEL" not in fields or "SERIAL" not in fields:
+            return None
+
+        return Device(ip, port, fields["MODEL"], fields["SERIAL"])
     
     def add_device(self, device):
         """
-            Adds a discovered device to the internal device list.
+            Adds a discovered device to the internal device list. If the device is also in the
+            testing set and not running a test, its entry there is refreshed with the new address.
 
             :param device (Device) The Device object to add.
 
         """
 
-        self.devices.append(device)
+        self.devices.add(device)
+        if device.serial in self.running_devices and not self.is_running(device.serial):
+            self.running_devices.add(device)
 
     def clear_devices(self):
         """
@@ -93,10 +199,10 @@ class DeviceManager:
 
         """
 
-        if device.serial not in [d.serial for d in self.running_devices]:
-            self.running_devices.append(device)
-            self.log_lines[device.serial] = []
-            self.plot_data[device.serial] = []
+        if device.serial not in self.running_devices:
+            self.running_devices.add(device)
+            self.log_lines[device.serial] = LogBuffer(constants.LOG_SCROLLBACK_LINES)
+            self.plot_data[device.serial] = SampleStore(self.plot_history_samples())
             self.statuses[device.serial] = "Idle"
 
     def remove_running_device(self, serial):
@@ -107,7 +213,7 @@ class DeviceManager:
 
         """
 
-        self.running_devices = [d for d in self.running_devices if d.serial != serial]
+        self.running_devices.remove(serial)
         self.workers.pop(serial, None)
         self.threads.pop(serial, None)
         self.plot_data.pop(serial, None)
@@ -165,7 +271,8 @@ class DeviceManager:
 
         """
 
-        return self.log_lines.get(serial, [])
+        buffer = self.log_lines.get(serial)
+        return buffer if buffer is not None else LogBuffer()
 
     def append_log(self, serial, line):
         """
@@ -176,17 +283,55 @@ class DeviceManager:
 
         """
 
-        self.log_lines.setdefault(serial, []).append(line)
+        self._log_buffer(serial).append(line)
+
+    def extend_log(self, serial, lines):
+        """
+            Append several entries to a device's log at once.
+
+            :param serial (string) Serial number of the device.
+            :param lines (list of string) Log entries to append.
+
+        """
+
+        self._log_buffer(serial).extend(lines)
+
+    def extend_log_block(self, serial, block):
+        """
+            Append the status messages of a worker's SampleBlock to a device's log, data points
+            as compact records.
+
+            :param serial (string) Serial number of the device.
+            :param block (SampleBlock) Block emitted by the device's worker.
+
+        """
+
+        self._log_buffer(serial).extend_block(block)
+
+    def _log_buffer(self, serial):
+        """
+            Get the log buffer of a device, creating it if needed.
+
+            :param serial (string) Serial number of the device.
+
+        """
+
+        buffer = self.log_lines.get(serial)
+        if buffer is None:
+            buffer = self.log_lines[serial] = LogBuffer(constants.LOG_SCROLLBACK_LINES)
+        return buffer
 
     def get_plot_data(self, serial):
         """
-            Get all stored plot data points for a device.
+            Get all stored plot data points for a device. The returned store exposes the
+            time_ms, mv and ma columns as NumPy array views.
 
             :param serial (string) Serial number of the device.
 
         """
 
-        return self.plot_data.get(serial, [])
+        store = self.plot_data.get(serial)
+        return store if store is not None else SampleStore(initial_size=1)
 
     def append_plot_data(self, serial, time_ms, mv, ma):
         """
@@ -199,7 +344,158 @@ class DeviceManager:
 
         """
 
-        self.plot_data.setdefault(serial, []).append((time_ms, mv, ma))
+        self._plot_store(serial).append(time_ms, mv, ma)
+
+    def extend_plot_data(self, serial, time_ms, mv, ma):
+        """
+            Append a batch of data points for plotting.
+
+            :param serial (string) Serial number of the device.
+            :param time_ms (sequence of int) Times in milliseconds.
+            :param mv (sequence of float) Voltages in millivolts.
+            :param ma (sequence of float) Currents in milliamps.
+
+        """
+
+        self._plot_store(serial).extend(time_ms, mv, ma)
+
+    def _plot_store(self, serial):
+        """
+            Get the plot data store of a device, creating it if needed.
+
+            :param serial (string) Serial number of the device.
+
+        """
+
+        store = self.plot_data.get(serial)
+        if store is None:
+            store = self.plot_data[serial] = SampleStore(self.plot_history_samples())
+        return store
+
+    def set_plot_store(self, serial, store):
+        """
+            Replaces the plot data store of a device, e.g. with the shared ring a shard process writes to.
+
+            :param serial (string) Serial number of the device.
+            :param store (SampleStore) The new store.
+
+        """
+
+        self.plot_data[serial] = store
+
+    def plot_history_samples(self):
+        """
+            Get the number of samples kept per device for plotting, or None to keep every sample.
+            Recorded tests are on disk, so only a bounded window is kept in memory for them.
+
+        """
+
+        if constants.PLOT_HISTORY_SAMPLES is None and constants.RECORD_DIR:
+            return constants.RECORDED_HISTORY_SAMPLES
+        return constants.PLOT_HISTORY_SAMPLES
+
+    def create_recorder(self, serial, directory=None):
+        """
+            Opens a new recording file for a device's test.
+
+            :param serial (string) Serial number of the device.
+            :param directory (string, optional) Directory for the file, constants.RECORD_DIR by default.
+
+            :return (SampleRecorder or None) The recorder, or None if recording is disabled.
+        """
+
+        path = self.recording_path(serial, directory)
+        if path is None:
+            return None
+        return SampleRecorder(path, flush_samples=constants.RECORD_FLUSH_SAMPLES,
+                              flush_interval=constants.RECORD_FLUSH_INTERVAL_MS / 1000)
+
+    def recording_path(self, serial, directory=None):
+        """
+            Picks the file a device's new test is recorded to, e.g. by a shard process.
+
+            :param serial (string) Serial number of the device.
+            :param directory (string, optional) Directory for the file, constants.RECORD_DIR by default.
+
+            :return (str or None) Path of the file, or None if recording is disabled.
+        """
+
+        directory = directory or constants.RECORD_DIR
+        if not directory:
+            return None
+
+        os.makedirs(directory, exist_ok=True)
+        name = f"{serial}_{time.strftime('%Y%m%d_%H%M%S')}"
+        path = os.path.join(directory, f"{name}.samples")
+        n = 1
+        while os.path.exists(path):    # tests restarted within the same second
+            n += 1
+            path = os.path.join(directory, f"{name}_{n}.samples")
+        self.recordings[serial] = path
+        return path
+
+    def run_samples(self, worker):
+        """
+            Returns every sample of a finished test for analysis. When the worker's collected data
+            only holds the newest samples, the samples are read from the recording file instead.
+
+            :param worker (DeviceWorker) Worker whose test has finished.
+
+            :return (tuple of (SampleStore, bool)) The samples, and whether older samples are missing from them.
+        """
+
+        store = worker.collected_data
+        if not store.evicted:
+            return store, False
+        if worker.recorder is None:
+            return store, True
+
+        worker.recorder.close()    # waits until every queued sample is in the file
+        try:
+            samples = read_samples(worker.recorder.path)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not read the recording of {worker.device.serial}: {e}")
+            return store, True
+        full = SampleStore(initial_size=max(1, len(samples)))
+        full.extend(samples["time_ms"], samples["mv"], samples["ma"])
+        return full, len(full) < len(store) + store.evicted
+
+    def archive_run(self, worker):
+        """
+            Archives a finished test run in a background thread. A recorded test is archived from
+            its recording file, which holds every sample; otherwise from the worker's collected data.
+
+            :param worker (DeviceWorker) Worker whose test has finished.
+
+            :return (threading.Thread or None) The archiving thread, or None if there is no archive.
+        """
+
+        if self.archive is None or worker.started_at is None:
+            return None
+
+        device = worker.device
+        result = run_result(worker)
+        recorder = worker.recorder
+        if recorder is None:
+            # copied now, the store may be cleared or reused by the next test
+            columns = [column.copy() for column in worker.collected_data.arrays()]
+
+        def run():
+            if recorder is not None:
+                recorder.close()    # waits until every queued sample is in the file
+                samples = read_samples(recorder.path)
+                time_ms, mv, ma = samples["time_ms"], samples["mv"], samples["ma"]
+            else:
+                time_ms, mv, ma = columns
+            try:
+                self.archive.add(device.serial, device.model, worker.started_at, worker.rate, worker.duration,
+                                 result, time_ms, mv, ma)
+            except OSError as e:
+                print(f"⚠️ Could not archive the test run of {device.serial}: {e}")
+
+        thread = threading.Thread(target=run, name=f"archive-{device.serial}", daemon=True)
+        thread.start()
+        return thread
 
     def update_status(self, serial, status):
         """
@@ -230,4 +526,4 @@ class DeviceManager:
 
         """
         if serial in self.plot_data:
-            self.plot_data[serial] = []
+            self.plot_data[serial].clear()
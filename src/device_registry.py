@@ -0,0 +1,98 @@
+class DeviceRegistry:
+    """
+        Ordered collection of devices indexed by serial number.
+
+        Devices keep the order they were added in, which is also the order of the rows of the
+        table listing them, so a device's row is looked up from its serial in O(1) instead of
+        scanning the table. Removing a device is O(n) because the rows after it move up.
+        Datagrams are routed by (ip, port) in O(1) by the SocketPool the tests run on.
+
+        The registry can be indexed and iterated like the list of devices it replaces.
+
+    """
+
+    def __init__(self):
+        self._devices = []
+        self._by_serial = {}
+        self._rows = {}
+
+    def __len__(self):
+        return len(self._devices)
+
+    def __iter__(self):
+        return iter(self._devices)
+
+    def __getitem__(self, row):
+        return self._devices[row]
+
+    def __contains__(self, serial):
+        return serial in self._by_serial
+
+    def add(self, device):
+        """
+            Adds a device at the end, or replaces the device with the same serial in place,
+            e.g. when it is rediscovered at a new address.
+
+            :param device (Device) Device to add.
+
+            :return (int) Row of the device.
+        """
+
+        row = self._rows.get(device.serial)
+        if row is None:
+            row = self._rows[device.serial] = len(self._devices)
+            self._devices.append(device)
+        else:
+            self._devices[row] = device
+
+        self._by_serial[device.serial] = device
+        return row
+
+    def remove(self, serial):
+        """
+            Removes a device. The rows of the devices after it move up by one.
+
+            :param serial (str) Serial number of the device.
+
+            :return (int or None) Row the device was in, or None if it was not registered.
+        """
+
+        row = self._rows.pop(serial, None)
+        if row is None:
+            return None
+
+        self._devices.pop(row)
+        del self._by_serial[serial]
+        for moved in self._devices[row:]:
+            self._rows[moved.serial] -= 1
+        return row
+
+    def clear(self):
+        """
+            Removes every device.
+
+        """
+
+        self._devices.clear()
+        self._by_serial.clear()
+        self._rows.clear()
+
+    def get(self, serial):
+        """
+            Returns the device with a serial number, or None.
+
+            :param serial (str) Serial number of the device.
+
+        """
+
+        return self._by_serial.get(serial)
+
+    def row_of(self, serial):
+        """
+            Returns the row of the device with a serial number, or None.
+
+            :param serial (str) Serial number of the device.
+
+        """
+
+        return self._rows.get(serial)
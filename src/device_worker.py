@@ -1,7 +1,99 @@
-from PyQt5.QtCore import pyqtSignal, QObject
-import socket
+from array import array
+import queue
+import threading
+import time
 
 import constants
+import socket_pool
+import status_parser
+from limit_monitor import LimitMonitor, rules_for
+from sample_store import SampleStore
+from signals import pyqtSignal, QObject
+from stream_stats import StreamStats
+
+# Queued into a worker's inbox to wake its receive loop without a datagram
+_WAKE = object()
+
+class SampleBlock:
+    """
+        A batch of status messages and data points received from one device during a frame interval.
+
+        :attribute time_ms (array of int) Timestamps in milliseconds of the collected data points.
+
+        :attribute mv (array of float) Voltage values in millivolts.
+
+        :attribute ma (array of float) Current values in milliamps.
+
+        :attribute status_lines (BlockLines) Raw status messages received, in arrival order.
+
+        :attribute text (dict of int -> str) The status messages that are not data point records, by position.
+
+        :attribute log_formats (array of int) For each status message, its record format when it can be logged
+        as a compact record (see status_parser.parse_record), or 0 when it must be logged as text.
+
+        :attribute log_samples (array of int) For each status message, the index of its data point in the block.
+
+        :attribute first_arrival (float or None) time.perf_counter() value when the first message of the block arrived.
+
+    """
+
+    def __init__(self):
+        self.time_ms = array('q')
+        self.mv = array('d')
+        self.ma = array('d')
+        self.log_formats = array('B')
+        self.log_samples = array('I')
+        self.text = {}
+        self.status_lines = BlockLines(self)
+        self.first_arrival = None
+
+    def __len__(self):
+        return len(self.time_ms)
+
+    def is_empty(self):
+        """
+            Returns True if the block holds neither data points nor status messages.
+
+        """
+
+        return not self.log_formats and not self.time_ms
+
+    def text_lines(self):
+        """
+            Returns the status messages that are not data point records, e.g. state changes and
+            command replies, in arrival order.
+
+        """
+
+        return list(self.text.values())
+
+class BlockLines:
+    """
+        The status messages of a SampleBlock, in arrival order. Only the messages that are not
+        data point records are kept as text; records are rendered back to text when a message
+        is read, and reading the text messages (see SampleBlock.text_lines) renders none of them.
+
+    """
+
+    def __init__(self, block):
+        # the block's columns rather than the block, which holds this sequence
+        self.columns = block.log_formats, block.log_samples, block.time_ms, block.mv, block.ma
+        self.text = block.text
+
+    def __len__(self):
+        return len(self.columns[0])
+
+    def __getitem__(self, i):
+        formats, samples, time_ms, mv, ma = self.columns
+        fmt = formats[i]
+        if not fmt:
+            return self.text[i]
+        s = samples[i]
+        return status_parser.format_record(time_ms[s], mv[s], ma[s], fmt)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
 
 class DeviceWorker(QObject):
     """
@@ -11,13 +103,25 @@ class DeviceWorker(QObject):
         tests, listen for responses, collect time-voltage data, and emit signals to update
         the GUI in real time.
 
-        :signal status_signal (pyqtSignal(str)) Emitted when a status message is received from the device.
-        
+        The worker can either run its own receive loop in a dedicated thread (start_test) or
+        be driven by a shared ReceiveEngine, which calls handle_datagram and finish_test for it.
+
+        With a batch interval set, status messages and data points are not emitted one by one.
+        They are accumulated into a SampleBlock which is emitted through block_signal at most
+        once per interval.
+
+        :signal status_signal (pyqtSignal(str)) Emitted when a status message is received from the device (unless
+            batched) and for problems to log, such as an unanswered STOP.
+
         :signal data_signal (pyqtSignal(int, float)) Emitted for each received data point, as (time in ms, voltage in mV).
-        
+
         :signal finished_signal (pyqtSignal()) Emitted when the device test ends (e.g., enters IDLE state).
-        
-        :signal save_signal (pyqtSignal(list)) Emitted at the end of a test, containing a list of collected (time, mV) tuples.
+
+        :signal save_signal (pyqtSignal(object)) Emitted at the end of a test, containing the SampleStore of collected data.
+
+        :signal block_signal (pyqtSignal(object)) Emitted in batch mode with a SampleBlock of everything received during the interval.
+
+        :signal alarm_signal (pyqtSignal(str)) Emitted once when a sample violates a monitoring rule, with a description of the violation.
 
         :attributes device (Device) The target device instance on which the test is run.
 
@@ -27,22 +131,92 @@ class DeviceWorker(QObject):
 
         :attributes running (bool) Flag indicating whether the test is currently running.
 
-        :attributes collected_data (list of tuple[int, float]) List of (time, mV) data points collected during the test.
-        
+        :attributes collected_data (SampleStore) Time, mV and mA data points collected during the test. Only the
+        most recent history_samples are kept; by default every sample, or constants.RECORDED_HISTORY_SAMPLES
+        when the test is recorded.
+
+        :attributes recorder (SampleRecorder or None) Recorder streaming every data point to disk, if any.
+
+        :attributes stats (StreamStats) Achieved rate, jitter and missed samples of the test's sample stream.
+
+        :attributes monitor (LimitMonitor) Checks every sample against the monitoring rules of the device's model.
+
+        :attributes alarm (str or None) The monitoring rule violation that raised the alarm, if any. With
+        constants.STOP_ON_ALARM the test is stopped when it is raised.
+
+        :attributes started_at (float or None) time.time() value when the START command was sent.
+
+        :attributes completed (bool) Whether the device reported the end of the test (IDLE state).
+
+        :attributes start_acknowledged (bool) Whether the device answered the START command with RESULT=STARTED.
+
+        :attributes stop_acknowledged (bool) Whether the device answered a STOP command sent by the engine with RESULT=STOPPED.
+
+        :attributes stop_sent (float or None) time.perf_counter() value when a STOP command was sent for this test.
+
+        :attributes stop_latency (float or None) Seconds between sending STOP and receiving its acknowledgement.
+
+        :attributes error (str or None) Error reply that ended the test, if any.
+
+        :attributes engine (ReceiveEngine or None) Shared receive engine driving this worker, if any.
+
+        :attributes pool (SocketPool or None) Socket pool the device's commands are sent from, by default the
+        process-wide one.
+
+        :attributes inbox (queue.SimpleQueue or None) Queue the pool delivers datagrams to while start_test runs.
+
+        :attributes ended (threading.Event) Set once the test has ended and finished_signal has been emitted.
+
+        :attributes batch_interval (float or None) Time in seconds between emitted blocks, or None to emit every message.
+
+        :attributes block (SampleBlock) Block collecting messages until the next flush, in batch mode.
+
     """
 
     status_signal = pyqtSignal(str)
     data_signal = pyqtSignal(int, float, float)
     finished_signal = pyqtSignal()
-    save_signal = pyqtSignal(list) 
+    save_signal = pyqtSignal(object)
+    block_signal = pyqtSignal(object)
+    alarm_signal = pyqtSignal(str)
 
-    def __init__(self, device, duration, rate):
+    def __init__(self, device, duration, rate, batch_interval_ms=None, recorder=None, history_samples=None):
         super().__init__()
         self.device = device
         self.duration = duration
         self.rate = rate
         self.running = False
-        self.collected_data = [] 
+        self.recorder = recorder
+        if history_samples is None and recorder is not None:
+            history_samples = constants.RECORDED_HISTORY_SAMPLES
+        self.collected_data = SampleStore(history_samples)
+        self.stats = StreamStats(rate)
+        self.monitor = LimitMonitor(rules_for(device.model))
+        self.alarm = None
+        self.started_at = None
+        self.completed = False
+        self.start_acknowledged = False
+        self.stop_acknowledged = False
+        self.stop_sent = None
+        self.stop_latency = None
+        self.error = None
+        self.engine = None
+        self.pool = None
+        self.inbox = None
+        self.ended = threading.Event()
+        self.batch_interval = batch_interval_ms / 1000 if batch_interval_ms else None
+        self.block = SampleBlock()
+        self.last_flush = time.perf_counter()
+
+    def start_message(self):
+        """
+            Builds the START command datagram for this worker's test parameters. Called when the
+            command is sent, so it also records the start time of the test.
+
+        """
+
+        self.started_at = time.time()
+        return f"TEST;CMD=START;DURATION={self.duration};RATE={self.rate};".encode('latin-1')
 
     def start_test(self):
         """
@@ -54,68 +228,264 @@ class DeviceWorker(QObject):
         """
 
         self.running = True
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.settimeout(2)
+        if self.pool is None:
+            self.pool = socket_pool.default_pool()
+        address = (self.device.ip, self.device.port)
+        # wake up often enough to flush pending blocks when the device goes quiet
+        timeout = min(2, self.batch_interval) if self.batch_interval else 2
 
-        msg = f"TEST;CMD=START;DURATION={self.duration};RATE={self.rate};".encode('latin-1')
-        sock.sendto(msg, (self.device.ip, self.device.port))
+        # the pool's reader thread queues this device's datagrams here, stop_test and cancel a wake-up
+        inbox = self.inbox = queue.SimpleQueue()
+        self.pool.register(address, inbox)
+        self.pool.send(address, self.start_message())
 
+        stop_timeout = constants.STOP_ACK_TIMEOUT_MS / 1000
         while self.running:
+            wait = timeout
+            if self.stop_sent is not None:
+                wait = min(wait, self.stop_sent + stop_timeout - time.perf_counter())
+                if wait <= 0:
+                    break    # STOP not acknowledged in time
             try:
-                data, addr = sock.recvfrom(constants.BUFFER_SIZE)
-                if addr[0] == self.device.ip:
-                    message = data.decode('latin-1')
-                    self.status_signal.emit(message)
-
-                    if message.startswith("STATUS;"):
-                        parts = message.split(';')
-                        time_ms = None
-                        mv = None
-                        ma = None
-                        for part in parts:
-                            if part.startswith("TIME="):
-                                time_ms = int(part.split('=')[1])
-                            elif part.startswith("MV="):
-                                mv = float(part.split('=')[1])
-                            elif part.startswith("MA="):
-                                ma = float(part.split('=')[1])
-
-                        if time_ms is not None and mv is not None and ma is not None:
-                            self.data_signal.emit(time_ms, mv, ma)  
-                            self.collected_data.append((time_ms, mv, ma))
-
-                    if "STATE=IDLE" in message:
-                        break
-            except socket.timeout:
+                item = inbox.get(timeout=wait)
+            except queue.Empty:
+                self.flush_due()
                 continue
+            if item is _WAKE:
+                continue
+            try:
+                if self.handle_datagram(*item):
+                    break
+            except Exception as e:
+                self.fail(f"Could not handle {bytes(item[0])!r}: {e}")
+                break
 
-        sock.close()
+        self.pool.unregister(address, inbox)
+        self.finish_test()
+
+    def handle_datagram(self, data, addr):
+        """
+            Handles a single datagram received from the device. Emits the raw status message,
+            parses time, voltage and current values and collects the data point.
+
+            :param data (bytes-like) Raw datagram payload. It is not kept after the call, so it may be
+            a view of a receive buffer that is reused for the next datagram.
+            :param addr (tuple of (str, int)) Address the datagram was received from.
+
+            :return (bool) True when the device reported the end of the test (IDLE state), acknowledged
+            a STOP command or rejected the test.
+
+        """
+
+        if addr[0] != self.device.ip:
+            return False
+
+        arrival = time.perf_counter()
+        fmt = 0    # logged as text unless the message can be rebuilt from the parsed values
+        message = None    # only decoded when the message is kept as text
+        sample = status_parser.parse_record(data)
+        if sample is not None:
+            time_ms, mv, ma, fmt = sample
+        if not fmt or not self.batch_interval:
+            message = str(data, 'latin-1')
+            if sample is None:
+                sample = status_parser.parse_fields(message)
+                if sample is not None:
+                    time_ms, mv, ma = sample
+
+        if self.batch_interval:
+            block = self.block
+            if block.first_arrival is None:
+                block.first_arrival = arrival
+            if not fmt:
+                block.text[len(block.log_formats)] = message
+            block.log_formats.append(fmt)
+            block.log_samples.append(len(block.time_ms))
+        else:
+            self.status_signal.emit(message)
+
+        if sample is not None:
+            self.stats.add(time_ms, arrival)
+            if self.monitor.checks and self.alarm is None:
+                alarm = self.monitor.add(time_ms, mv, ma)
+                if alarm is not None:
+                    self.raise_alarm(alarm)
+            if self.batch_interval:
+                self.block.time_ms.append(time_ms)
+                self.block.mv.append(mv)
+                self.block.ma.append(ma)
+            else:
+                self.data_signal.emit(time_ms, mv, ma)
+                self.collected_data.append(time_ms, mv, ma)
+                if self.recorder is not None:
+                    self.recorder.append(time_ms, mv, ma)
+                    self.check_recording()
+
+        if self.batch_interval:
+            self.flush_due()
+
+        if fmt:
+            return False    # a data point record, neither a state change nor a reply
+        if "STATE=IDLE" in message:
+            self.completed = True
+            self.stats.finish(self.duration * 1000 // self.rate if self.rate else 0)
+            return True
+        if message.startswith("TEST;RESULT="):
+            return self.handle_result(message)
+        return False
+
+    def raise_alarm(self, alarm):
+        """
+            Reports a monitoring rule violation and, with constants.STOP_ON_ALARM, stops the test
+            so the fixture is freed without waiting for the end of its duration.
+
+            :param alarm (str) Description of the violation.
+
+        """
+
+        self.alarm = alarm
+        self.alarm_signal.emit(alarm)
+        if constants.STOP_ON_ALARM and self.running and self.stop_sent is None:
+            self.stop_test()
+
+    def handle_result(self, message):
+        """
+            Records the device's answer to a START or STOP command.
+
+            :param message (str) TEST;RESULT=... reply.
+
+            :return (bool) True when the reply ends the test.
+
+        """
+
+        if message.startswith("TEST;RESULT=STARTED"):
+            self.start_acknowledged = True
+        elif message.startswith("TEST;RESULT=STOPPED"):
+            self.stop_acknowledged = True
+            if self.stop_sent is not None:
+                self.stop_latency = time.perf_counter() - self.stop_sent
+            return True
+        elif message.startswith("TEST;RESULT=ERROR") and (not self.start_acknowledged or self.stop_sent is not None):
+            self.error = message    # START rejected, or STOP found no test running
+            return True
+        return False
+
+    def flush_due(self):
+        """
+            Emits the pending block if the batch interval has elapsed since the last one.
+
+        """
+
+        if self.batch_interval and time.perf_counter() - self.last_flush >= self.batch_interval:
+            self.flush()
+
+    def flush(self):
+        """
+            Emits the pending block, if it holds anything, and starts a new one.
+
+        """
+
+        self.last_flush = time.perf_counter()
+        if not self.block.is_empty():
+            block, self.block = self.block, SampleBlock()
+            self.collected_data.extend(block.time_ms, block.mv, block.ma)
+            if self.recorder is not None:
+                self.recorder.write(block.time_ms, block.mv, block.ma)
+                self.check_recording()
+            self.block_signal.emit(block)
+
+    def check_recording(self):
+        """
+            Logs, once, that the recorder's writer thread stopped, e.g. because the disk is full.
+
+        """
+
+        error = self.recorder.take_error()
+        if error is not None:
+            self.status_signal.emit(f"⚠️ Recording to {self.recorder.path} stopped: {error}")
+
+    def finish_test(self):
+        """
+            Marks the test as no longer running and emits the collected data and finished signals.
+
+        """
+
+        self.running = False
+        self.flush()
+        if self.error is not None:
+            self.status_signal.emit(f"⚠️ Test on {self.device} ended with an error: {self.error}")
+        elif self.stop_sent is not None and not self.stop_acknowledged:
+            self.status_signal.emit(f"⚠️ No response received for STOP command from {self.device}.")
+        if self.recorder is not None:
+            self.recorder.close(wait=False)    # the writer thread finishes the file on its own
         self.save_signal.emit(self.collected_data)
         self.finished_signal.emit()
+        self.ended.set()
 
     def stop_test(self):
         """
             Stops the currently running test by sending a STOP command to the device over UDP.
+            Returns immediately: the receive loop is woken, ends the test when the device's STOPPED
+            acknowledgement arrives, or after STOP_ACK_TIMEOUT_MS, and emits finished_signal.
+
+            The command is sent from the pool socket the test was started from, so the device keeps
+            answering to the socket that receives its stream.
+
+        """
+
+        if self.engine is not None:
+            self.engine.stop_batch([self])
+            return
+
+        if self.stop_sent is None:
+            self.stop_sent = time.perf_counter()
+        pool = self.pool or socket_pool.default_pool()
+        try:
+            pool.send((self.device.ip, self.device.port), "TEST;CMD=STOP;".encode('latin-1'))
+        except OSError as e:
+            self.status_signal.emit(f"⚠️ Could not send STOP to {self.device}: {e}")
+        self.wake()    # so the loop starts timing the acknowledgement
+
+    def fail(self, error):
+        """
+            Ends the test because of an error on this side, e.g. a datagram that could not be
+            handled. STOP is sent from the test's pool socket so the device stops streaming, but
+            its acknowledgement is not waited for. The caller ends the receive loop.
+
+            :param error (str) Description of the error, kept in the error attribute.
+
+        """
+
+        self.error = error
+        self.running = False
+        if self.stop_sent is None:
+            self.stop_sent = time.perf_counter()
+            pool = self.pool or socket_pool.default_pool()
+            try:
+                pool.send((self.device.ip, self.device.port), "TEST;CMD=STOP;".encode('latin-1'))
+            except OSError:
+                pass    # the error that ends the test is reported instead
+
+    def cancel(self):
+        """
+            Ends the test locally without sending anything to the device, e.g. when the device has
+            rejected it or stopped answering. Returns immediately; finished_signal follows.
 
         """
 
         self.running = False
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.settimeout(2)
+        self.wake()
 
-        stop_msg = "TEST;CMD=STOP;".encode('latin-1')
-        sock.sendto(stop_msg, (self.device.ip, self.device.port))
+    def wake(self):
+        """
+            Wakes the receive loop driving this worker so it notices a stop or cancellation at once.
 
-        try:
-            data, addr = sock.recvfrom(constants.BUFFER_SIZE)
-            if addr[0] == self.device.ip:
-                message = data.decode('latin-1')
-                print(f"Stop response: {message}")
-                self.status_signal.emit(message)
-        except socket.timeout:
-            print("⚠️ No response received for STOP command.")
+        """
 
-        sock.close()
+        if self.engine is not None:
+            self.engine.wake()
+        elif self.inbox is not None:
+            self.inbox.put(_WAKE)
 
     def clear_data(self):
         """
@@ -123,4 +493,4 @@ class DeviceWorker(QObject):
 
         """
 
-        self.collected_data = []
+        self.collected_data.clear()
@@ -0,0 +1,64 @@
+from PyQt5.QtCore import pyqtSignal, QObject
+
+class DiscoveryWorker(QObject):
+    """
+        Worker class for running a device discovery scan in a background thread.
+
+        Each device is emitted as soon as its ID reply arrives, so the GUI can list devices while
+        the scan is still running instead of blocking until it ends.
+
+        :signal device_signal (pyqtSignal(object)) Emitted with each newly discovered Device.
+
+        :signal finished_signal (pyqtSignal(int)) Emitted when the scan ends, with the number of devices found.
+
+        :attributes manager (DeviceManager) Manager whose iter_discovery runs the scan.
+
+        :attributes timeout (int) Time in seconds to wait for the first device response.
+
+        :attributes expected_count (int or None) Number of devices after which the scan ends early.
+
+        :attributes expected_serials (list of str or None) Serial numbers after which the scan ends early.
+
+        :attributes running (bool) Flag indicating whether the scan is running; clear it to cancel the scan.
+
+    """
+
+    device_signal = pyqtSignal(object)
+    finished_signal = pyqtSignal(int)
+
+    def __init__(self, manager, timeout=2, expected_count=None, expected_serials=None):
+        super().__init__()
+        self.manager = manager
+        self.timeout = timeout
+        self.expected_count = expected_count
+        self.expected_serials = expected_serials
+        self.running = False
+
+    def run(self):
+        """
+            Runs the scan, emitting every device found, then emits finished_signal.
+
+        """
+
+        self.running = True
+        found = 0
+        scan = self.manager.iter_discovery(self.timeout, expected_count=self.expected_count,
+                                           expected_serials=self.expected_serials)
+        try:
+            for device in scan:
+                if not self.running:
+                    break
+                found += 1
+                self.device_signal.emit(device)
+        finally:
+            scan.close()
+            self.running = False
+            self.finished_signal.emit(found)
+
+    def stop(self):
+        """
+            Cancels the scan. It ends once the next reply or timeout is reached.
+
+        """
+
+        self.running = False
@@ -0,0 +1,190 @@
+import numpy as np
+
+def lttb(x, y, n_out):
+    """
+        Downsamples a series with the Largest-Triangle-Three-Buckets algorithm, which keeps
+        the points that contribute most to the visual shape of the line.
+
+        :param x (numpy.ndarray) Sample x values, in increasing order.
+        :param y (numpy.ndarray) Sample y values.
+        :param n_out (int) Number of points to keep.
+
+        :return (numpy.ndarray) Indices of the kept samples, in increasing order.
+    """
+
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # the first and last point are always kept, the rest is split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            c_x = x[hi:edges[i + 2]].mean()
+            c_y = y[hi:edges[i + 2]].mean()
+        else:
+            c_x, c_y = x[n - 1], y[n - 1]
+
+        # twice the area of the triangle (a, b, c) for every candidate b in the bucket
+        area = np.abs((x[a] - c_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (c_y - y[a]))
+        a = lo + int(area.argmax())
+        kept[i + 1] = a
+
+    return kept
+
+
+class MinMaxDecimator:
+    """
+        Incremental min/max decimation of a growing series for live plotting.
+
+        Samples are grouped into fixed-size buckets, and each bucket is drawn as its minimum
+        and maximum sample, which preserves spikes and the envelope of the signal. Completed
+        buckets are cached, so each update only processes the samples added since the last
+        one. When there are more than twice the target number of buckets, neighbouring
+        buckets are merged and the bucket size doubles, which keeps the output size and
+        the work per update bounded however long the test runs.
+
+        Buckets are aligned to absolute sample indices (counted from the first sample
+        appended), so the decimation stays valid when a ring buffer drops old samples.
+
+        :attribute target (int) Number of buckets to aim for, usually the plot width in pixels.
+
+        :attribute bucket_size (int) Number of samples per cached bucket.
+    """
+
+    def __init__(self, target=1000):
+        self.target = max(1, int(target))
+        self.reset()
+
+    def reset(self):
+        """
+            Drops every cached bucket, e.g. when the series is cleared or replaced.
+
+        """
+
+        self.bucket_size = 0
+        self.start = 0    # absolute index of the first cached bucket
+        self.done = 0     # absolute index following the last cached bucket
+        self.min_idx = np.empty(0, dtype=np.int64)
+        self.max_idx = np.empty(0, dtype=np.int64)
+        self.min_val = np.empty(0, dtype=np.float64)
+        self.max_val = np.empty(0, dtype=np.float64)
+
+    def set_target(self, target):
+        """
+            Changes the number of target buckets, dropping the cache if it changed.
+
+            :param target (int) Number of buckets to aim for.
+
+        """
+
+        target = max(1, int(target))
+        if target != self.target:
+            self.target = target
+            self.reset()
+
+    def update(self, values, first_index):
+        """
+            Brings the cache up to date with the series and returns the indices to draw.
+
+            :param values (numpy.ndarray) Every sample currently stored, oldest first.
+            :param first_index (int) Absolute index of values[0].
+
+            :return (numpy.ndarray) Absolute indices of the samples to draw, in increasing order.
+        """
+
+        n = len(values)
+        total = first_index + n
+        if total < self.done or n == 0:
+            self.reset()    # the series was cleared
+        if n == 0:
+            return np.empty(0, dtype=np.int64)
+
+        if self.bucket_size == 0:
+            size = 1
+            while size * self.target < n:
+                size *= 2
+            self.bucket_size = size
+            self.start = self.done = first_index
+
+        if first_index > self.start:
+            self._drop_before(first_index)
+
+        # decimate the complete buckets added since the last update in one vectorized pass
+        size = self.bucket_size
+        count = max(0, (total - self.done) // size)
+        if count:
+            offset = self.done - first_index
+            chunk = values[offset:offset + count * size].reshape(count, size)
+            lo = chunk.argmin(axis=1)
+            hi = chunk.argmax(axis=1)
+            rows = np.arange(count)
+            base = self.done + rows * size
+            self.min_idx = np.concatenate((self.min_idx, base + lo))
+            self.max_idx = np.concatenate((self.max_idx, base + hi))
+            self.min_val = np.concatenate((self.min_val, chunk[rows, lo]))
+            self.max_val = np.concatenate((self.max_val, chunk[rows, hi]))
+            self.done += count * size
+
+        while len(self.min_idx) > 2 * self.target:
+            self._merge()
+
+        # partial buckets before and after the cached ones are decimated on every update
+        parts = [self._extremes(values, first_index, first_index, min(self.start, total)),
+                 np.sort(np.stack((self.min_idx, self.max_idx), axis=1), axis=1).ravel(),
+                 self._extremes(values, first_index, self.done, total)]
+        return np.concatenate(parts)
+
+    def _extremes(self, values, first_index, lo, hi):
+        """
+            Returns the absolute indices of the minimum and maximum of values in [lo, hi).
+
+        """
+
+        if hi <= lo:
+            return np.empty(0, dtype=np.int64)
+        segment = values[lo - first_index:hi - first_index]
+        a, b = lo + int(segment.argmin()), lo + int(segment.argmax())
+        return np.array(sorted({a, b}), dtype=np.int64)
+
+    def _drop_before(self, first_index):
+        """
+            Drops cached buckets that start before first_index because the samples were evicted.
+
+        """
+
+        skip = -(-(first_index - self.start) // self.bucket_size)
+        drop = min(skip, len(self.min_idx))
+        self.min_idx, self.max_idx = self.min_idx[drop:], self.max_idx[drop:]
+        self.min_val, self.max_val = self.min_val[drop:], self.max_val[drop:]
+        self.start += skip * self.bucket_size
+        self.done = max(self.done, self.start)
+
+    def _merge(self):
+        """
+            Merges neighbouring cached buckets pairwise and doubles the bucket size.
+
+        """
+
+        pairs = len(self.min_idx) // 2
+        if len(self.min_idx) % 2:
+            # the unpaired last bucket is recomputed with the new bucket size on the next update
+            self.done -= self.bucket_size
+
+        def merge(idx, val, pick_first):
+            idx, val = idx[:2 * pairs].reshape(pairs, 2), val[:2 * pairs].reshape(pairs, 2)
+            col = np.where(pick_first(val[:, 0], val[:, 1]), 0, 1)
+            rows = np.arange(pairs)
+            return idx[rows, col], val[rows, col]
+
+        self.min_idx, self.min_val = merge(self.min_idx, self.min_val, np.less_equal)
+        self.max_idx, self.max_val = merge(self.max_idx, self.max_val, np.greater_equal)
+        self.bucket_size *= 2
@@ -0,0 +1,296 @@
+"""
+    Runs device tests from the command line, without the GUI or a display.
+
+    Discovers devices, runs one test on each selected device at the same time from a single
+    ReceiveEngine thread, or spread over several shard processes with --processes, streams
+    every device's samples to a recording file and prints one JSON summary line per device to
+    stdout. Progress messages go to stderr. PyQt5 is not needed: without it the workers' signals
+    are plain callbacks, see signals.py.
+
+    Usage: python3 headless_runner.py [--count N | --serials S1,S2,...] --duration S --rate MS [--output-dir DIR]
+                                      [--processes N]
+
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+
+import constants
+from device_manager import DeviceManager
+from device_worker import DeviceWorker
+from receive_engine import ReceiveEngine
+from shard_pool import ShardPool, ShardedWorker, ShardRecording
+from signals import DirectConnection
+
+class TestSummary:
+    """
+        Results of one device's test, accumulated from the worker's sample blocks.
+
+        :attribute device (Device) Device under test.
+
+        :attribute recording (str or None) Path of the recording file.
+
+        :attribute result (str) "running", then "completed", "stopped", "alarm", "error" or "no_response".
+
+        :attribute samples (int) Number of data points received.
+
+        :attribute error (str or None) Error reply of the device, or error that ended the test, if any.
+
+        :attribute alarm (str or None) Monitoring rule violation that raised an alarm during the test, if any.
+
+        :attribute stream (dict or None) Stream health statistics of the test, see StreamStats.to_dict.
+    """
+
+    def __init__(self, device, recording=None):
+        self.device = device
+        self.recording = recording
+        self.result = "running"
+        self.samples = 0
+        self.messages = 0
+        self.first_time_ms = None
+        self.last_time_ms = None
+        self.mv_min = self.mv_max = None
+        self.ma_min = self.ma_max = None
+        self.error = None
+        self.alarm = None
+        self.stream = None
+        self.idle = False
+        self.stop_sent = False
+        self.started = time.monotonic()
+        self.ended = None
+
+    def add_block(self, block):
+        """
+            Adds a block of status messages and data points to the summary.
+
+            :param block (SampleBlock) Block emitted by the worker.
+
+        """
+
+        self.messages += len(block.status_lines)
+        for line in block.text_lines():
+            if line.startswith("TEST;RESULT=ERROR") or line.startswith("ERR;"):
+                self.error = line
+            elif "STATE=IDLE" in line:
+                self.idle = True
+
+        n = len(block)
+        if not n:
+            return
+        if self.first_time_ms is None:
+            self.first_time_ms = block.time_ms[0]
+        self.last_time_ms = block.time_ms[-1]
+        self.samples += n
+        self.mv_min = min(block.mv) if self.mv_min is None else min(self.mv_min, min(block.mv))
+        self.mv_max = max(block.mv) if self.mv_max is None else max(self.mv_max, max(block.mv))
+        self.ma_min = min(block.ma) if self.ma_min is None else min(self.ma_min, min(block.ma))
+        self.ma_max = max(block.ma) if self.ma_max is None else max(self.ma_max, max(block.ma))
+
+    def finish(self):
+        """
+            Records the end of the test and decides its result.
+
+        """
+
+        self.ended = time.monotonic()
+        if self.error is not None:
+            self.result = "error"
+        elif self.alarm is not None:
+            self.result = "alarm"
+        elif self.idle:
+            self.result = "completed"
+        elif self.stop_sent:
+            self.result = "stopped"
+        else:
+            self.result = "no_response"
+
+    def to_dict(self):
+        """
+            Returns the summary as a JSON-serializable dict.
+
+        """
+
+        return {
+            "serial": self.device.serial,
+            "model": self.device.model,
+            "ip": self.device.ip,
+            "port": self.device.port,
+            "result": self.result,
+            "error": self.error,
+            "alarm": self.alarm,
+            "samples": self.samples,
+            "messages": self.messages,
+            "first_time_ms": self.first_time_ms,
+            "last_time_ms": self.last_time_ms,
+            "mv_min": self.mv_min,
+            "mv_max": self.mv_max,
+            "ma_min": self.ma_min,
+            "ma_max": self.ma_max,
+            "wall_time_s": round((self.ended or time.monotonic()) - self.started, 3),
+            "stream": self.stream,
+            "recording": self.recording,
+        }
+
+
+def run_tests(manager, devices, duration, rate, output_dir=None, batch_interval_ms=100, grace=5, processes=0):
+    """
+        Runs one test on every device at once and waits for all of them to end.
+
+        Tests that have not ended grace seconds after their duration (e.g. because the final IDLE
+        message was lost) are stopped with a STOP command. Ctrl+C stops every running test.
+
+        :param manager (DeviceManager) Manager used to create the recording files.
+        :param devices (list of Device) Devices to test.
+        :param duration (int) Test duration in seconds.
+        :param rate (int) Status rate in milliseconds.
+        :param output_dir (str, optional) Directory for the recording files, or None to not record.
+        :param batch_interval_ms (int) Interval at which the workers hand over received data.
+        :param grace (float) Seconds to wait past the duration before stopping a test.
+        :param processes (int) Number of shard processes to spread the tests over, or 0 to run them in this process.
+
+        :return (list of TestSummary) One summary per device, in the order of devices.
+    """
+
+    # the summary is computed from the blocks, so only a small window is kept in memory; a ring
+    # only has to hold the samples a shard writes before this process has copied them out
+    engine = ShardPool(processes, samples=4096) if processes else ReceiveEngine()
+    done = threading.Semaphore(0)
+    workers = []
+    summaries = []
+
+    for device in devices:
+        if processes:
+            path = manager.recording_path(device.serial, output_dir) if output_dir else None
+            recorder = ShardRecording(path) if path is not None else None
+            worker = ShardedWorker(device, duration, rate, engine.ring(device.serial),
+                                   batch_interval_ms=batch_interval_ms, recorder=recorder)
+        else:
+            recorder = manager.create_recorder(device.serial, output_dir) if output_dir else None
+            worker = DeviceWorker(device, duration=duration, rate=rate, batch_interval_ms=batch_interval_ms,
+                                  recorder=recorder, history_samples=1)
+        summary = TestSummary(device, recorder.path if recorder is not None else None)
+
+        def on_block(block, worker=worker, summary=summary):
+            summary.add_block(block)
+            if summary.error is not None and worker.running:
+                worker.cancel()    # the device rejected the test, nothing more will arrive
+
+        def on_alarm(alarm, device=device):
+            print(f"🚨 {device.serial}: {alarm}", file=sys.stderr)
+
+        def on_status(message, device=device):
+            print(f"{device.serial}: {message}", file=sys.stderr)    # only problems to log, the device's messages come in blocks
+
+        def on_finished(worker=worker, summary=summary):
+            summary.error = summary.error or worker.error
+            summary.alarm = worker.alarm
+            summary.stream = worker.stats.to_dict()
+            summary.finish()
+            done.release()
+
+        # no Qt event loop runs here, so slots are called directly on the engine (or shard listener) thread
+        worker.block_signal.connect(on_block, DirectConnection)
+        worker.alarm_signal.connect(on_alarm, DirectConnection)
+        worker.status_signal.connect(on_status, DirectConnection)
+        worker.finished_signal.connect(on_finished, DirectConnection)
+        workers.append(worker)
+        summaries.append(summary)
+
+    engine.submit_batch(workers)
+
+    deadline = time.monotonic() + duration + grace
+    finished = 0
+    try:
+        while finished < len(workers) and done.acquire(timeout=max(0, deadline - time.monotonic())):
+            finished += 1
+    except KeyboardInterrupt:
+        print("Interrupted, stopping every running test.", file=sys.stderr)
+
+    stop_tests(engine, [(w, s) for w, s in zip(workers, summaries) if w.running])
+    while finished < len(workers) and done.acquire(timeout=constants.STOP_ACK_TIMEOUT_MS / 1000 + 1):
+        finished += 1
+
+    engine.shutdown()
+    for worker in workers:
+        if worker.recorder is not None:
+            worker.recorder.close()
+    return summaries
+
+
+def stop_tests(engine, running):
+    """
+        Sends STOP to every still running test, back to back from the engine thread.
+
+        :param engine (ReceiveEngine or ShardPool) Engine running the tests.
+        :param running (list of (DeviceWorker, TestSummary)) Workers to stop and their summaries.
+
+    """
+
+    for worker, summary in running:
+        summary.stop_sent = True
+    engine.stop_batch([worker for worker, _ in running])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Runs device tests from the command line, without the GUI.")
+    select = parser.add_mutually_exclusive_group()
+    select.add_argument("--count", type=int, help="number of devices to test (default: every device found)")
+    select.add_argument("--serials", help="comma-separated serial numbers of the devices to test")
+    parser.add_argument("--duration", type=int, required=True, help="test duration in seconds")
+    parser.add_argument("--rate", type=int, required=True, help="status rate in milliseconds")
+    parser.add_argument("--output-dir", default=constants.RECORD_DIR or "recordings",
+                        help="directory for the sample recordings (default: %(default)s)")
+    parser.add_argument("--no-record", action="store_true", help="do not write sample recordings")
+    parser.add_argument("--discovery-timeout", type=float, default=2,
+                        help="seconds to wait for the first device to answer discovery (default: %(default)s)")
+    parser.add_argument("--batch-ms", type=int, default=100,
+                        help="interval at which received data is handed over, in milliseconds (default: %(default)s)")
+    parser.add_argument("--grace", type=float, default=5,
+                        help="seconds past the duration after which unfinished tests are stopped (default: %(default)s)")
+    parser.add_argument("--processes", type=int, default=constants.SHARD_PROCESSES,
+                        help="spread the tests over this many processes, 0 runs them in this one (default: %(default)s)")
+    parser.add_argument("--summary", help="write the JSON summaries to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    serials = args.serials.split(',') if args.serials else None
+    manager = DeviceManager()
+    found = manager.discover_devices(args.discovery_timeout, expected_count=args.count, expected_serials=serials)
+    if serials:
+        devices = [manager.devices.get(s) for s in serials if s in manager.devices]
+        missing = [s for s in serials if s not in manager.devices]
+        if missing:
+            print(f"⚠️ Devices not found: {', '.join(missing)}", file=sys.stderr)
+    else:
+        devices = list(found)[:args.count] if args.count else list(found)
+
+    if not devices:
+        print("No devices found.", file=sys.stderr)
+        return 1
+
+    print(f"Testing {len(devices)} device(s): {args.duration}s @ {args.rate}ms", file=sys.stderr)
+    stdout, sys.stdout = sys.stdout, sys.stderr    # keep stdout for the summaries only
+    try:
+        summaries = run_tests(manager, devices, args.duration, args.rate,
+                              output_dir=None if args.no_record else args.output_dir,
+                              batch_interval_ms=args.batch_ms, grace=args.grace, processes=args.processes)
+    finally:
+        sys.stdout = stdout
+
+    out = open(args.summary, "w") if args.summary else sys.stdout
+    try:
+        for summary in summaries:
+            out.write(json.dumps(summary.to_dict()) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    results = [s.result for s in summaries]
+    print(", ".join(f"{results.count(r)} {r}" for r in sorted(set(results))), file=sys.stderr)
+    return 0 if all(r == "completed" for r in results) else 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,114 @@
+import constants
+
+def rules_for(model):
+    """
+        Returns the online monitoring rules of a device model, see constants.MONITOR_RULES. Models
+        without their own entry use the "default" entry; keys missing from a model's entry are taken from it too.
+
+        :param model (str) Model of the device.
+
+    """
+
+    rules = dict(constants.MONITOR_RULES.get("default", {}))
+    if model != "default":
+        rules.update(constants.MONITOR_RULES.get(model, {}))
+    return rules
+
+
+class ChannelMonitor:
+    """
+        Smoothed value of one channel (mV or mA), updated in O(1) per sample: an exponentially
+        weighted moving average (EWMA) and its rate of change.
+
+        :attribute ewma (float or None) Smoothed value, None before the first sample.
+
+        :attribute rate (float) Rate of change of the smoothed value, in units per second.
+    """
+
+    def __init__(self, alpha):
+        self.alpha = alpha
+        self.ewma = None
+        self.rate = 0.0
+
+    def add(self, value, dt_ms):
+        """
+            Adds one sample.
+
+            :param value (float) The sample.
+            :param dt_ms (float) Time since the previous sample, in milliseconds.
+
+        """
+
+        if self.ewma is None:
+            self.ewma = value
+            return
+        previous = self.ewma
+        self.ewma += self.alpha * (value - previous)
+        if dt_ms > 0:
+            self.rate = 1000 * (self.ewma - previous) / dt_ms
+
+
+class LimitMonitor:
+    """
+        Checks a device's samples against limit and rate-of-change rules as they arrive, in
+        constant time per sample, so a failing part can be stopped long before the end of its test.
+
+        The rules apply to the EWMA-smoothed values, so a single noisy sample does not raise an
+        alarm, and are only evaluated once grace_ms of test time have passed.
+
+        :attribute rules (dict) Rules of the device's model, see constants.MONITOR_RULES.
+
+        :attribute mv (ChannelMonitor) Smoothed voltage.
+
+        :attribute ma (ChannelMonitor) Smoothed current.
+
+        :attribute alarm (str or None) The first rule violated, None while every rule holds.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        alpha = rules.get("ewma_alpha") or 1.0
+        self.mv = ChannelMonitor(alpha)
+        self.ma = ChannelMonitor(alpha)
+        self.alarm = None
+        self.last_time_ms = None
+
+        # the rules as (name, channel, low, high, max rate) tuples, so add() only loops over the enabled ones
+        self.checks = []
+        for name, channel in (("mV", self.mv), ("mA", self.ma)):
+            low, high = rules.get(name.lower()) or (None, None)
+            max_rate = rules.get(f"max_{name.lower()}_rate")
+            if low is not None or high is not None or max_rate is not None:
+                self.checks.append((name, channel, low, high, max_rate))
+        self.grace_ms = rules.get("grace_ms") or 0
+
+    def add(self, time_ms, mv, ma):
+        """
+            Adds one sample and evaluates the rules.
+
+            :param time_ms (int) Time of the sample in milliseconds.
+            :param mv (float) Voltage in millivolts.
+            :param ma (float) Current in milliamps.
+
+            :return (str or None) Description of the violated rule when this sample raises the alarm, otherwise None.
+        """
+
+        dt_ms = time_ms - self.last_time_ms if self.last_time_ms is not None else 0
+        self.last_time_ms = time_ms
+        self.mv.add(mv, dt_ms)
+        self.ma.add(ma, dt_ms)
+
+        if self.alarm is not None or time_ms < self.grace_ms:
+            return None
+        for name, channel, low, high, max_rate in self.checks:
+            value = channel.ewma
+            if low is not None and value < low:
+                self.alarm = f"{name} {value:.1f} below {low} at {time_ms} ms"
+            elif high is not None and value > high:
+                self.alarm = f"{name} {value:.1f} above {high} at {time_ms} ms"
+            elif max_rate is not None and abs(channel.rate) > max_rate:
+                self.alarm = f"{name} changing {channel.rate:+.1f}/s, limit {max_rate}/s, at {time_ms} ms"
+            else:
+                continue
+            return self.alarm
+        return None
@@ -0,0 +1,221 @@
+from array import array
+
+import status_parser
+
+class LogBuffer:
+    """
+        Log lines of one device, optionally capped to a scrollback size.
+
+        STATUS data points, which make up nearly all of a test's log, are not kept as strings:
+        each is a compact record of its record format, TIME, MV and MA values in typed arrays,
+        25 bytes instead of a string object of around 90. Other lines are kept as text. Records
+        are only rendered back to text when a line is read, e.g. by the log view for the rows
+        on screen or when the log is saved.
+
+        With a capacity the lines are kept in a fixed-size ring: appending to a full buffer
+        overwrites the oldest line, so the memory use stays constant during long tests.
+        Lines are addressed oldest first, and indexing is O(1) in both modes.
+
+        :attribute capacity (int or None) Maximum number of lines kept, or None to keep every line.
+
+        :attribute total (int) Number of lines appended since the buffer was created. It is not reset by
+        clear(), so views can tell how many lines were added or dropped since they last looked.
+    """
+
+    def __init__(self, capacity=None):
+        self.capacity = capacity
+        self.total = 0
+        self.clear()
+
+    def clear(self):
+        """
+            Removes every line.
+
+        """
+
+        # the columns grow as lines are appended; with a capacity they wrap around once full
+        self._formats = array('B')    # record format of each line, 0 for a text line
+        self._time = array('q')
+        self._mv = array('d')
+        self._ma = array('d')
+        self._text = {}    # text lines by line number (counted from the first line appended)
+        self._base = self.total    # index of the first line appended after the last clear
+
+    def __len__(self):
+        if self.capacity:
+            return min(self.total - self._base, self.capacity)
+        return self.total - self._base
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("log line index out of range")
+        number = self.first_index + i
+        slot = (number - self._base) % self.capacity if self.capacity else number - self._base
+        fmt = self._formats[slot]
+        if not fmt:
+            return self._text[number]
+        return status_parser.format_record(self._time[slot], self._mv[slot], self._ma[slot], fmt)
+
+    def __iter__(self):
+        # walks the columns directly, saving a long log renders each line once and nothing else
+        templates = status_parser.RECORD_TEMPLATES
+        formats, times, mvs, mas, text = self._formats, self._time, self._mv, self._ma, self._text
+        first, base = self.first_index, self._base
+        for number in range(first, first + len(self)):
+            slot = (number - base) % self.capacity if self.capacity else number - base
+            fmt = formats[slot]
+            yield templates[fmt] % (times[slot], mvs[slot], mas[slot]) if fmt else text[number]
+
+    @property
+    def first_index(self):
+        """
+            Index (counted from the first line appended) of the oldest line still kept.
+
+        """
+
+        return self.total - len(self)
+
+    def _store(self, fmt, time_ms, mv, ma):
+        """
+            Stores the columns of the next line and returns its line number.
+
+        """
+
+        number = self.total
+        offset = number - self._base
+        if self.capacity and offset >= self.capacity:
+            slot = offset % self.capacity
+            self._text.pop(number - self.capacity, None)    # the line being overwritten
+            self._formats[slot] = fmt
+            self._time[slot] = time_ms
+            self._mv[slot] = mv
+            self._ma[slot] = ma
+        else:
+            self._formats.append(fmt)
+            self._time.append(time_ms)
+            self._mv.append(mv)
+            self._ma.append(ma)
+        self.total += 1
+        return number
+
+    def _store_columns(self, formats, time_ms, mv, ma):
+        """
+            Stores the columns of the next len(formats) lines, which are all records.
+
+        """
+
+        n = len(formats)
+        capacity = self.capacity
+        grow = n if not capacity else min(n, capacity - len(self._formats))
+        if grow > 0:
+            self._formats.extend(formats[:grow])
+            self._time.extend(time_ms[:grow])
+            self._mv.extend(mv[:grow])
+            self._ma.extend(ma[:grow])
+        if grow == n:
+            self.total += n
+            return
+
+        if self._text:
+            for number in range(max(self._base, self.total - capacity), self.total + n - capacity):
+                self._text.pop(number, None)    # the lines being overwritten
+        i = max(grow, n - capacity)    # lines that would be overwritten within this batch are skipped
+        number = self.total + i
+        while i < n:
+            slot = (number - self._base) % capacity
+            count = min(n - i, capacity - slot)
+            self._formats[slot:slot + count] = formats[i:i + count]
+            self._time[slot:slot + count] = time_ms[i:i + count]
+            self._mv[slot:slot + count] = mv[i:i + count]
+            self._ma[slot:slot + count] = ma[i:i + count]
+            i += count
+            number += count
+        self.total += n
+
+    def append(self, line):
+        """
+            Appends a line, dropping the oldest one if the buffer is full.
+
+            :param line (string) Log entry to append.
+
+        """
+
+        self._text[self._store(0, 0, 0.0, 0.0)] = line
+
+    def append_record(self, time_ms, mv, ma, fmt):
+        """
+            Appends a STATUS data point as a compact record, dropping the oldest line if the buffer is full.
+
+            :param time_ms (int) Time in milliseconds.
+            :param mv (float) Voltage in millivolts.
+            :param ma (float) Current in milliamps.
+            :param fmt (int) Nonzero record format from status_parser.parse_record.
+
+        """
+
+        self._store(fmt, time_ms, mv, ma)
+
+    def extend(self, lines):
+        """
+            Appends several lines in order.
+
+            :param lines (iterable of string) Log entries to append.
+
+        """
+
+        for line in lines:
+            self.append(line)
+
+    def extend_block(self, block):
+        """
+            Appends the status messages of a worker's SampleBlock in order, the data points the
+            worker marked as reproducible as compact records and every other message as text.
+
+            :param block (SampleBlock) Block emitted by a DeviceWorker.
+
+        """
+
+        time_ms, mv, ma = block.time_ms, block.mv, block.ma
+        formats = block.log_formats
+        if len(formats) == len(time_ms) and not formats.count(0):
+            # every message is a data point record, in sample order: copy the columns as they are
+            self._store_columns(formats, time_ms, mv, ma)
+            return
+        text = block.text
+        for i, (fmt, sample) in enumerate(zip(formats, block.log_samples)):
+            if fmt:
+                self._store(fmt, time_ms[sample], mv[sample], ma[sample])
+            else:
+                self.append(text[i])
+
+    def copy(self):
+        """
+            Returns a copy of the buffer, e.g. to render and save it from another thread while
+            lines keep being appended. The columns are copied without rendering any line.
+
+        """
+
+        other = LogBuffer.__new__(LogBuffer)
+        other.capacity = self.capacity
+        other.total = self.total
+        other._base = self._base
+        other._formats = array('B', self._formats)
+        other._time = array('q', self._time)
+        other._mv = array('d', self._mv)
+        other._ma = array('d', self._ma)
+        other._text = dict(self._text)
+        return other
+
+    def nbytes(self):
+        """
+            Returns the approximate memory used by the lines, in bytes.
+
+        """
+
+        columns = sum(a.buffer_info()[1] * a.itemsize for a in (self._formats, self._time, self._mv, self._ma))
+        return columns + sum(64 + len(line) for line in self._text.values())
@@ -0,0 +1,120 @@
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex
+from PyQt5.QtWidgets import QListView, QAbstractItemView
+
+class LogModel(QAbstractListModel):
+    """
+        List model presenting a device's LogBuffer to a view.
+
+        The model does not copy the lines. It remembers which range of the buffer it has
+        announced to the view, and on refresh only reports the rows appended or evicted
+        since then, so keeping the view up to date costs O(new lines) instead of O(log size).
+
+        :attribute buffer (LogBuffer or None) Log buffer being shown.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.buffer = None
+        self._first = 0    # buffer index of the line shown in row 0
+        self._rows = 0
+
+    def set_buffer(self, buffer):
+        """
+            Shows a different log buffer, resetting the view.
+
+            :param buffer (LogBuffer or None) Log buffer to show, or None to show nothing.
+
+        """
+
+        self.beginResetModel()
+        self.buffer = buffer
+        self._first = buffer.first_index if buffer is not None else 0
+        self._rows = len(buffer) if buffer is not None else 0
+        self.endResetModel()
+
+    def refresh(self):
+        """
+            Reports the lines appended to and evicted from the buffer since the last refresh.
+
+        """
+
+        if self.buffer is None:
+            return
+
+        first, total = self.buffer.first_index, self.buffer.total
+
+        evicted = min(first - self._first, self._rows)
+        if evicted > 0:
+            self.beginRemoveRows(QModelIndex(), 0, evicted - 1)
+            self._rows -= evicted
+            self._first += evicted
+            self.endRemoveRows()
+        if self._rows == 0:
+            self._first = first
+
+        added = total - (self._first + self._rows)
+        if added > 0:
+            self.beginInsertRows(QModelIndex(), self._rows, self._rows + added - 1)
+            self._rows += added
+            self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._rows
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid() or self.buffer is None:
+            return None
+        i = self._first + index.row() - self.buffer.first_index
+        if not 0 <= i < len(self.buffer):
+            return None
+        return self.buffer[i]
+
+
+class LogView(QListView):
+    """
+        Read-only log display backed by a LogModel.
+
+        Every row has the same height, so the view only lays out and paints the rows that
+        are visible, however many lines the log holds. The view follows new lines while it
+        is scrolled to the bottom.
+
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.log_model = LogModel(self)
+        self.setModel(self.log_model)
+        self.setUniformItemSizes(True)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+
+    def show_log(self, buffer):
+        """
+            Displays a log buffer. Showing the buffer already on display only adds its new lines.
+
+            :param buffer (LogBuffer or None) Log buffer to show, or None to clear the view.
+
+        """
+
+        scrollbar = self.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum()
+
+        if buffer is self.log_model.buffer:
+            self.log_model.refresh()
+        else:
+            self.log_model.set_buffer(buffer)
+            at_bottom = True
+
+        if at_bottom:
+            self.scrollToBottom()
+
+    def clear(self):
+        """
+            Clears the view without touching any log buffer.
+
+        """
+
+        self.log_model.set_buffer(None)
@@ -1,20 +1,36 @@
 import sys
 import os
+import fnmatch
+import multiprocessing
 import threading
+import time
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QPushButton, QLabel,
-    QHBoxLayout, QTextEdit, QSizePolicy, QFileDialog, QLineEdit,
+    QHBoxLayout, QSizePolicy, QFileDialog, QLineEdit,
     QFormLayout, QMessageBox, QTableWidget, QTableWidgetItem, QHeaderView,
-    QSplitter, QGroupBox, QScrollArea
+    QSplitter, QGroupBox, QScrollArea, QTabWidget, QDialog
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QColor
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.backends.backend_qt5 import NavigationToolbar2QT as NavigationToolbar
-from matplotlib.figure import Figure
 
+import constants
 from device_worker import DeviceWorker
-from device_manager import DeviceManager
+from device_manager import DeviceManager, run_result
+from discovery_worker import DiscoveryWorker
+from receive_engine import ReceiveEngine
+from shard_pool import ShardPool, ShardedWorker, ShardRecording
+from downsample import MinMaxDecimator, lttb
+from log_view import LogView
+from render_scheduler import RenderScheduler
+import plot_backends
+from dashboard import Dashboard
+from startup_timing import StartupTimer
+from archive_browser import ArchiveBrowser
+from test_analytics import analyze_run
+from bulk_export import ExportWorker, export_jobs
+
+startup = StartupTimer(budget=constants.STARTUP_BUDGET_MS, report=constants.STARTUP_REPORT)
+startup.mark("imports")
 
 class MainWindow(QWidget):
     def __init__(self):
@@ -27,6 +43,11 @@ class MainWindow(QWidget):
         container_layout = QVBoxLayout(container)
 
         self.manager = DeviceManager()
+        self.engine = ReceiveEngine() if constants.USE_RECEIVE_ENGINE else None
+        # the processes are spawned once the window has been painted
+        self.shards = ShardPool(constants.SHARD_PROCESSES, self.manager.plot_history_samples()) \
+            if constants.SHARD_PROCESSES else None
+        self.discovery_worker = None
 
         # === Discover Devices ===
         discover_layout = QHBoxLayout()
@@ -47,8 +68,9 @@ class MainWindow(QWidget):
         self.device_table.setMaximumHeight(120)
         self.device_table.itemSelectionChanged.connect(self.on_discovered_selection_changed)
 
-        self.running_table = QTableWidget(0, 5)
-        self.running_table.setHorizontalHeaderLabels(["Model", "Serial", "IP", "Port", "Status"])
+        self.running_table = QTableWidget(0, 8)
+        self.running_table.setHorizontalHeaderLabels(["Model", "Serial", "IP", "Port", "Status",
+                                                      "Rate (/s)", "Jitter (ms)", "Missed"])
         self.running_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.running_table.setSelectionBehavior(QTableWidget.SelectRows)
         self.running_table.setSelectionMode(QTableWidget.SingleSelection)
@@ -106,13 +128,26 @@ class MainWindow(QWidget):
         control_btn_layout.addWidget(self.start_button)
         control_btn_layout.addWidget(self.stop_button)
 
+        # Batch controls acting on every device in test (optionally filtered by serial)
+        batch_btn_layout = QHBoxLayout()
+        self.start_all_button = QPushButton("Start All")
+        self.stop_all_button = QPushButton("Stop All")
+        self.start_all_button.setEnabled(False)
+        self.stop_all_button.setEnabled(False)
+        batch_btn_layout.addWidget(self.start_all_button)
+        batch_btn_layout.addWidget(self.stop_all_button)
+
         form_layout = QFormLayout()
         self.duration_input = QLineEdit("10")
         self.rate_input = QLineEdit("1000")
         form_layout.addRow("Test Duration (s):", self.duration_input)
         form_layout.addRow("Status Rate (ms):", self.rate_input)
+        self.serial_filter_input = QLineEdit()
+        self.serial_filter_input.setPlaceholderText("All devices (wildcards * and ? allowed)")
+        form_layout.addRow("Start/Stop All Filter:", self.serial_filter_input)
 
         test_control_layout.addLayout(control_btn_layout)
+        test_control_layout.addLayout(batch_btn_layout)
         test_control_layout.addLayout(form_layout)
         test_control_group.setLayout(test_control_layout)
         container_layout.addWidget(test_control_group)
@@ -134,32 +169,45 @@ class MainWindow(QWidget):
         plot_container = QWidget()
         plot_layout = QVBoxLayout(plot_container)
 
-        self.figure = Figure(figsize=(6, 2.2), tight_layout=True)
-        self.canvas = FigureCanvas(self.figure)
-        self.toolbar = NavigationToolbar(self.canvas, self)
+        # The live plot is created by ensure_plot once the window has been painted, so that
+        # loading the plotting stack does not delay the first paint; this holds its place
+        self.plot = None
+        self.toolbar = None
+        self.plot_layout = plot_layout
+        self.plot_placeholder = QWidget()
+        self.plot_placeholder.setFixedHeight(220)
+
+        # Data currently shown in the plot and the axis limits it was last scaled to
+        self.plot_serial = None
+        self.plot_limits = None
+        self.archived_run = None    # ArchivedRun shown instead of a device's data, if any
 
-        # Main axis for voltage (mV)
-        self.ax = self.figure.add_subplot(111)
-        self.ax.set_title("Live Test Data")
-        self.ax.set_xlabel("Time (ms)")
-        self.ax.set_ylabel("mV", color='b')
-        self.ax.tick_params(axis='y', colors='b')
+        # Long live tests are decimated to about one min/max pair per pixel of plot width
+        self.mv_decimator = MinMaxDecimator()
+        self.ma_decimator = MinMaxDecimator()
 
-        # Twin axis for current (mA)
-        self.ax2 = self.ax.twinx()
-        self.ax2.set_ylabel("mA", color='r')
-        self.ax2.tick_params(axis='y', colors='r')
-        self.canvas.setMaximumHeight(300)
-        self.canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        # Live updates of every plot are coalesced into at most one redraw per plot and frame
+        self.render_scheduler = RenderScheduler(constants.PLOT_FRAME_MS, constants.RENDER_BUDGET_MS, self)
 
-        plot_layout.addWidget(self.toolbar)
-        plot_layout.addWidget(self.canvas)
+        # Stream health columns of running tests are refreshed periodically, not per sample
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setInterval(constants.STATS_REFRESH_MS)
+        self.stats_timer.timeout.connect(self.update_stats_columns)
+        self.stats_timer.start()
+
+        plot_layout.addWidget(self.plot_placeholder)
 
         graph_btn_layout = QHBoxLayout()
         self.save_graph_button = QPushButton("Save Graph")
         self.clear_graph_button = QPushButton("Clear Graph")
+        self.open_archive_button = QPushButton("Open Archived Run...")
+        self.open_archive_button.setEnabled(self.manager.archive is not None)
         graph_btn_layout.addWidget(self.save_graph_button)
         graph_btn_layout.addWidget(self.clear_graph_button)
+        graph_btn_layout.addWidget(self.open_archive_button)
+        self.export_all_button = QPushButton("Export All...")
+        graph_btn_layout.addWidget(self.export_all_button)
+        self.export_worker = None
         plot_layout.addLayout(graph_btn_layout)
 
         plot_container.setMinimumHeight(140)
@@ -168,8 +216,7 @@ class MainWindow(QWidget):
         # Log container
         log_container = QWidget()
         log_layout = QVBoxLayout(log_container)
-        self.log_output = QTextEdit()
-        self.log_output.setReadOnly(True)
+        self.log_output = LogView()
         self.log_output.setMinimumHeight(100)
         log_layout.addWidget(self.log_output)
 
@@ -179,16 +226,30 @@ class MainWindow(QWidget):
 
         splitter.setStretchFactor(0, 2)
         splitter.setStretchFactor(1, 1)
-        output_group_layout.addWidget(splitter)
+
+        # Small plots of every device in test, side by side
+        self.dashboard = Dashboard(self.manager, self.render_scheduler, constants.DASHBOARD_COLUMNS)
+        dashboard_scroll = QScrollArea()
+        dashboard_scroll.setWidgetResizable(True)
+        dashboard_scroll.setWidget(self.dashboard)
+
+        self.output_tabs = QTabWidget()
+        self.output_tabs.addTab(splitter, "Selected Device")
+        self.output_tabs.addTab(dashboard_scroll, "All Devices")
+        output_group_layout.addWidget(self.output_tabs)
         output_group.setLayout(output_group_layout)
         container_layout.addWidget(output_group)
 
         # === Connect signals ===
         self.start_button.clicked.connect(self.on_start)
         self.stop_button.clicked.connect(self.on_stop)
+        self.start_all_button.clicked.connect(self.on_start_all)
+        self.stop_all_button.clicked.connect(self.on_stop_all)
         self.save_log_button.clicked.connect(self.save_log)
         self.clear_graph_button.clicked.connect(self.clear_graph)
         self.save_graph_button.clicked.connect(self.save_graph)
+        self.open_archive_button.clicked.connect(self.open_archived_run)
+        self.export_all_button.clicked.connect(self.on_export_all)
 
         self.set_controls_enabled(False)
         self.clear_graph_button.setEnabled(False)
@@ -202,36 +263,132 @@ class MainWindow(QWidget):
         outer_layout = QVBoxLayout(self)
         outer_layout.addWidget(scroll)
 
+        startup.mark("window_created")
+
+    def closeEvent(self, event):
+        """
+            Ends the tests running on the receive engine or in shard processes, if any, frees
+            their shared memory and closes the recordings that are still open, so the
+            application can exit while tests are running.
+
+        """
+
+        if self.engine is not None:
+            self.engine.shutdown()
+        if self.shards is not None:
+            self.shards.shutdown()
+        for worker in self.manager.workers.values():
+            if worker.recorder is not None:
+                worker.recorder.close(wait=False)    # written out by close_all() at exit
+        super().closeEvent(event)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.plot is None and "first_paint" not in startup.marks:
+            startup.mark("first_paint")
+            # the rest of the startup work runs once this paint has reached the screen; the scan
+            # goes first, its replies are collected in the background while the plot is created
+            if constants.SCAN_ON_STARTUP:
+                QTimer.singleShot(0, self.on_discover)
+            QTimer.singleShot(0, self.ensure_plot)
+            if self.shards is not None:
+                # the shard processes load in the background, so the first Start All does not wait for them
+                QTimer.singleShot(0, self.shards.start)
+
+    def ensure_plot(self):
+        """
+            Creates the live plot, and loads the plotting backend, if that has not happened yet.
+            Called after the first paint of the window, or earlier when something needs the plot.
+
+        """
+
+        if self.plot is not None:
+            return
+
+        # Live plot, drawn by the backend chosen in constants.PLOT_BACKEND
+        self.plot = plot_backends.create_plot(constants.PLOT_BACKEND)
+        self.plot.set_title("Live Test Data")
+        self.plot.set_has_data(False)
+        self.plot.setMaximumHeight(300)
+        self.plot.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+
+        self.plot_layout.replaceWidget(self.plot_placeholder, self.plot)
+        self.plot_placeholder.deleteLater()
+        self.plot_placeholder = None
+        self.toolbar = self.plot.make_toolbar(self)
+        if self.toolbar is not None:
+            self.plot_layout.insertWidget(0, self.toolbar)
+        startup.mark("plot_ready")
+
 # ------------------------- UI EVENT HANDLER METHODS -------------------------
     def on_discover(self):
         """
             Scans the network for available devices using the discover device command. 
             Devices are discovered over the network via a multicast UDP request handled inside the DeviceManager.
+            The scan runs in a background thread and each device is listed as soon as it answers.
 
         """
 
-        devices = self.manager.discover_devices()    # finds devices via UDP
-
+        self.manager.clear_devices()
         self.device_table.setRowCount(0)
-        for device in devices:    # adds each device found
-            row = self.device_table.rowCount()
-            self.device_table.insertRow(row)
-            self.device_table.setItem(row, 0, self.create_readonly_item(device.model))
-            self.device_table.setItem(row, 1, self.create_readonly_item(device.serial))
-            self.device_table.setItem(row, 2, self.create_readonly_item(device.ip))
-            self.device_table.setItem(row, 3, self.create_readonly_item(str(device.port)))
+        self.add_running_button.setEnabled(False)
+        self.discover_button.setEnabled(False)
+        self.status_label.setText("Scanning for devices...")
 
-        self.add_running_button.setEnabled(False)   
+        self.discovery_worker = DiscoveryWorker(self.manager,
+                                                expected_count=constants.DISCOVERY_EXPECTED_COUNT,
+                                                expected_serials=constants.DISCOVERY_EXPECTED_SERIALS)
+        self.discovery_worker.device_signal.connect(self.on_device_discovered)
+        self.discovery_worker.finished_signal.connect(self.on_discover_finished)
+        threading.Thread(target=self.discovery_worker.run, daemon=True).start()    # finds devices via UDP
 
-        if not devices:
+    def on_device_discovered(self, device):
+        """
+            Adds a device to the discovered devices table as soon as it answers a scan.
+
+            :param device (Device) The discovered device.
+
+        """
+
+        if constants.SCAN_ON_STARTUP:
+            startup.mark("first_discovery_result")    # otherwise it depends on when the operator scans
+        self.manager.add_device(device)
+
+        row = self.device_table.rowCount()
+        self.device_table.insertRow(row)
+        self.device_table.setItem(row, 0, self.create_readonly_item(device.model))
+        self.device_table.setItem(row, 1, self.create_readonly_item(device.serial))
+        self.device_table.setItem(row, 2, self.create_readonly_item(device.ip))
+        self.device_table.setItem(row, 3, self.create_readonly_item(str(device.port)))
+
+        # An idle device in the testing set may have been rediscovered at a new address
+        running_row = self.manager.running_devices.row_of(device.serial)
+        if running_row is not None and self.manager.running_devices[running_row] is device:
+            self.running_table.setItem(running_row, 2, self.create_readonly_item(device.ip))
+            self.running_table.setItem(running_row, 3, self.create_readonly_item(str(device.port)))
+
+        self.status_label.setText(f"Scanning for devices... {len(self.manager.devices)} found.")
+
+    def on_discover_finished(self, count):
+        """
+            Handles the end of a discovery scan.
+
+            :param count (int) Number of devices found by the scan.
+
+        """
+
+        self.discover_button.setEnabled(True)
+
+        if not count:
             self.status_label.setText("No devices found.")
         else:
-            self.status_label.setText(f"{len(devices)} device(s) discovered.")
+            self.status_label.setText(f"{count} device(s) discovered.")
 
     def on_start(self):
         """
             Starts the test for the selected device. It uses the input fields and starts a 
-            DeviceWorker in a new thread to perform the test. The UI is updated accordingly.
+            DeviceWorker in a new thread (or on the shared receive engine or in a shard process,
+            if enabled) to perform the test. The UI is updated accordingly.
 
         """
 
@@ -240,7 +397,7 @@ class MainWindow(QWidget):
             return
         row = selected[0].row()
         serial = self.running_table.item(row, 1).text()    # Get device serial from table
-        device = next((d for d in self.manager.running_devices if d.serial == serial), None)
+        device = self.manager.running_devices.get(serial)
         if not device:
             return
         try:
@@ -249,27 +406,185 @@ class MainWindow(QWidget):
         except ValueError:
             return
 
+        worker = self.create_worker(device, duration, rate)
+
+        if self.shards is not None:
+            self.shards.submit(worker)    # Run the test in a shard process
+            thread = None
+        elif self.engine is not None:
+            self.engine.submit(worker)    # Run worker on the shared receive loop
+            thread = self.engine.thread
+        else:
+            thread = threading.Thread(target=worker.start_test)    # Run worker in a background thread
+            thread.start()
+
+        self.manager.set_worker(serial, worker, thread)    # Save worker and thread references
+        self.manager.update_status(serial, "Testing")  # Add this line
+        self.update_status_column(serial, "Testing")  
+        self.clear_graph_button.setEnabled(True)
+
+    def create_worker(self, device, duration, rate, warn=True):
+        """
+            Prepares a device for a new test and creates the worker that runs it, with its signals
+            connected. The plot is cleared and, if recording is enabled, a recording is opened.
+
+            :param device (Device) The device to test.
+            :param duration (int) Test duration in seconds.
+            :param rate (int) Status rate in milliseconds.
+            :param warn (bool) Show a message box if the recording cannot be opened, instead of only logging it.
+
+        """
+
+        serial = device.serial
+        if self.shards is not None:
+            # the shard process writes the samples straight into the plot store, in shared memory
+            self.manager.set_plot_store(serial, self.shards.ring(serial))
         self.manager.clear_plot(serial)
         self.manager.append_log(serial, f"▶️ Start Test: {duration}s @ {rate}ms")
+
+        # stream the test's samples to disk, if recording is enabled
+        try:
+            if self.shards is not None:
+                path = self.manager.recording_path(serial)    # written by the shard process
+                recorder = ShardRecording(path) if path is not None else None
+            else:
+                recorder = self.manager.create_recorder(serial)
+        except OSError as e:
+            recorder = None
+            self.manager.append_log(serial, f"⚠️ Could not start recording: {e}")
+            if warn:
+                QMessageBox.warning(self, "Warning", f"Could not start recording for device {serial}: {e}")
+        if recorder is not None:
+            self.manager.append_log(serial, f"Recording to {recorder.path}")
         self.update_log(serial)    #update log display box
 
-        worker = DeviceWorker(device, duration=duration, rate=rate)    # create a worker for the test
+        # create a worker for the test
+        if self.shards is not None:
+            worker = ShardedWorker(device, duration, rate, self.manager.get_plot_data(serial),
+                                   batch_interval_ms=constants.BATCH_INTERVAL_MS, recorder=recorder)
+        else:
+            worker = DeviceWorker(device, duration=duration, rate=rate, batch_interval_ms=constants.BATCH_INTERVAL_MS,
+                                  recorder=recorder)
         # Connect signals to handle status updates, data points, and test completion
         worker.status_signal.connect(lambda msg: self.on_status(serial, msg))
         worker.data_signal.connect(lambda t, mv, ma: self.on_data(serial, t, mv, ma))
+        worker.block_signal.connect(lambda block: self.on_block(serial, block))
+        worker.alarm_signal.connect(lambda alarm: self.on_alarm(serial, alarm))
+        worker.save_signal.connect(lambda store: self.on_test_data(serial, device.model, store))
         worker.finished_signal.connect(lambda: self.on_finished(serial))
+        return worker
 
-        thread = threading.Thread(target=worker.start_test)    # Run worker in a background thread
-        thread.start()
+    def on_start_all(self):
+        """
+            Starts a test on every idle device in the testing set that matches the serial filter.
+            The START commands are sent back to back from one socket by the receive engine, so
+            all tests start within milliseconds; with SHARD_PROCESSES set, the devices are spread
+            over the shard processes and each shard sends the commands of its share. Devices that
+            have not acknowledged the START after START_ACK_TIMEOUT_MS are reported.
 
-        self.manager.set_worker(serial, worker, thread)    # Save worker and thread references
-        self.manager.update_status(serial, "Testing")  # Add this line
-        self.update_status_column(serial, "Testing")  
-        self.clear_graph_button.setEnabled(True)
+        """
+
+        try:
+            duration = int(self.duration_input.text())
+            rate = int(self.rate_input.text())
+        except ValueError:
+            QMessageBox.warning(self, "Warning", "Enter a valid test duration and status rate.")
+            return
+
+        devices = [d for d in self.manager.running_devices
+                   if not self.manager.is_running(d.serial) and self.matches_serial_filter(d.serial)]
+        if not devices:
+            self.status_label.setText("No idle devices to start.")
+            return
+
+        workers = [self.create_worker(device, duration, rate, warn=False) for device in devices]
+        if self.shards is not None:
+            self.shards.submit_batch(workers)
+            thread = None
+        else:
+            if self.engine is None:
+                self.engine = ReceiveEngine()    # batch starts always run on the shared receive loop
+            self.engine.submit_batch(workers)
+            thread = self.engine.thread
+
+        for device, worker in zip(devices, workers):
+            self.manager.set_worker(device.serial, worker, thread)
+            self.manager.update_status(device.serial, "Testing")
+            self.update_status_column(device.serial, "Testing")
+        self.clear_graph_button.setEnabled(bool(self.get_selected_running_serial()))
+        self.status_label.setText(f"Starting {len(workers)} device(s)...")
+
+        QTimer.singleShot(constants.START_ACK_TIMEOUT_MS,
+                          lambda: self.report_acknowledgements(workers, "START", lambda w: w.start_acknowledged))
+
+    def on_stop_all(self):
+        """
+            Stops the test of every running device that matches the serial filter. Tests on the
+            receive engine get their STOP commands sent back to back from one socket; devices that
+            have not acknowledged them after STOP_ACK_TIMEOUT_MS are reported.
+
+        """
+
+        running = [(serial, worker) for serial, worker in self.manager.workers.items()
+                   if worker.running and self.matches_serial_filter(serial)]
+        if not running:
+            self.status_label.setText("No running tests to stop.")
+            return
+
+        engine_workers = {}    # tests on the receive engine or the shard pool, by engine
+        for serial, worker in running:
+            if worker.engine is not None:
+                engine_workers.setdefault(worker.engine, []).append(worker)
+            else:
+                worker.stop_test()    # returns at once, the worker thread waits for the reply
+            self.manager.append_log(serial, "Stop Test")
+            self.update_log(serial)
+
+        for engine, batch in engine_workers.items():
+            engine.stop_batch(batch)
+        workers = [worker for _, worker in running]
+        # a test that ended before its STOP was sent needs no acknowledgement
+        QTimer.singleShot(constants.STOP_ACK_TIMEOUT_MS + 100,
+                          lambda: self.report_acknowledgements(
+                              workers, "STOP",
+                              lambda w: w.stop_acknowledged or w.stop_sent is None or w.error is not None))
+        self.status_label.setText(f"Stopping {len(running)} device(s)...")
+
+    def report_acknowledgements(self, workers, command, acknowledged):
+        """
+            Reports which devices did not acknowledge a batch command, in the status label and their logs.
+
+            :param workers (list of DeviceWorker) Workers the command was sent for.
+            :param command (string) Name of the command, e.g. "START".
+            :param acknowledged (callable) Returns whether a worker's device acknowledged the command.
+
+        """
+
+        missing = [w.device.serial for w in workers if not acknowledged(w)]
+        for serial in missing:
+            self.manager.append_log(serial, f"⚠️ No acknowledgement of {command}")
+            self.update_log(serial)
+
+        text = f"{len(workers) - len(missing)}/{len(workers)} device(s) acknowledged {command}."
+        if missing:
+            text += f" No acknowledgement from: {', '.join(missing)}"
+        self.status_label.setText(text)
+
+    def matches_serial_filter(self, serial):
+        """
+            Checks a serial number against the Start All / Stop All filter. An empty filter matches every device.
+
+            :param serial (string) The serial number of the device
+
+        """
+
+        pattern = self.serial_filter_input.text().strip()
+        return not pattern or fnmatch.fnmatchcase(serial, pattern)
 
     def on_stop(self):
         """
-            Stops the currently selected running device's test and updates the log.
+            Stops the currently selected running device's test and updates the log. The STOP is sent
+            without waiting for the reply; on_finished runs once the device acknowledges it.
             Shows a warning if no test is currently running.
 
         """
@@ -302,11 +617,92 @@ class MainWindow(QWidget):
         """
 
         self.manager.append_plot_data(serial, t, mv, ma)
+        self.dashboard.mark_dirty(serial)
 
-        # Only update the plot if this device is currently selected
+        # Only update the plot if this device is currently selected and no archived run is shown
         current_serial = self.get_selected_running_serial()
-        if current_serial == serial:
-            self.update_plot(serial)
+        if current_serial == serial and self.archived_run is None:
+            if self.plot_serial == serial:
+                self.update_live_plot(serial, (t,), (mv,))
+            else:
+                self.update_plot(serial)
+
+    def on_block(self, serial, block):
+        """
+            Handles a batch of status messages and data points received from a running test
+            device during one frame interval.
+
+            :param serial (string) The serial number of the device
+            :param block (SampleBlock) The status messages and data points received.
+
+        """
+
+        if block.status_lines:
+            self.on_status_block(serial, block.status_lines, block)
+        if len(block):
+            self.on_data_block(serial, block)
+
+    def on_data_block(self, serial, block):
+        """
+            Handles a batch of data points from a running test device. Appends all of them to the
+            plot data and updates the plot UI once.
+
+            :param serial (string) The serial number of the device
+            :param block (SampleBlock) Block holding the time, mV and mA arrays.
+
+        """
+
+        self.manager.extend_plot_data(serial, block.time_ms, block.mv, block.ma)
+        self.dashboard.mark_dirty(serial)
+
+        # Only update the plot if this device is currently selected and no archived run is shown
+        current_serial = self.get_selected_running_serial()
+        if current_serial == serial and self.archived_run is None:
+            if self.plot_serial == serial:
+                self.update_live_plot(serial, block.time_ms, block.mv)
+            else:
+                self.update_plot(serial)
+
+    def on_alarm(self, serial, alarm):
+        """
+            Handles a monitoring rule violation during a running test. The worker has already
+            stopped the test if STOP_ON_ALARM is set.
+
+            :param serial (string) The serial number of the device
+            :param alarm (string) Description of the violation.
+
+        """
+
+        action = "stopping the test" if constants.STOP_ON_ALARM else "test continues"
+        self.manager.append_log(serial, f"🚨 Alarm: {alarm}, {action}")
+        self.update_log(serial)
+        self.manager.update_status(serial, "Alarm")
+        self.update_status_column(serial, "Alarm")
+        self.status_label.setText(f"Alarm on {serial}: {alarm}")
+
+    def on_test_data(self, serial, model, store):
+        """
+            Analyses the samples of a test that ran to completion against the pass/fail limits of
+            the device's model and logs the result. Stopped or failed tests get no verdict. Emitted
+            by DeviceWorker just before its finished signal.
+
+            :param serial (string) The serial number of the device
+            :param model (string) The model of the device, which selects the limits
+            :param store (SampleStore) The samples collected during the test.
+
+        """
+
+        self.manager.analyses.pop(serial, None)
+        worker, _ = self.manager.get_worker(serial)
+        if worker is None or run_result(worker) != "completed":
+            return
+        # the store may only hold the newest samples, the recording has all of them
+        store, partial = self.manager.run_samples(worker)
+        analysis = analyze_run(store, model, partial)
+        if worker.alarm is not None:
+            analysis.failures.append(f"alarm: {worker.alarm}")
+        self.manager.analyses[serial] = analysis
+        self.manager.append_log(serial, f"Result: {analysis.summary()}")
 
     def on_finished(self, serial):
         """
@@ -317,11 +713,26 @@ class MainWindow(QWidget):
 
         """
 
+        worker, _ = self.manager.get_worker(serial)
+        result = run_result(worker) if worker is not None else "completed"
+        if worker is not None:
+            self.update_stats_row(serial, worker.stats)
+            self.manager.append_log(serial, f"Stream stats: {worker.stats.summary()}")
+            if worker.stop_latency is not None:
+                self.manager.append_log(serial, f"Stop acknowledged in {1000 * worker.stop_latency:.1f} ms")
+            if self.manager.archive is not None:
+                self.manager.archive_run(worker)
         self.manager.append_log(serial, "Test Finished")
         self.manager.clear_worker(serial)
         self.update_log(serial)
         self.set_controls_enabled(True)
-        self.update_status_column(serial, "Completed")
+        analysis = self.manager.analyses.get(serial)
+        if result == "completed":
+            self.update_status_column(serial, f"Completed: {analysis.verdict()}" if analysis is not None else "Completed")
+        elif worker.alarm is not None:
+            self.update_status_column(serial, "Alarm")
+        else:
+            self.update_status_column(serial, {"stopped": "Stopped", "error": "Error"}.get(result, "No response"))
 
     def on_status(self, serial, msg):
         """
@@ -333,16 +744,26 @@ class MainWindow(QWidget):
 
         """
 
-        self.manager.append_log(serial, msg)
-        self.update_log(serial)
-        self.update_status_column(serial, "Testing")  # Update to Testing
+        self.on_status_block(serial, [msg])
+
+    def on_status_block(self, serial, lines, block=None):
+        """
+            Handles a batch of status messages from a running test. The messages are logged
+            together and the log view and test status are updated once.
+
+            :param serial (string) The serial number of the device
+            :param lines (list of string) The status messages received from the device.
+            :param block (SampleBlock, optional) The block the messages came in, which lets data points be logged as compact records.
+
+        """
 
-        # Find row for the device's serial
-        for row in range(self.running_table.rowCount()):
-            if self.running_table.item(row, 1).text() == serial:
-                # update status cell with current status from manager 
-                self.running_table.setItem(row, 4, QTableWidgetItem(self.manager.get_status(serial)))
-                break
+        if block is not None:
+            self.manager.extend_log_block(serial, block)
+        else:
+            self.manager.extend_log(serial, lines)
+        self.update_log(serial)
+        # update status cell with current status from manager
+        self.update_status_column(serial, self.manager.get_status(serial))
 
     def on_discovered_selection_changed(self):
         """
@@ -381,9 +802,7 @@ class MainWindow(QWidget):
         self.status_label.setText(f"Selected device: {device_info}")
 
         # Updates log output
-        self.log_output.clear()
-        for line in self.manager.get_log(device.serial):
-            self.log_output.append(line)
+        self.update_log(device.serial)
 
         # Update graph plot
         self.update_plot(device.serial)
@@ -407,7 +826,7 @@ class MainWindow(QWidget):
         row = selected_rows[0].row()
         device = self.manager.devices[row]
 
-        if any(d.serial == device.serial for d in self.manager.running_devices):
+        if device.serial in self.manager.running_devices:
             QMessageBox.information(self, "Info", f"Device {device.serial} already added.")
             return
 
@@ -423,6 +842,12 @@ class MainWindow(QWidget):
         self.running_table.setItem(row_pos, 4, self.create_readonly_item(self.manager.get_status(device.serial)))
 
         self.running_table.setItem(row_pos, 4, QTableWidgetItem("Idle"))
+        for col in range(5, 8):    # stream health columns, filled in once a test runs
+            self.running_table.setItem(row_pos, col, self.create_readonly_item("-"))
+
+        self.dashboard.add_panel(device.serial)
+        self.start_all_button.setEnabled(True)
+        self.stop_all_button.setEnabled(True)
 
     def remove_from_running_tests(self):
         """
@@ -453,14 +878,13 @@ class MainWindow(QWidget):
         # remove the devices
         self.running_table.blockSignals(True)
         for serial in serials_to_remove:
-            # Remove from manager
+            # Table rows follow the manager's order, so the row goes away together with the device
+            row = self.manager.running_devices.row_of(serial)
             self.manager.remove_running_device(serial)
-
-            # Find the row with that serial and remove it
-            for row in range(self.running_table.rowCount()):
-                if self.running_table.item(row, 1).text() == serial:
-                    self.running_table.removeRow(row)
-                    break
+            if self.shards is not None:
+                self.shards.release_ring(serial)    # its plot data went with the device
+            self.running_table.removeRow(row)
+            self.dashboard.remove_panel(serial)
         self.running_table.blockSignals(False)
 
         # If no devices remain
@@ -468,6 +892,8 @@ class MainWindow(QWidget):
             self.running_table.clearSelection()
             self.running_table.setCurrentCell(-1, -1)
             self.remove_running_button.setEnabled(False)
+            self.start_all_button.setEnabled(False)
+            self.stop_all_button.setEnabled(False)
             self.status_label.setText("Status: Idle")
             self.selected_device_label.setText("Displaying Data for Selected Device: None")
             self.log_output.clear()
@@ -502,15 +928,50 @@ class MainWindow(QWidget):
 
         """
 
-        for row in range(self.running_table.rowCount()):
-            item = self.running_table.item(row, 1)    # gets serial number (col 1)
-            if item and item.text() == serial:
-                status_item = QTableWidgetItem(status)
-                status_item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)    # Make it read-only
-                self.running_table.setItem(row, 4, status_item)
-                self.running_table.viewport().update()
+        row = self.manager.running_devices.row_of(serial)
+        if row is None:
+            return
 
-                break
+        item = self.running_table.item(row, 4)
+        if item and item.text() == status:
+            return    # unchanged, e.g. for every block received during a test
+
+        status_item = QTableWidgetItem(status)
+        status_item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsEnabled)    # Make it read-only
+        self.running_table.setItem(row, 4, status_item)
+
+    def update_stats_columns(self):
+        """
+            Refreshes the stream health columns of every device running a test.
+
+        """
+
+        for serial, worker in self.manager.workers.items():
+            self.update_stats_row(serial, worker.stats)
+
+    def update_stats_row(self, serial, stats):
+        """
+            Shows a device's achieved sample rate, jitter and missed samples in the running devices table.
+
+            :param serial (string) The serial number of the device
+            :param stats (StreamStats) Statistics of the device's current or last test.
+
+        """
+
+        row = self.manager.running_devices.row_of(serial)
+        if row is None:
+            return
+
+        rate = stats.achieved_rate()
+        texts = (f"{rate:.1f}" if rate is not None else "-",
+                 f"{stats.jitter_ms:.2f}",
+                 f"{stats.missed} ({100 * stats.loss_ratio():.1f}%)")
+        for col, text in zip(range(5, 8), texts):
+            item = self.running_table.item(row, col)
+            if item is None:
+                self.running_table.setItem(row, col, self.create_readonly_item(text))
+            elif item.text() != text:
+                item.setText(text)
 
     def get_selected_running_serial(self):
         """
@@ -529,65 +990,193 @@ class MainWindow(QWidget):
     def update_plot(self, serial=None):
         """
             Updates the plot area with test data for a given device serial number or displays no data if no device.
+            This redraws the full history; samples arriving during a test are shown with update_live_plot.
 
             :param serial (string or None) The serial number of the device.
         """
 
-        self.ax.clear()
-        self.ax2.clear()
-        self.ax.set_title("Live Test Data" if serial is None else f"Live Test Data for {serial}")
-        self.ax.set_xlabel("Time (ms)")
-        self.ax.set_ylabel("mV")
-        self.ax2.set_ylabel("mA")
-        self.ax2.yaxis.set_label_position('right')
+        self.close_archived_run()
+        store = None if serial is None else self.manager.get_plot_data(serial)
+        self.plot_serial = serial
+        self.show_store(store, "Live Test Data" if serial is None else f"Live Test Data for {serial}",
+                        live=serial is not None and self.manager.is_running(serial))
 
-        if serial is None:
-            points = []
+    def show_store(self, store, title, live=False):
+        """
+            Redraws the plot with every sample of a store, a device's live data or an archived run.
+
+            :param store (SampleStore, ArchivedRun or None) Samples to plot, or None for an empty plot.
+            :param title (str) Plot title.
+            :param live (bool, optional) Whether more samples are still arriving for this store.
+        """
+
+        self.ensure_plot()
+        has_data = store is not None and len(store) > 0
+        self.plot.set_title(title)
+
+        self.mv_decimator.reset()
+        self.ma_decimator.reset()
+        if has_data:
+            self.set_plot_lines(store, live=live)
         else:
-            points = self.manager.get_plot_data(serial)  # expecting list of (time_ms, mv, ma)
+            self.plot.set_series([], [], [], [])
 
-        if points:
-            time_ms, mv_vals, ma_vals = zip(*points)
+        self.set_plot_has_data(has_data)
+        if has_data:
+            self.rescale_plot(store, headroom=0.25 if live else 0.0)
+        else:
+            self.plot.set_limits(0, 1, 0, 1)
 
-            mv_min, mv_max = min(mv_vals), max(mv_vals)
-            # Ensure min < max for both
-            if mv_min > mv_max:
-                mv_min, mv_max = mv_max, mv_min
-            # Add padding
-            mv_range = mv_max - mv_min
+        self.render_scheduler.discard(self.plot)
+        self.plot.draw_idle()
 
-            self.ax.set_ylim(mv_min - 0.1 * mv_range, mv_max + 0.1 * mv_range)
-            self.ax2.set_ylim(-600, 600)
+    def open_archived_run(self):
+        """
+            Lets the user pick an archived test run, of the selected device by default, and plots it.
 
-            # Plot mV on primary y-axis
-            if len(time_ms) > 100:
-                self.ax.plot(time_ms, mv_vals, 'bo-', label='Voltage (mV)', linewidth=1.5, markersize=5)
-            else:
-                self.ax.plot(time_ms, mv_vals, 'bo-', label='Voltage (mV)', linewidth=1.5, markersize=5)
+        """
 
-            # Create twin y-axis for current (mA)
-            if len(time_ms) > 100:
-                self.ax2.plot(time_ms, ma_vals, 'r^-', label='Current (mA)', linewidth=1, markersize=5)
-            else:
-                self.ax2.plot(time_ms, ma_vals, 'r^-', label='Current (mA)', linewidth=1, markersize=5)
+        browser = ArchiveBrowser(self.manager.archive, self.get_selected_running_serial(), self)
+        if browser.exec_() != QDialog.Accepted:
+            return
+        info = browser.selected_run()
+        if info is None:
+            return
+        try:
+            run = self.manager.archive.open(info)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Archive", f"Could not open the archived run: {e}")
+            return
+        self.show_archived_run(run)
+
+    def show_archived_run(self, run):
+        """
+            Plots an archived test run in place of the selected device's data, until a device's
+            data is plotted again.
+
+            :param run (ArchivedRun) The reopened run.
+        """
+
+        self.close_archived_run()
+        self.archived_run = run
+        self.plot_serial = None
+        self.show_store(run, self.archived_title(run))
+        self.save_graph_button.setEnabled(True)
+        self.status_label.setText(f"Showing archived run of {run.serial} ({len(run)} samples)")
+
+    def archived_title(self, run):
+        """
+            Returns the plot title of an archived test run.
 
-            # Optional: color the tick labels to match line colors
-            self.ax.tick_params(axis='y', colors='b')
-            self.ax2.tick_params(axis='y', colors='r')
-            self.ax2.yaxis.set_ticks_position('right')
+            :param run (ArchivedRun) The archived run.
+        """
+
+        started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(run.start_time))
+        return f"Archived Test Data for {run.serial} ({started})"
+
+    def close_archived_run(self):
+        """
+            Releases the archived run currently plotted, if any.
+
+        """
+
+        if self.archived_run is not None:
+            self.archived_run.close()
+            self.archived_run = None
+
+    def update_live_plot(self, serial, time_ms, mv_vals):
+        """
+            Shows newly stored samples of the plotted device without rebuilding the figure. The
+            lines are pointed at the current array views of the device's sample store, the axes
+            are only rescaled when a new sample falls outside the current limits, and redraws
+            are limited to one per PLOT_FRAME_MS.
+
+            :param serial (string) The serial number of the plotted device.
+            :param time_ms (sequence of int) The timestamps (in milliseconds) of the new data points.
+            :param mv_vals (sequence of float) The new voltage values in millivolts.
+        """
+
+        if not len(time_ms):
+            return
+
+        self.ensure_plot()
+        store = self.manager.get_plot_data(serial)
+        self.set_plot_lines(store)
+
+        if self.plot_limits is None:
+            self.set_plot_has_data(True)
+            self.rescale_plot(store)
+        else:
+            x_max, mv_low, mv_high = self.plot_limits
+            if time_ms[-1] > x_max or min(mv_vals) < mv_low or max(mv_vals) > mv_high:
+                self.rescale_plot(store)
 
-            # Optionally add legends (on primary axis)
-            self.ax.legend(loc='upper left')
-            self.ax2.legend(loc='upper right')
+        self.render_scheduler.request(self.plot, self.plot.draw)
 
+    def set_plot_lines(self, store, live=True):
+        """
+            Points the mV and mA lines at the samples of a store. When there are more samples than
+            pixels across the plot, the lines are downsampled to about the plot width: live tests
+            use incremental min/max decimation, finished tests are downsampled once with LTTB.
+            Markers are dropped once the points get denser than PLOT_MARKER_SPACING_PX.
+
+            :param store (SampleStore) Samples of the plotted device.
+            :param live (bool, optional) Whether more samples are still arriving for this store.
+        """
+
+        width = self.plot.plot_width()
+        time_ms, mv_vals, ma_vals = store.arrays()
+
+        if len(store) <= width:
+            mv_idx = ma_idx = slice(None)
+            shown = len(store)
+        elif live:
+            first = store.first_index
+            self.mv_decimator.set_target(width)
+            self.ma_decimator.set_target(width)
+            mv_idx = self.mv_decimator.update(mv_vals, first) - first
+            ma_idx = self.ma_decimator.update(ma_vals, first) - first
+            shown = max(len(mv_idx), len(ma_idx))
         else:
-            self.ax.text(
-                0.5, 0.5, "No data",
-                transform=self.ax.transAxes,
-                ha='center', va='center',
-                fontsize=12, color='gray'
-            )
-        self.canvas.draw()
+            mv_idx = lttb(time_ms, mv_vals, 2 * width)
+            ma_idx = lttb(time_ms, ma_vals, 2 * width)
+            shown = 2 * width
+
+        self.plot.set_series(time_ms[mv_idx], mv_vals[mv_idx], time_ms[ma_idx], ma_vals[ma_idx])
+        self.plot.set_markers(shown * constants.PLOT_MARKER_SPACING_PX <= width)
+
+    def rescale_plot(self, store, headroom=0.25):
+        """
+            Fits the axis limits to the plotted data, leaving headroom on the time axis so that the
+            following samples do not trigger another rescale straight away.
+
+            :param store (SampleStore) Samples of the plotted device.
+            :param headroom (float, optional) Extra time range to leave after the last sample, as a fraction of the plotted span.
+        """
+
+        time_ms = store.time_ms
+        t_min, t_max = int(time_ms[0]), int(time_ms[-1])
+        span = max(t_max - t_min, 1)
+        x_max = t_max + headroom * span
+
+        mv_min, mv_max = store.mv_range()
+        # Add padding, also when every sample has the same value
+        mv_range = (mv_max - mv_min) or max(abs(mv_max) * 0.01, 1.0)
+        mv_low, mv_high = mv_min - 0.1 * mv_range, mv_max + 0.1 * mv_range
+
+        self.plot.set_limits(t_min, x_max, mv_low, mv_high)
+        self.plot_limits = (x_max, mv_low, mv_high)
+
+    def set_plot_has_data(self, has_data):
+        """
+            Shows the line legends when there is data to plot, or the "No data" placeholder otherwise.
+
+            :param has_data (bool) Whether the plotted lines contain any samples.
+        """
+
+        self.plot.set_has_data(has_data)
+        if not has_data:
+            self.plot_limits = None
 
     def clear_graph(self):
         """
@@ -611,33 +1200,98 @@ class MainWindow(QWidget):
         # clears stored data for device and refreshes graph
         self.manager.clear_plot(serial)    
         self.update_plot(serial)
+        self.dashboard.mark_dirty(serial)
 
         # Log and show message if the cleared device is currently selected
         self.manager.append_log(serial, "Graph cleared.")
-        if self.get_selected_running_serial() == serial:
-            self.log_output.append("Graph cleared.")
+        self.update_log(serial)
 
     def save_graph(self):
         """
-            Saves the current graph as an image file.
+            Saves the graph of the plotted device as an image file. The image is always rendered
+            with matplotlib, from every stored sample, whichever backend draws the live plot.
 
         """
 
         # opens save file dialog to save graph image
         path, _ = QFileDialog.getSaveFileName(self, "Save Graph", "graph.png")
-        if path:
-            self.figure.savefig(path)
+        if path and self.archived_run is not None:
+            plot_backends.save_figure(path, self.archived_title(self.archived_run), self.archived_run)
+        elif path:
+            serial = self.plot_serial
+            title = "Live Test Data" if serial is None else f"Live Test Data for {serial}"
+            plot_backends.save_figure(path, title, None if serial is None else self.manager.get_plot_data(serial))
+
+    def on_export_all(self):
+        """
+            Exports the graph and log of every device in test, and the latest archived run of the
+            other archived devices, to a chosen directory. The export runs in the background and
+            its progress is shown in the status label.
+
+        """
+
+        directory = QFileDialog.getExistingDirectory(self, "Export All")
+        if directory:
+            self.export_all(directory)
+
+    def export_all(self, directory):
+        """
+            Starts a background export of every device's graph and log to a directory.
+
+            :param directory (string) Directory the files are written to.
+
+        """
+
+        graphs, logs = export_jobs(self.manager, directory)
+        if not graphs and not logs:
+            self.status_label.setText("Nothing to export.")
+            return
+
+        self.export_all_button.setEnabled(False)
+        self.status_label.setText(f"Exporting {len(graphs)} graph(s) and {len(logs)} log(s)...")
+        self.export_worker = ExportWorker(graphs, logs)
+        self.export_worker.progress_signal.connect(self.on_export_progress)
+        self.export_worker.finished_signal.connect(self.on_export_finished)
+        threading.Thread(target=self.export_worker.run, daemon=True).start()
+
+    def on_export_progress(self, done, total, message):
+        """
+            Shows the progress of the background export.
+
+            :param done (int) Number of files done.
+            :param total (int) Number of files to export.
+            :param message (string) Path of the last file written, or its error.
+
+        """
+
+        self.status_label.setText(f"Exporting {done}/{total}: {os.path.basename(message)}")
+
+    def on_export_finished(self, written, errors):
+        """
+            Reports the end of the background export.
+
+            :param written (int) Number of files written.
+            :param errors (list of string) One message per file that could not be written.
+
+        """
+
+        self.export_worker = None
+        self.export_all_button.setEnabled(True)
+        self.status_label.setText(f"Exported {written} file(s)" + (f", {len(errors)} failed." if errors else "."))
+        if errors:
+            QMessageBox.warning(self, "Export All", "Could not export:\n" + "\n".join(errors))
 
     def update_log(self, serial):
         """
-            Updates the log display with messages for the specified device.
+            Updates the log display with messages for the specified device, if it is the selected
+            device. Only lines added since the last update are passed on to the view.
 
             :param serial (string) serial number of the device whose log messages should be displayed.
         """
 
-        self.log_output.clear()
-        for line in self.manager.get_log(serial):
-            self.log_output.append(line)
+        if serial != self.get_selected_running_serial():
+            return
+        self.log_output.show_log(self.manager.get_log(serial))
 
     def save_log(self):
         """
@@ -709,6 +1363,7 @@ def resource_path(relative_path):
     return os.path.join(os.path.abspath("."), relative_path)
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()    # the graph export's processes, in the standalone executable
     app = QApplication(sys.argv)
 
     # Load and apply stylesheet
@@ -0,0 +1,380 @@
+"""
+    Live plot widgets behind one small interface, so the window and the dashboard do not
+    depend on how a plot is drawn.
+
+    Every backend is a QWidget with these methods:
+        set_title(text)
+        set_series(mv_x, mv_y, ma_x=None, ma_y=None)    points already downsampled to the plot width
+        set_markers(show)
+        set_limits(x_min, x_max, mv_low, mv_high)        the mA axis is fixed to MA_LIMITS
+        set_has_data(has_data)                           legends, or the "No data" placeholder
+        draw()                                           redraws now, e.g. from the RenderScheduler
+        draw_idle()                                      redraws on the next event loop pass
+        plot_width()                                     width of the data area in pixels
+        make_toolbar(parent)                             navigation toolbar widget, or None
+
+    "matplotlib" rasterizes a whole Figure with Agg on every draw. "qt" paints the lines as
+    polylines with QPainter straight onto the widget, which is a small fraction of the cost.
+    Saved graphs are always rendered with matplotlib by save_figure.
+
+"""
+
+import numpy as np
+from PyQt5.QtCore import Qt, QPointF, QRectF, QSize
+from PyQt5.QtGui import QColor, QFont, QFontMetrics, QPainter, QPen, QPolygonF
+from PyQt5.QtWidgets import QSizePolicy, QWidget, QVBoxLayout
+
+from downsample import lttb
+
+# Fixed range of the current axis, in milliamps
+MA_LIMITS = (-600, 600)
+
+class MatplotlibPlot(QWidget):
+    """
+        Live plot drawn by matplotlib on a FigureCanvasQTAgg.
+
+        :attribute compact (bool) Small plot for the dashboard: voltage only, no axis labels or legends.
+    """
+
+    def __init__(self, compact=False, parent=None):
+        super().__init__(parent)
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+        from matplotlib.figure import Figure
+
+        self.compact = compact
+        if compact:
+            # fixed margins instead of tight_layout, which would cost more than the rest of a redraw
+            self.figure = Figure(figsize=(3, 1.6))
+            self.figure.subplots_adjust(left=0.2, right=0.97, bottom=0.16, top=0.86)
+        else:
+            self.figure = Figure(figsize=(6, 2.2), tight_layout=True)
+        self.canvas = FigureCanvas(self.figure)
+
+        # Main axis for voltage (mV)
+        self.ax = self.figure.add_subplot(111)
+        if compact:
+            self.ax.tick_params(labelsize=7)
+            self.ax.locator_params(nbins=4)
+            self.ma_line = None
+            self.mv_line, = self.ax.plot([], [], 'b-', linewidth=1)
+            self.legends = []
+        else:
+            self.ax.set_xlabel("Time (ms)")
+            self.ax.set_ylabel("mV", color='b')
+            self.ax.tick_params(axis='y', colors='b')
+
+            # Twin axis for current (mA)
+            self.ax2 = self.ax.twinx()
+            self.ax2.set_ylabel("mA", color='r')
+            self.ax2.tick_params(axis='y', colors='r')
+            self.ax2.set_ylim(*MA_LIMITS)
+
+            # Line artists are created once and updated in place as samples arrive
+            self.mv_line, = self.ax.plot([], [], 'bo-', label='Voltage (mV)', linewidth=1.5, markersize=5)
+            self.ma_line, = self.ax2.plot([], [], 'r^-', label='Current (mA)', linewidth=1, markersize=5)
+            self.legends = [self.ax.legend(loc='upper left'), self.ax2.legend(loc='upper right')]
+
+        self.no_data_text = self.ax.text(
+            0.5, 0.5, "No data",
+            transform=self.ax.transAxes,
+            ha='center', va='center',
+            fontsize=9 if compact else 12, color='gray'
+        )
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.canvas)
+
+    def set_title(self, text):
+        self.ax.set_title(text, fontsize=9 if self.compact else None)
+
+    def set_series(self, mv_x, mv_y, ma_x=None, ma_y=None):
+        self.mv_line.set_data(mv_x, mv_y)
+        if self.ma_line is not None:
+            self.ma_line.set_data(ma_x if ma_x is not None else [], ma_y if ma_y is not None else [])
+
+    def set_markers(self, show):
+        if not self.compact:
+            self.mv_line.set_marker('o' if show else '')
+            self.ma_line.set_marker('^' if show else '')
+
+    def set_limits(self, x_min, x_max, mv_low, mv_high):
+        self.ax.set_xlim(x_min, x_max)
+        self.ax.set_ylim(mv_low, mv_high)
+
+    def set_has_data(self, has_data):
+        self.no_data_text.set_visible(not has_data)
+        for legend in self.legends:
+            legend.set_visible(has_data)
+
+    def draw(self):
+        self.canvas.draw()
+
+    def draw_idle(self):
+        self.canvas.draw_idle()
+
+    def plot_width(self):
+        return max(self.canvas.width(), 1)
+
+    def make_toolbar(self, parent):
+        from matplotlib.backends.backend_qt5 import NavigationToolbar2QT as NavigationToolbar
+        return NavigationToolbar(self.canvas, parent)
+
+
+class QtPainterPlot(QWidget):
+    """
+        Live plot painted with QPainter: the samples are turned into QPolygonF polylines in one
+        vectorized pass and drawn with a few tick labels, so a redraw costs about as much as
+        painting the visible pixels.
+
+        :attribute compact (bool) Small plot for the dashboard: voltage only, no axis labels or legends.
+    """
+
+    MV_COLOR = QColor(0, 0, 255)
+    MA_COLOR = QColor(255, 0, 0)
+
+    def __init__(self, compact=False, parent=None):
+        super().__init__(parent)
+        self.compact = compact
+        self.title = ""
+        self.mv = None
+        self.ma = None
+        self.markers = False
+        self.limits = (0, 1, 0, 1)
+        self.has_data = False
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+
+        self.label_font = QFont(self.font())
+        self.label_font.setPointSizeF(7 if compact else 8)
+        self.title_font = QFont(self.label_font)
+        self.title_font.setPointSizeF(9 if compact else 10)
+        metrics = QFontMetrics(self.label_font)
+        self.text_height = metrics.height()
+        # room for the tick labels around the data area
+        self.margins = (metrics.horizontalAdvance("-00000") + 8,
+                        metrics.horizontalAdvance("00000") // 2 + 4 if compact else metrics.horizontalAdvance("-0000") + 8,
+                        QFontMetrics(self.title_font).height() + 6,
+                        self.text_height + 8)
+
+    def sizeHint(self):
+        return QSize(300, 160) if self.compact else QSize(600, 220)
+
+    def set_title(self, text):
+        self.title = text
+
+    def set_series(self, mv_x, mv_y, ma_x=None, ma_y=None):
+        self.mv = (np.asarray(mv_x, dtype=np.float64), np.asarray(mv_y, dtype=np.float64))
+        if ma_x is not None and not self.compact:
+            self.ma = (np.asarray(ma_x, dtype=np.float64), np.asarray(ma_y, dtype=np.float64))
+        else:
+            self.ma = None
+
+    def set_markers(self, show):
+        self.markers = show and not self.compact
+
+    def set_limits(self, x_min, x_max, mv_low, mv_high):
+        self.limits = (float(x_min), float(x_max), float(mv_low), float(mv_high))
+
+    def set_has_data(self, has_data):
+        self.has_data = has_data
+
+    def draw(self):
+        self.repaint()
+
+    def draw_idle(self):
+        self.update()
+
+    def plot_width(self):
+        left, right, _, _ = self.margins
+        return max(self.width() - left - right, 1)
+
+    def make_toolbar(self, parent):
+        return None
+
+    def data_rect(self):
+        """
+            Returns the area the samples are drawn in, inside the tick label margins.
+
+        """
+
+        left, right, top, bottom = self.margins
+        return QRectF(left, top, max(self.width() - left - right, 1), max(self.height() - top - bottom, 1))
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.white)
+        painter.setFont(self.label_font)
+        rect = self.data_rect()
+        x_min, x_max, mv_low, mv_high = self.limits
+
+        # axes and tick labels
+        painter.setPen(QPen(Qt.black, 1))
+        painter.drawRect(rect)
+        self.draw_ticks(painter, rect, x_min, x_max, "x", Qt.black)
+        self.draw_ticks(painter, rect, mv_low, mv_high, "left", self.MV_COLOR)
+        if not self.compact:
+            self.draw_ticks(painter, rect, MA_LIMITS[0], MA_LIMITS[1], "right", self.MA_COLOR)
+
+        painter.setFont(self.title_font)
+        painter.setPen(Qt.black)
+        painter.drawText(QRectF(0, 0, self.width(), rect.top()), Qt.AlignCenter, self.title)
+        painter.setFont(self.label_font)
+
+        if not self.has_data:
+            painter.setPen(Qt.gray)
+            painter.drawText(rect, Qt.AlignCenter, "No data")
+            return
+
+        painter.setClipRect(rect)
+        painter.setRenderHint(QPainter.Antialiasing, not self.compact)
+        if self.ma is not None:
+            self.draw_series(painter, rect, self.ma, x_min, x_max, MA_LIMITS[0], MA_LIMITS[1], self.MA_COLOR, 1.0)
+        if self.mv is not None:
+            self.draw_series(painter, rect, self.mv, x_min, x_max, mv_low, mv_high, self.MV_COLOR, 1.5)
+        painter.setClipping(False)
+
+        if not self.compact:
+            painter.setPen(self.MV_COLOR)
+            painter.drawText(rect.adjusted(6, 2, -6, -2), Qt.AlignLeft | Qt.AlignTop, "— Voltage (mV)")
+            painter.setPen(self.MA_COLOR)
+            painter.drawText(rect.adjusted(6, 2, -6, -2), Qt.AlignRight | Qt.AlignTop, "— Current (mA)")
+
+    def draw_series(self, painter, rect, series, x_min, x_max, y_low, y_high, color, width):
+        """
+            Draws one series as a polyline, with markers when the points are sparse enough.
+
+        """
+
+        x, y = series
+        n = len(x)
+        if n == 0:
+            return
+
+        polygon = QPolygonF(n)
+        # fill the polygon's point buffer directly instead of creating a QPointF per sample
+        buffer = polygon.data()
+        buffer.setsize(16 * n)
+        points = np.frombuffer(buffer, dtype=np.float64).reshape(n, 2)
+        points[:, 0] = rect.left() + (x - x_min) * (rect.width() / ((x_max - x_min) or 1))
+        points[:, 1] = rect.bottom() - (y - y_low) * (rect.height() / ((y_high - y_low) or 1))
+
+        painter.setPen(QPen(color, width))
+        painter.drawPolyline(polygon)
+        if self.markers:
+            painter.setBrush(color)
+            for px, py in points:
+                painter.drawEllipse(QPointF(px, py), 2.5, 2.5)
+            painter.setBrush(Qt.NoBrush)
+
+    def draw_ticks(self, painter, rect, low, high, side, color):
+        """
+            Draws tick marks and labels for one axis.
+
+        """
+
+        painter.setPen(color)
+        span = (high - low) or 1
+        for value in nice_ticks(low, high, 4 if self.compact else 6):
+            label = f"{value:g}"
+            if side == "x":
+                px = rect.left() + (value - low) * rect.width() / span
+                painter.drawLine(QPointF(px, rect.bottom()), QPointF(px, rect.bottom() + 3))
+                painter.drawText(QRectF(px - 40, rect.bottom() + 3, 80, self.text_height), Qt.AlignHCenter, label)
+            else:
+                py = rect.bottom() - (value - low) * rect.height() / span
+                box = QRectF(0, py - self.text_height / 2, rect.left() - 5, self.text_height)
+                if side == "left":
+                    painter.drawLine(QPointF(rect.left() - 3, py), QPointF(rect.left(), py))
+                    painter.drawText(box, Qt.AlignRight | Qt.AlignVCenter, label)
+                else:
+                    painter.drawLine(QPointF(rect.right(), py), QPointF(rect.right() + 3, py))
+                    box.moveLeft(rect.right() + 5)
+                    painter.drawText(box, Qt.AlignLeft | Qt.AlignVCenter, label)
+
+
+def nice_ticks(low, high, count):
+    """
+        Returns round tick values (1, 2 or 5 times a power of ten apart) between low and high.
+
+        :param low (float) Lower axis limit.
+        :param high (float) Upper axis limit.
+        :param count (int) Approximate number of ticks wanted.
+
+        :return (numpy.ndarray) Tick values in increasing order.
+    """
+
+    span = high - low
+    if span <= 0 or not np.isfinite(span):
+        return np.array([low])
+    raw = span / max(count, 1)
+    power = 10 ** np.floor(np.log10(raw))
+    step = next(m * power for m in (1, 2, 5, 10) if m * power >= raw)
+    return np.arange(np.ceil(low / step) * step, high + step * 1e-9, step)
+
+
+BACKENDS = {
+    "matplotlib": MatplotlibPlot,
+    "qt": QtPainterPlot,
+}
+
+def create_plot(name, compact=False, parent=None):
+    """
+        Creates a live plot widget of the named backend.
+
+        :param name (str) Backend name, a key of BACKENDS.
+        :param compact (bool) Small plot for the dashboard.
+        :param parent (QWidget, optional) Parent widget.
+
+        :return (QWidget) Plot widget with the interface described at the top of this module.
+    """
+
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown plot backend {name!r}, expected one of: {', '.join(BACKENDS)}")
+    return BACKENDS[name](compact=compact, parent=parent)
+
+
+def save_figure(path, title, store=None, max_points=4000):
+    """
+        Renders a device's samples with matplotlib and saves them as an image, whichever backend
+        shows the live plot. Long recordings are downsampled with LTTB.
+
+        :param path (str) Image file path; the format follows the extension.
+        :param title (str) Plot title.
+        :param store (SampleStore, optional) Samples to plot, or None for an empty plot.
+        :param max_points (int) Maximum number of points per line.
+
+    """
+
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=(10, 4))
+    FigureCanvasAgg(figure)
+    # fixed margins: tight_layout measures every text element and costs as much as the drawing itself
+    figure.subplots_adjust(left=0.08, right=0.92, top=0.92, bottom=0.12)
+    ax = figure.add_subplot(111)
+    ax.set_title(title)
+    ax.set_xlabel("Time (ms)")
+    ax.set_ylabel("mV", color='b')
+    ax.tick_params(axis='y', colors='b')
+    ax2 = ax.twinx()
+    ax2.set_ylabel("mA", color='r')
+    ax2.tick_params(axis='y', colors='r')
+    ax2.set_ylim(*MA_LIMITS)
+
+    if store is not None and len(store):
+        time_ms, mv_vals, ma_vals = store.arrays()
+        mv_idx = lttb(time_ms, mv_vals, max_points)
+        ma_idx = lttb(time_ms, ma_vals, max_points)
+        markers = len(store) <= 200
+        ax.plot(time_ms[mv_idx], mv_vals[mv_idx], 'bo-' if markers else 'b-', label='Voltage (mV)',
+                linewidth=1.5, markersize=5)
+        ax2.plot(time_ms[ma_idx], ma_vals[ma_idx], 'r^-' if markers else 'r-', label='Current (mA)',
+                 linewidth=1, markersize=5)
+        ax.legend(loc='upper left')
+        ax2.legend(loc='upper right')
+    else:
+        ax.text(0.5, 0.5, "No data", transform=ax.transAxes, ha='center', va='center', fontsize=12, color='gray')
+
+    figure.savefig(path)
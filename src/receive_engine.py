@@ -0,0 +1,267 @@
+import selectors
+import socket
+import threading
+import time
+
+import constants
+from socket_pool import SocketPool
+
+class ReceiveEngine:
+    """
+        Runs the receive loop for every running device test on a single background thread.
+
+        Instead of one thread per DeviceWorker blocking in recvfrom, the sockets of a SocketPool
+        are registered with one selector and every datagram is routed by its source address to
+        the worker testing that device. The workers' handle_datagram methods do the rest, so the
+        workers keep emitting their usual status, data and finished signals and the GUI side does
+        not need to know which mode is in use.
+
+        Every command for a device is sent from the pool socket assigned to it. submit_batch
+        sends the START commands of several tests back to back, and stop_batch sends STOP
+        commands the same way; a stopped test ends when the STOPPED acknowledgement arrives or
+        after STOP_ACK_TIMEOUT_MS.
+
+        :attribute selector (selectors.BaseSelector) Selector watching the pool sockets.
+
+        :attribute pool (SocketPool) Sockets shared by every test, routing datagrams to the workers.
+
+        :attribute pending (list of list of DeviceWorker) Batches of workers submitted from other threads, waiting to be started.
+
+        :attribute pending_stops (list of DeviceWorker) Workers waiting for a STOP command to be sent.
+
+        :attribute thread (threading.Thread or None) Thread running the event loop, started on first submit.
+
+        :attribute running (bool) Flag indicating whether the event loop should keep running.
+
+        :attribute tick (float) Seconds between checks for stopped tests and due blocks, lowered to the shortest worker batch interval.
+    """
+
+    def __init__(self, poll_interval=0.5):
+        self.selector = selectors.DefaultSelector()
+        self.pool = SocketPool(constants.SOCKET_POOL_SIZE)
+        self.pending = []
+        self.pending_stops = []
+        self.lock = threading.Lock()
+        self.thread = None
+        self.running = False
+        self.poll_interval = poll_interval
+        self.tick = poll_interval
+
+        # every socket is read on the loop thread, so one receive buffer is shared by all of them
+        self._buffer = bytearray(constants.BUFFER_SIZE)
+        self._view = memoryview(self._buffer)
+
+        # socket pair used to wake the loop when work is submitted or a test is stopped
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self.selector.register(self._wake_r, selectors.EVENT_READ)
+
+        for sock in self.pool.sockets:
+            self.selector.register(sock, selectors.EVENT_READ)
+
+    def submit(self, worker):
+        """
+            Queues a worker for its test to be started on the engine thread.
+
+            :param worker (DeviceWorker) Worker whose test should be run by this engine.
+
+        """
+
+        self.submit_batch([worker])
+
+    def submit_batch(self, workers):
+        """
+            Queues several workers whose START commands are sent together, in one loop on the engine thread.
+
+            :param workers (list of DeviceWorker) Workers whose tests should be started.
+
+        """
+
+        for worker in workers:
+            worker.engine = self
+            worker.pool = self.pool
+            worker.running = True
+        with self.lock:
+            self.pending.append(list(workers))
+            self._start_thread()
+        self.wake()
+
+    def stop_batch(self, workers):
+        """
+            Queues STOP commands for several running tests. Each test ends when its device
+            acknowledges the STOP, or after STOP_ACK_TIMEOUT_MS.
+
+            :param workers (list of DeviceWorker) Workers whose tests should be stopped.
+
+        """
+
+        with self.lock:
+            self.pending_stops.extend(workers)
+        self.wake()
+
+    def _start_thread(self):
+        """
+            Starts the engine thread if it is not running. Must be called with the lock held.
+
+        """
+
+        if self.thread is None:
+            self.running = True
+            self.thread = threading.Thread(target=self.run, name="ReceiveEngine", daemon=True)
+            self.thread.start()
+
+    def wake(self):
+        """
+            Wakes the event loop so it processes pending workers and stopped tests immediately.
+
+        """
+
+        try:
+            self._wake_w.send(b'\0')
+        except (BlockingIOError, OSError):
+            pass    # the loop is already due to wake up
+
+    def shutdown(self):
+        """
+            Stops the event loop and waits for the engine thread to exit.
+
+        """
+
+        self.running = False
+        self.wake()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def run(self):
+        """
+            Event loop: waits on every pool socket at once and dispatches received datagrams.
+
+        """
+
+        next_sweep = time.perf_counter() + self.tick
+        while self.running:
+            self._register_pending()
+
+            woken = False
+            for key, _ in self.selector.select(max(0, next_sweep - time.perf_counter())):
+                if key.fileobj is self._wake_r:
+                    self._drain_wake()
+                    woken = True
+                else:
+                    self._read(key.fileobj)
+
+            # stopped tests and pending blocks are checked once per tick, not on every datagram
+            now = time.perf_counter()
+            if woken or now >= next_sweep:
+                self._sweep_stopped()
+                next_sweep = now + self.tick
+
+        for worker in list(self.pool.routes.values()):
+            self._release(worker)
+
+    def _register_pending(self):
+        """
+            Routes the newly submitted workers and sends their START commands, then sends the pending STOP commands.
+
+        """
+
+        with self.lock:
+            batches, self.pending = self.pending, []
+            stops, self.pending_stops = self.pending_stops, []
+
+        for batch in batches:
+            # routed before sending, so acknowledgements are delivered even if they arrive at once
+            for worker in batch:
+                self.pool.register((worker.device.ip, worker.device.port), worker)
+                if worker.batch_interval:
+                    self.tick = min(self.tick, worker.batch_interval)
+            for worker in batch:
+                self._send(worker, worker.start_message())
+
+        now = time.perf_counter()
+        for worker in stops:
+            if worker.running and worker.stop_sent is None:
+                worker.stop_sent = now
+                self._send(worker, b"TEST;CMD=STOP;")
+
+    def _send(self, worker, message):
+        """
+            Sends a command to a worker's device. A failed send is reported and left to the
+            acknowledgement checks, since a lost datagram looks the same.
+
+            :param worker (DeviceWorker) Worker whose device the command is for.
+            :param message (bytes) Command datagram.
+
+        """
+
+        try:
+            self.pool.send((worker.device.ip, worker.device.port), message)
+        except OSError as e:
+            worker.status_signal.emit(f"⚠️ Could not send {message!r} to {worker.device}: {e}")
+
+    def _read(self, sock):
+        """
+            Drains every datagram queued on a pool socket, routing each to the worker of its source address.
+
+            :param sock (socket.socket) Readable pool socket.
+
+        """
+
+        while True:
+            try:
+                nbytes, addr = sock.recvfrom_into(self._buffer)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+
+            worker = self.pool.sink(addr)
+            if worker is None:
+                continue    # a device whose test already ended
+
+            try:
+                ended = worker.handle_datagram(self._view[:nbytes], addr)
+            except Exception as e:    # ends this device's test only, the others share the loop
+                worker.fail(f"Could not handle {bytes(self._view[:nbytes])!r}: {e}")
+                ended = True
+            if ended or not worker.running:
+                self._release(worker)
+
+    def _sweep_stopped(self):
+        """
+            Ends the tests that were stopped from another thread or whose STOP was not acknowledged
+            in time, and flushes the pending blocks of the others.
+
+        """
+
+        stop_expired = time.perf_counter() - constants.STOP_ACK_TIMEOUT_MS / 1000
+        for worker in list(self.pool.routes.values()):
+            if not worker.running or (worker.stop_sent is not None and worker.stop_sent < stop_expired):
+                self._release(worker)
+            else:
+                worker.flush_due()
+
+    def _drain_wake(self):
+        """
+            Empties the wake-up socket after the loop has been woken.
+
+        """
+
+        try:
+            while self._wake_r.recv(512):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+
+    def _release(self, worker):
+        """
+            Stops routing datagrams to a worker and reports the end of its test.
+
+            :param worker (DeviceWorker) Worker whose test ended.
+
+        """
+
+        self.pool.unregister((worker.device.ip, worker.device.port), worker)
+        worker.finish_test()
@@ -0,0 +1,84 @@
+import time
+
+from PyQt5.QtCore import QObject, QTimer
+
+class RenderScheduler(QObject):
+    """
+        Frame-rate-limited redraws of every plot in the window, driven by one QTimer.
+
+        Plots ask for a redraw with request() whenever their data changes, which only marks
+        them dirty. Once per frame the scheduler calls the render callbacks of the dirty plots,
+        oldest request first, until the frame budget is used up; the plots left over are drawn
+        in the next frame, ahead of those that become dirty meanwhile. A plot is therefore
+        redrawn at most once per frame however many samples it receives, plots whose data did
+        not change are not redrawn at all, and the time spent drawing per frame stays bounded
+        as devices are added. The timer only runs while there is something to draw.
+
+        :attribute budget (float) Seconds of rendering allowed per frame. At least one plot is drawn per frame.
+
+        :attribute dirty (dict) Render callbacks of the plots waiting to be drawn, by key, in request order.
+
+        :attribute frames (int) Number of frames that drew something.
+
+        :attribute renders (int) Number of render callbacks called.
+
+        :attribute deferred (int) Number of times a dirty plot was left for the next frame.
+    """
+
+    def __init__(self, frame_ms=33, budget_ms=16, parent=None):
+        super().__init__(parent)
+        self.budget = budget_ms / 1000
+        self.dirty = {}
+        self.frames = 0
+        self.renders = 0
+        self.deferred = 0
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(frame_ms)
+        self.timer.timeout.connect(self.render_frame)
+
+    def request(self, key, render):
+        """
+            Marks a plot as needing a redraw in an upcoming frame. Repeated requests before the
+            plot is drawn are merged and keep their place in the queue.
+
+            :param key (object) Identifies the plot, e.g. its canvas.
+            :param render (callable) Called without arguments to redraw the plot.
+
+        """
+
+        if key not in self.dirty:
+            self.dirty[key] = render
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def discard(self, key):
+        """
+            Drops a pending redraw, e.g. because the plot was just drawn directly or removed.
+
+            :param key (object) Key passed to request.
+
+        """
+
+        self.dirty.pop(key, None)
+
+    def render_frame(self):
+        """
+            Draws dirty plots until the frame budget is used up, and stops the timer once none are left.
+
+        """
+
+        if not self.dirty:
+            self.timer.stop()
+            return
+
+        deadline = time.perf_counter() + self.budget
+        self.frames += 1
+        while self.dirty:
+            key = next(iter(self.dirty))
+            render = self.dirty.pop(key)
+            render()
+            self.renders += 1
+            if time.perf_counter() >= deadline:
+                break
+        self.deferred += len(self.dirty)
@@ -0,0 +1,275 @@
+import mmap
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+# File header: magic, format version, header size, sample count, start time (epoch seconds),
+# rate (ms), duration (s), mV and mA ranges, then serial, model and result as padded ASCII
+MAGIC = b"DTRUN\0\0\0"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQdII4d32s32s16s")
+HEADER_SIZE = 256    # columns start here, so every column is 8-byte aligned
+
+# Column types, little-endian so archives can be read on any machine
+TIME_DTYPE = np.dtype("<i8")
+VALUE_DTYPE = np.dtype("<f8")
+
+RUN_SUFFIX = ".run"
+
+def _text(value):
+    return value.rstrip(b"\0").decode("ascii", "replace")
+
+
+def write_run(path, serial, model, start_time, rate, duration, result, time_ms, mv, ma):
+    """
+        Writes one test run as an archive file: a fixed-size header followed by the time_ms, mv
+        and ma columns stored one after the other. The file is written under a temporary name
+        and renamed, so a run is either archived completely or not at all.
+
+        :param path (str) Path of the archive file.
+        :param serial (str) Serial number of the device.
+        :param model (str) Model of the device.
+        :param start_time (float) Start of the test, in seconds since the epoch.
+        :param rate (int) Status rate of the test in milliseconds.
+        :param duration (int) Requested test duration in seconds.
+        :param result (str) How the test ended, e.g. "completed" or "stopped".
+        :param time_ms (sequence of int) Times in milliseconds.
+        :param mv (sequence of float) Voltages in millivolts.
+        :param ma (sequence of float) Currents in milliamps.
+
+    """
+
+    time_ms = np.ascontiguousarray(time_ms, dtype=TIME_DTYPE)
+    mv = np.ascontiguousarray(mv, dtype=VALUE_DTYPE)
+    ma = np.ascontiguousarray(ma, dtype=VALUE_DTYPE)
+    count = len(time_ms)
+    if len(mv) != count or len(ma) != count:
+        raise ValueError("time_ms, mv and ma must have the same length")
+
+    ranges = (float(mv.min()), float(mv.max()), float(ma.min()), float(ma.max())) if count else (0.0,) * 4
+    header = HEADER.pack(MAGIC, VERSION, HEADER_SIZE, count, start_time, rate, duration, *ranges,
+                         serial.encode("ascii", "replace")[:32], model.encode("ascii", "replace")[:32],
+                         result.encode("ascii", "replace")[:16])
+
+    partial = path + ".partial"
+    with open(partial, "wb") as f:
+        f.write(header.ljust(HEADER_SIZE, b"\0"))
+        f.write(time_ms.tobytes())
+        f.write(mv.tobytes())
+        f.write(ma.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(partial, path)
+
+
+def read_header(path):
+    """
+        Reads the header of an archive file without mapping its columns.
+
+        :param path (str) Path of the archive file.
+
+        :return (dict) serial, model, start_time, rate, duration, result, samples, mv_range, ma_range and path.
+    """
+
+    with open(path, "rb") as f:
+        data = f.read(HEADER.size)
+    if len(data) < HEADER.size:
+        raise ValueError(f"{path} is not a run archive")
+    (magic, version, header_size, count, start_time, rate, duration,
+     mv_min, mv_max, ma_min, ma_max, serial, model, result) = HEADER.unpack(data)
+    if magic != MAGIC or version != VERSION or header_size != HEADER_SIZE:
+        raise ValueError(f"{path} is not a run archive")
+    return {
+        "path": path,
+        "serial": _text(serial),
+        "model": _text(model),
+        "start_time": start_time,
+        "rate": rate,
+        "duration": duration,
+        "result": _text(result),
+        "samples": count,
+        "mv_range": (mv_min, mv_max),
+        "ma_range": (ma_min, ma_max),
+    }
+
+
+class ArchivedRun:
+    """
+        A test run reopened from its archive file. The columns are NumPy views of a read-only
+        memory map, so opening a run costs the same for any number of samples and only the
+        pages that are actually read (e.g. by the plot's downsampling) are loaded from disk.
+
+        It offers the read side of SampleStore (len, arrays, time_ms, mv, ma, first_index,
+        mv_range, ma_range), so the plot code can show it like live data.
+
+        :attribute info (dict) Header fields, see read_header.
+
+        :attribute serial (str) Serial number of the device.
+
+        :attribute start_time (float) Start of the test, in seconds since the epoch.
+    """
+
+    def __init__(self, path):
+        self.info = read_header(path)
+        self.serial = self.info["serial"]
+        self.start_time = self.info["start_time"]
+        self.first_index = 0
+
+        count = self.info["samples"]
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER_SIZE + 24 * count:
+                raise ValueError(f"{path} is truncated")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if count else None
+
+        if count:
+            self.time_ms = np.frombuffer(self._map, dtype=TIME_DTYPE, count=count, offset=HEADER_SIZE)
+            self.mv = np.frombuffer(self._map, dtype=VALUE_DTYPE, count=count, offset=HEADER_SIZE + 8 * count)
+            self.ma = np.frombuffer(self._map, dtype=VALUE_DTYPE, count=count, offset=HEADER_SIZE + 16 * count)
+        else:
+            self.time_ms = np.empty(0, dtype=TIME_DTYPE)
+            self.mv = self.ma = np.empty(0, dtype=VALUE_DTYPE)
+
+    def __len__(self):
+        return self.info["samples"]
+
+    def arrays(self):
+        """
+            Returns the time_ms, mv and ma columns.
+
+        """
+
+        return self.time_ms, self.mv, self.ma
+
+    def mv_range(self):
+        """
+            Returns the (min, max) voltage of the run, stored in the header.
+
+        """
+
+        return self.info["mv_range"]
+
+    def ma_range(self):
+        """
+            Returns the (min, max) current of the run, stored in the header.
+
+        """
+
+        return self.info["ma_range"]
+
+    def close(self):
+        """
+            Releases the memory map. The columns must not be used afterwards.
+
+        """
+
+        self.time_ms = self.mv = self.ma = None
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                pass    # views of the columns are still alive; the map is freed with them
+            self._map = None
+
+
+class RunArchive:
+    """
+        Directory of archived test runs, one .run file per run, with an index by serial number
+        and start time built from the file headers.
+
+        :attribute directory (str) Directory holding the archive files.
+
+        :attribute index (dict of str -> list of dict) Header fields of every run by serial number,
+        oldest run first.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.index = {}
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.refresh()
+
+    def refresh(self):
+        """
+            Rebuilds the index from the headers of the archive files in the directory.
+
+        """
+
+        index = {}
+        for name in os.listdir(self.directory):
+            if not name.endswith(RUN_SUFFIX):
+                continue
+            try:
+                info = read_header(os.path.join(self.directory, name))
+            except (OSError, ValueError):
+                continue    # not an archive, or one being replaced
+            index.setdefault(info["serial"], []).append(info)
+        for runs in index.values():
+            runs.sort(key=lambda info: info["start_time"])
+        with self.lock:
+            self.index = index
+
+    def add(self, serial, model, start_time, rate, duration, result, time_ms, mv, ma):
+        """
+            Archives a run and adds it to the index. Safe to call from a background thread.
+
+            See write_run for the parameters.
+
+            :return (dict) Header fields of the archived run.
+        """
+
+        name = f"{serial}_{time.strftime('%Y%m%d_%H%M%S', time.localtime(start_time))}"
+        with self.lock:
+            path = os.path.join(self.directory, name + RUN_SUFFIX)
+            n = 1
+            while os.path.exists(path):    # runs started within the same second
+                n += 1
+                path = os.path.join(self.directory, f"{name}_{n}{RUN_SUFFIX}")
+            open(path, "wb").close()    # reserves the name
+
+        write_run(path, serial, model, start_time, rate, duration, result, time_ms, mv, ma)
+        info = read_header(path)
+        with self.lock:
+            runs = self.index.setdefault(serial, [])
+            runs.append(info)
+            runs.sort(key=lambda entry: entry["start_time"])
+        return info
+
+    def runs(self, serial=None):
+        """
+            Returns the header fields of the archived runs, newest first.
+
+            :param serial (str, optional) Only return the runs of this device.
+
+        """
+
+        with self.lock:
+            if serial is not None:
+                found = list(self.index.get(serial, []))
+            else:
+                found = [info for runs in self.index.values() for info in runs]
+        return sorted(found, key=lambda info: info["start_time"], reverse=True)
+
+    def serials(self):
+        """
+            Returns the serial numbers with at least one archived run, sorted.
+
+        """
+
+        with self.lock:
+            return sorted(self.index)
+
+    def open(self, info):
+        """
+            Reopens an archived run for reading.
+
+            :param info (dict) Entry returned by runs().
+
+            :return (ArchivedRun) The run, with its columns memory-mapped.
+        """
+
+        return ArchivedRun(info["path"])
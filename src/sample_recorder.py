@@ -0,0 +1,213 @@
+import atexit
+import os
+import queue
+import struct
+import threading
+import time
+
+import numpy as np
+
+# File header: magic, format version and size of one record in bytes
+MAGIC = b"DTSAMPLE"
+VERSION = 1
+HEADER = struct.Struct("<8sII")
+
+# One record per sample, little-endian so recordings can be read on any machine
+RECORD_DTYPE = np.dtype([("time_ms", "<i8"), ("mv", "<f8"), ("ma", "<f8")])
+
+_CLOSE = object()
+
+# seconds the application waits at exit for each recorder still writing
+CLOSE_TIMEOUT = 5.0
+
+# recorders whose writer thread is still running, closed at exit
+_open = set()
+
+class SampleRecorder:
+    """
+        Streams one device's samples to a binary file from a background writer thread.
+
+        The file is a short header followed by fixed-size (time_ms, mv, ma) records. Samples
+        handed to write() are queued and the writer thread appends them in chunks, flushing
+        to disk once flush_samples samples are pending or flush_interval seconds have passed.
+        Records are only ever appended, so after a crash the file holds every flushed sample,
+        plus at most one partial record at the end that read_samples ignores.
+
+        :attribute path (str) Path of the recording file.
+
+        :attribute samples_written (int) Number of samples written to the file so far.
+
+        :attribute error (OSError or None) Error that stopped the writer, if any.
+    """
+
+    def __init__(self, path, flush_samples=4096, flush_interval=1.0, sync=True):
+        self.path = path
+        self.flush_samples = flush_samples
+        self.flush_interval = flush_interval
+        self.sync = sync
+        self.samples_written = 0
+        self.error = None
+        self._unreported = None
+        self.queue = queue.SimpleQueue()
+
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, RECORD_DTYPE.itemsize))
+        self.file.flush()
+
+        # a daemon thread, so a recording test cannot keep the application alive; close_all() writes what is queued at exit
+        self.thread = threading.Thread(target=self._run, name=f"recorder-{os.path.basename(path)}", daemon=True)
+        _open.add(self)
+        self.thread.start()
+
+    def write(self, time_ms, mv, ma):
+        """
+            Queues a batch of samples for writing. The sequences must not be modified afterwards.
+
+            :param time_ms (sequence of int) Times in milliseconds.
+            :param mv (sequence of float) Voltages in millivolts.
+            :param ma (sequence of float) Currents in milliamps.
+
+        """
+
+        if len(time_ms):
+            self.queue.put((time_ms, mv, ma))
+
+    def append(self, time_ms, mv, ma):
+        """
+            Queues a single sample for writing.
+
+            :param time_ms (int) Time in milliseconds.
+            :param mv (float) Voltage in millivolts.
+            :param ma (float) Current in milliamps.
+
+        """
+
+        self.queue.put(((time_ms,), (mv,), (ma,)))
+
+    def take_error(self):
+        """
+            Returns the error that stopped the writer the first time it is called after the error,
+            otherwise None, so the owner of the recorder reports it once.
+
+        """
+
+        error, self._unreported = self._unreported, None
+        return error
+
+    def close(self, wait=True, timeout=None):
+        """
+            Writes the remaining queued samples and closes the file.
+
+            :param wait (bool) Wait for the writer thread to finish, otherwise return immediately.
+            :param timeout (float or None) Maximum seconds to wait, or None to wait until the file is closed.
+
+        """
+
+        self.queue.put(_CLOSE)
+        if wait:
+            self.thread.join(timeout)
+
+    def _run(self):
+        """
+            Writer thread loop: collects queued batches and writes them by size or age.
+
+        """
+
+        pending = []
+        count = 0
+        last_write = time.monotonic()
+
+        while True:
+            timeout = max(0.0, last_write + self.flush_interval - time.monotonic()) if pending else None
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _CLOSE:
+                break
+            if item is not None:
+                pending.append(item)
+                count += len(item[0])
+
+            if pending and (count >= self.flush_samples or time.monotonic() - last_write >= self.flush_interval):
+                self._write(pending, count)
+                pending = []
+                count = 0
+                last_write = time.monotonic()
+
+        self._write(pending, count)
+        try:
+            self.file.close()
+        except OSError as e:    # unwritten data is still buffered after a failed write
+            if self.error is None:
+                self.error = self._unreported = e
+        _open.discard(self)
+
+    def _write(self, batches, count):
+        """
+            Appends batches of samples to the file and flushes them to disk.
+
+        """
+
+        if not batches or self.error is not None:
+            return
+
+        records = np.empty(count, dtype=RECORD_DTYPE)
+        pos = 0
+        for time_ms, mv, ma in batches:
+            n = len(time_ms)
+            records["time_ms"][pos:pos + n] = time_ms
+            records["mv"][pos:pos + n] = mv
+            records["ma"][pos:pos + n] = ma
+            pos += n
+
+        try:
+            self.file.write(records.tobytes())
+            self.file.flush()
+            if self.sync:
+                os.fsync(self.file.fileno())
+        except OSError as e:
+            self.error = self._unreported = e
+            return
+
+        self.samples_written += count
+
+
+@atexit.register
+def close_all(timeout=CLOSE_TIMEOUT):
+    """
+        Closes every recorder that is still writing, waiting at most `timeout` seconds for each.
+        Called at exit, so samples queued by a test that was still running are not lost.
+
+        :param timeout (float) Maximum seconds to wait for each recorder.
+
+    """
+
+    for recorder in list(_open):
+        recorder.close(timeout=timeout)
+        if recorder.thread.is_alive():
+            print(f"⚠️ Recording to {recorder.path} did not finish within {timeout} seconds.")
+
+
+def read_samples(path):
+    """
+        Reads a recording written by SampleRecorder. A partial record left at the end of the
+        file by a crash is ignored.
+
+        :param path (str) Path of the recording file.
+
+        :return (numpy.ndarray) Structured array with time_ms, mv and ma fields.
+    """
+
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"{path} is not a sample recording")
+        magic, version, record_size = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION or record_size != RECORD_DTYPE.itemsize:
+            raise ValueError(f"{path} is not a sample recording")
+        data = f.read()
+
+    count = len(data) // RECORD_DTYPE.itemsize
+    return np.frombuffer(data, dtype=RECORD_DTYPE, count=count)
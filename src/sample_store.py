@@ -0,0 +1,216 @@
+import numpy as np
+
+class SampleStore:
+    """
+        Compact columnar storage for one device's (time, voltage, current) samples.
+
+        Samples are kept in preallocated NumPy arrays instead of a list of tuples. Without a
+        capacity the arrays double in size when full, so appends are amortized O(1). With a
+        capacity the store is a ring buffer that keeps only the most recent samples: every
+        sample is written twice, at slot i and i + capacity, so the newest `capacity` samples
+        are always one contiguous slice and can be handed out as views without copying.
+
+        :attribute capacity (int or None) Maximum number of samples kept, or None to keep every sample.
+
+        :attribute total (int) Number of samples appended since the store was created. It is not reset by
+        clear(), so sample indices keep increasing and a clear looks like every stored sample was evicted.
+    """
+
+    def __init__(self, capacity=None, initial_size=1024):
+        self.capacity = capacity
+        self.initial_size = initial_size
+        self.total = 0
+        self.clear()
+
+    def clear(self):
+        """
+            Removes every sample and shrinks the arrays back to their initial size.
+
+        """
+
+        size = 2 * self.capacity if self.capacity else self.initial_size
+        self._time = np.empty(size, dtype=np.int64)
+        self._mv = np.empty(size, dtype=np.float64)
+        self._ma = np.empty(size, dtype=np.float64)
+        self._base = self.total    # index of the first sample appended after the last clear
+
+    def __len__(self):
+        if self.capacity:
+            return min(self.total - self._base, self.capacity)
+        return self.total - self._base
+
+    @property
+    def first_index(self):
+        """
+            Index (counted from the first sample appended) of the oldest sample still stored.
+
+        """
+
+        return self.total - len(self)
+
+    @property
+    def evicted(self):
+        """
+            Number of samples appended since the last clear that are no longer stored.
+
+        """
+
+        return self.total - self._base - len(self)
+
+    def _window(self):
+        """
+            Returns the slice of the backing arrays holding the stored samples, oldest first.
+
+        """
+
+        if self.capacity:
+            start = self.first_index % self.capacity
+            return slice(start, start + len(self))
+        return slice(0, len(self))
+
+    @property
+    def time_ms(self):
+        """
+            Zero-copy view of the sample times in milliseconds, oldest first.
+
+        """
+
+        return self._time[self._window()]
+
+    @property
+    def mv(self):
+        """
+            Zero-copy view of the voltage samples in millivolts, oldest first.
+
+        """
+
+        return self._mv[self._window()]
+
+    @property
+    def ma(self):
+        """
+            Zero-copy view of the current samples in milliamps, oldest first.
+
+        """
+
+        return self._ma[self._window()]
+
+    def arrays(self):
+        """
+            Returns zero-copy views of the (time_ms, mv, ma) columns, oldest first.
+
+        """
+
+        window = self._window()
+        return self._time[window], self._mv[window], self._ma[window]
+
+    def append(self, time_ms, mv, ma):
+        """
+            Appends a single sample.
+
+            :param time_ms (int) Time in milliseconds.
+            :param mv (float) Voltage in millivolts.
+            :param ma (float) Current in milliamps.
+
+        """
+
+        if self.capacity:
+            pos = self.total % self.capacity
+            for column, value in ((self._time, time_ms), (self._mv, mv), (self._ma, ma)):
+                column[pos] = value
+                column[pos + self.capacity] = value
+        else:
+            pos = self.total - self._base
+            if pos == len(self._time):
+                self._grow(pos + 1)
+            self._time[pos] = time_ms
+            self._mv[pos] = mv
+            self._ma[pos] = ma
+        self.total += 1
+
+    def extend(self, time_ms, mv, ma):
+        """
+            Appends a batch of samples given as equally long sequences or arrays.
+
+            :param time_ms (sequence of int) Times in milliseconds.
+            :param mv (sequence of float) Voltages in millivolts.
+            :param ma (sequence of float) Currents in milliamps.
+
+        """
+
+        time_ms = np.asarray(time_ms, dtype=np.int64)
+        mv = np.asarray(mv, dtype=np.float64)
+        ma = np.asarray(ma, dtype=np.float64)
+        n = len(time_ms)
+        if n == 0:
+            return
+
+        if not self.capacity:
+            pos = self.total - self._base
+            if pos + n > len(self._time):
+                self._grow(pos + n)
+            self._time[pos:pos + n] = time_ms
+            self._mv[pos:pos + n] = mv
+            self._ma[pos:pos + n] = ma
+            self.total += n
+            return
+
+        # only the newest `capacity` samples of the batch can survive
+        skipped = max(0, n - self.capacity)
+        done = skipped
+        while done < n:
+            pos = (self.total + done) % self.capacity
+            count = min(n - done, self.capacity - pos)
+            for column, values in ((self._time, time_ms), (self._mv, mv), (self._ma, ma)):
+                column[pos:pos + count] = values[done:done + count]
+                column[pos + self.capacity:pos + self.capacity + count] = values[done:done + count]
+            done += count
+        self.total += n
+
+    def _grow(self, needed):
+        """
+            Reallocates the backing arrays of an unbounded store to hold at least `needed` samples.
+
+            :param needed (int) Minimum number of samples the arrays must hold.
+
+        """
+
+        size = len(self._time)
+        while size < needed:
+            size *= 2
+        count = len(self)
+        for name in ('_time', '_mv', '_ma'):
+            old = getattr(self, name)
+            new = np.empty(size, dtype=old.dtype)
+            new[:count] = old[:count]
+            setattr(self, name, new)
+
+    def mv_range(self):
+        """
+            Returns the (min, max) of the stored voltage samples, or None if the store is empty.
+
+        """
+
+        if not len(self):
+            return None
+        mv = self.mv
+        return float(mv.min()), float(mv.max())
+
+    def ma_range(self):
+        """
+            Returns the (min, max) of the stored current samples, or None if the store is empty.
+
+        """
+
+        if not len(self):
+            return None
+        ma = self.ma
+        return float(ma.min()), float(ma.max())
+
+    def nbytes(self):
+        """
+            Returns the number of bytes allocated for the backing arrays.
+
+        """
+
+        return self._time.nbytes + self._mv.nbytes + self._ma.nbytes
@@ -0,0 +1,626 @@
+import multiprocessing
+import signal
+import sys
+import threading
+import time
+from array import array
+from multiprocessing.connection import wait
+
+import constants
+import status_parser
+from device_worker import SampleBlock
+from shared_ring import SharedSampleRing
+from signals import pyqtSignal, QObject, DirectConnection
+from stream_stats import StreamStats
+
+def run_shard(conn, settings):
+    """
+        Entry point of a shard process. Runs the tests the GUI process assigns to it on a
+        ReceiveEngine of its own, so the sockets and parsing of its devices never touch the GUI
+        process's interpreter. Samples are written to the devices' shared rings; everything else
+        is reported over the pipe as small event tuples (see ShardedWorker.handle_event).
+
+        Commands arrive as (command, argument) tuples: ("start", list of test dicts),
+        ("stop", serials), ("cancel", serials) and ("exit", None).
+
+        :param conn (multiprocessing.connection.Connection) This process's end of the pipe.
+        :param settings (dict) The GUI process's constants, which may have been changed at run time.
+
+    """
+
+    vars(constants).update(settings)
+    sys.stdout = sys.stderr    # warnings are diagnostics; the headless runner keeps stdout for its summaries
+    signal.signal(signal.SIGINT, signal.SIG_IGN)    # Ctrl+C reaches the whole process group; the GUI process stops the tests
+    from receive_engine import ReceiveEngine
+
+    engine = ReceiveEngine()
+    workers = {}
+    lock = threading.Lock()
+    conn.send(("ready", None))
+
+    def send(event):
+        with lock:
+            try:
+                conn.send(event)
+            except (OSError, ValueError):
+                pass    # the GUI process is gone or shutting down
+
+    while True:
+        try:
+            command, argument = conn.recv()
+        except (EOFError, OSError):
+            break
+        if command == "start":
+            batch = [_shard_worker(test, send, workers) for test in argument]
+            engine.submit_batch(batch)
+        elif command == "stop":
+            engine.stop_batch([workers[s] for s in argument if s in workers])
+        elif command == "cancel":
+            for serial in argument:
+                if serial in workers:
+                    workers[serial].cancel()
+        elif command == "exit":
+            break
+
+    engine.shutdown()    # ends the tests still running
+    conn.close()
+
+
+def _shard_worker(test, send, workers):
+    """
+        Creates the DeviceWorker running one test in a shard process, with its signals connected
+        to the shared ring and the pipe.
+
+        :param test (dict) Test parameters, see ShardedWorker.test.
+        :param send (callable) Sends an event to the GUI process.
+        :param workers (dict of str -> DeviceWorker) Running tests of the shard, by serial.
+
+        :return (DeviceWorker) The worker, ready to be submitted to the shard's engine.
+    """
+
+    from device import Device
+    from device_worker import DeviceWorker
+    from sample_recorder import SampleRecorder
+
+    serial = test["serial"]
+    recorder = None
+    if test["recording"]:
+        try:
+            recorder = SampleRecorder(test["recording"], flush_samples=constants.RECORD_FLUSH_SAMPLES,
+                                      flush_interval=constants.RECORD_FLUSH_INTERVAL_MS / 1000)
+        except OSError as e:
+            send(("log", serial, f"⚠️ Could not start recording: {e}"))
+
+    device = Device(test["ip"], test["port"], test["model"], serial)
+    # only the ring keeps samples, the worker's own store holds the last one
+    worker = DeviceWorker(device, duration=test["duration"], rate=test["rate"],
+                          batch_interval_ms=test["batch_interval_ms"], recorder=recorder, history_samples=1)
+    ring = SharedSampleRing(test["samples"], test["ring"], test["total"])
+    stats_interval = constants.STATS_REFRESH_MS / 1000
+    last_stats = [0.0]
+
+    def on_block(block):
+        ring.write(block.time_ms, block.mv, block.ma)
+        formats = block.log_formats
+        text = None
+        if formats.count(0):
+            # the messages that are not data point records, and the sample of every message
+            text = (block.log_samples.tobytes(), block.text)
+        stats = None
+        now = time.perf_counter()
+        if now - last_stats[0] >= stats_interval:
+            last_stats[0] = now
+            stats = vars(worker.stats).copy()
+        # replies and state changes are text messages, so the test's state only changes with them
+        state = _state(worker) if text is not None else None
+        send(("block", serial, ring.total, formats.tobytes(), text, block.first_arrival, stats, state))
+
+    def on_alarm(alarm):
+        send(("alarm", serial, alarm))
+
+    def on_status(message):
+        send(("log", serial, message))    # only problems to log, the device's messages come in blocks
+
+    def on_finished():
+        workers.pop(serial, None)
+
+        def report():
+            if recorder is not None:
+                recorder.close()    # the GUI process may read the file as soon as it hears of the end
+            ring.close()
+            send(("finished", serial, _state(worker), vars(worker.stats).copy()))
+
+        if recorder is not None:
+            threading.Thread(target=report, name=f"finish-{serial}", daemon=True).start()
+        else:
+            report()
+
+    # no Qt event loop runs in a shard, so slots are called directly on the engine thread
+    worker.block_signal.connect(on_block, DirectConnection)
+    worker.alarm_signal.connect(on_alarm, DirectConnection)
+    worker.status_signal.connect(on_status, DirectConnection)
+    worker.finished_signal.connect(on_finished, DirectConnection)
+    workers[serial] = worker
+    return worker
+
+
+def _state(worker):
+    """
+        Returns the fields of a DeviceWorker that ShardedWorker mirrors, as a dict.
+
+    """
+
+    return {
+        "started_at": worker.started_at,
+        "completed": worker.completed,
+        "start_acknowledged": worker.start_acknowledged,
+        "stop_acknowledged": worker.stop_acknowledged,
+        "stop_latency": worker.stop_latency,
+        "stopped": worker.stop_sent is not None,
+        "error": worker.error,
+        "alarm": worker.alarm,
+    }
+
+
+class ShardRecording:
+    """
+        Recording of a sharded test, written by the shard process. The shard finishes the file
+        before it reports the end of the test, so closing it has nothing left to wait for.
+
+        :attribute path (str) Path of the recording file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def close(self, wait=True):
+        pass
+
+
+class ShardedWorker(QObject):
+    """
+        Stands in for a DeviceWorker whose test runs in a shard process. It has the signals and
+        attributes of a DeviceWorker that the GUI and the headless runner use, updated from the
+        events the shard sends, so they do not need to know where the test runs.
+
+        Every block is delivered with its data points copied out of the device's shared ring;
+        the ring itself, which is the collected data, is read without copying.
+
+        :signal status_signal, data_signal, save_signal, block_signal, alarm_signal, finished_signal As for DeviceWorker.
+
+        :attributes collected_data (SharedSampleRing) Ring the shard writes the samples of the test to.
+
+        :attributes recorder (ShardRecording or None) Recording file, written by the shard process.
+
+        :attributes engine (ShardPool or None) Pool running the test, once submitted.
+
+        :attributes shard (int or None) Index of the shard process running the test.
+
+        :attributes lapped (bool) Whether the shard overwrote samples in the ring before this process copied or plotted them.
+
+        :attributes running, stats, alarm, started_at, completed, start_acknowledged, stop_acknowledged,
+        stop_sent, stop_latency, error, ended, batch_interval As for DeviceWorker.
+
+    """
+
+    status_signal = pyqtSignal(str)
+    data_signal = pyqtSignal(int, float, float)
+    finished_signal = pyqtSignal()
+    save_signal = pyqtSignal(object)
+    block_signal = pyqtSignal(object)
+    alarm_signal = pyqtSignal(str)
+
+    def __init__(self, device, duration, rate, ring, batch_interval_ms=None, recorder=None):
+        super().__init__()
+        self.device = device
+        self.duration = duration
+        self.rate = rate
+        self.running = False
+        self.collected_data = ring
+        self.recorder = recorder
+        self.stats = StreamStats(rate)
+        self.alarm = None
+        self.started_at = None
+        self.completed = False
+        self.start_acknowledged = False
+        self.stop_acknowledged = False
+        self.stop_sent = None
+        self.stop_latency = None
+        self.error = None
+        self.engine = None
+        self.shard = None
+        self.lapped = False
+        self.ended = threading.Event()
+        # shards always deliver blocks, one message per datagram would flood the pipe
+        self.batch_interval = (batch_interval_ms or constants.BATCH_INTERVAL_MS or 33) / 1000
+
+    def test(self):
+        """
+            Returns the parameters the shard process needs to run the test.
+
+        """
+
+        ring = self.collected_data
+        return {
+            "serial": self.device.serial,
+            "model": self.device.model,
+            "ip": self.device.ip,
+            "port": self.device.port,
+            "duration": self.duration,
+            "rate": self.rate,
+            "batch_interval_ms": 1000 * self.batch_interval,
+            "ring": ring.name,
+            "samples": ring.samples,
+            "total": ring.total,
+            "recording": self.recorder.path if self.recorder is not None else None,
+        }
+
+    def handle_event(self, event):
+        """
+            Applies an event sent by the shard process and emits the matching signals.
+
+            :param event (tuple) ("block", serial, samples written, record formats, text, first arrival,
+            stats, state), ("alarm", serial, alarm), ("log", serial, line) or ("finished", serial, state, stats).
+
+        """
+
+        kind = event[0]
+        if kind == "block":
+            _, _, total, formats, text, first_arrival, stats, state = event
+            if stats is not None:
+                vars(self.stats).update(stats)
+            if state is not None:
+                self.update_state(state)
+            self.block_signal.emit(self.take_block(total, formats, text, first_arrival))
+        elif kind == "alarm":
+            self.alarm = event[2]
+            self.alarm_signal.emit(self.alarm)
+        elif kind == "log":
+            self.status_signal.emit(event[2])
+        elif kind == "finished":
+            self.update_state(event[2])
+            vars(self.stats).update(event[3])
+            self.finish_test()
+
+    def take_block(self, total, formats, text, first_arrival):
+        """
+            Builds the SampleBlock of the samples written to the ring up to `total` and makes
+            them visible in the ring.
+
+            :param total (int) Number of samples the shard has written to the ring.
+            :param formats (bytes) Record format of every status message of the block.
+            :param text (tuple or None) (sample of every message, dict of text messages by position), or None if
+            every message is a data point record in sample order.
+            :param first_arrival (float or None) time.perf_counter() value when the first message of the block arrived.
+
+            :return (SampleBlock) The block.
+        """
+
+        ring = self.collected_data
+        block = SampleBlock()
+        for column, view in zip((block.time_ms, block.mv, block.ma), ring.views(ring.total, total)):
+            column.frombytes(memoryview(view).cast("B"))
+        # the shard keeps writing while the samples are copied, so they are only checked afterwards
+        if ring.lapped(ring.total):
+            self.report_lap("before they were read")
+        block.log_formats.frombytes(formats)
+        if text is None:
+            block.log_samples.extend(range(len(block.log_formats)))
+        else:
+            block.log_samples.frombytes(text[0])
+            block.text.update(text[1])
+        block.first_arrival = first_arrival
+        ring.advance(total)
+        # the plot reads the visible window of the ring, which the shard overwrites once it is far enough ahead
+        if ring.lapped(ring.first_index):
+            self.report_lap("while they were plotted")
+        return block
+
+    def report_lap(self, when):
+        """
+            Logs, once per test, that the shard overwrote samples in the ring too early.
+
+            :param when (str) What the samples were still needed for.
+
+        """
+
+        if not self.lapped:
+            self.lapped = True
+            self.status_signal.emit(f"⚠️ Samples of {self.device} were overwritten {when}, increase SHARD_RING_SAMPLES.")
+
+    def update_state(self, state):
+        """
+            Mirrors the state of the shard's DeviceWorker.
+
+            :param state (dict) Fields of the worker, see _state.
+
+        """
+
+        self.started_at = state["started_at"]
+        self.completed = state["completed"]
+        self.start_acknowledged = state["start_acknowledged"]
+        self.stop_acknowledged = state["stop_acknowledged"]
+        self.stop_latency = state["stop_latency"]
+        self.error = state["error"] or self.error
+        self.alarm = state["alarm"] or self.alarm
+        if state["stopped"] and self.stop_sent is None:
+            self.stop_sent = time.perf_counter()    # stopped by the shard, e.g. on an alarm
+
+    def finish_test(self):
+        """
+            Marks the test as no longer running and emits the collected data and finished signals.
+
+        """
+
+        self.running = False
+        if self.engine is not None:
+            self.engine.release(self)
+        self.save_signal.emit(self.collected_data)
+        self.finished_signal.emit()
+        self.ended.set()
+
+    def stop_test(self):
+        """
+            Stops the test. Returns immediately; the shard sends the STOP command and finished_signal
+            follows once the device acknowledges it, or after STOP_ACK_TIMEOUT_MS.
+
+        """
+
+        self.engine.stop_batch([self])
+
+    def cancel(self):
+        """
+            Ends the test without sending anything to the device. Returns immediately; finished_signal follows.
+
+        """
+
+        self.engine.cancel_batch([self])
+
+    def clear_data(self):
+        """
+            Clears all collected test data for the device
+
+        """
+
+        self.collected_data.clear()
+
+
+class ShardPool:
+    """
+        Runs device tests in several processes ("shards"), so receiving and parsing the streams
+        of many devices is spread over the CPU cores instead of sharing one interpreter.
+
+        Each shard runs a ReceiveEngine for the tests assigned to it and writes their samples to
+        one SharedSampleRing per device, which the GUI process reads without copying. Only small
+        control messages and events travel over the pipes: commands to the shards, and per block
+        the number of samples written, the record formats and any text messages. A listener
+        thread applies the events to the ShardedWorkers, whose signals reach the GUI as usual.
+
+        New tests go to the shard running the fewest tests. The processes are spawned on the
+        first submit.
+
+        :attribute size (int) Number of shard processes.
+
+        :attribute samples (int) Number of samples each device's ring shows, see SharedSampleRing.
+
+        :attribute processes (list of multiprocessing.Process) Shard processes, once started.
+
+        :attribute connections (list of multiprocessing.connection.Connection) Pipe to each shard.
+
+        :attribute load (list of int) Number of running tests of each shard.
+
+        :attribute workers (dict of str -> ShardedWorker) Running tests, by serial.
+
+        :attribute rings (dict of str -> SharedSampleRing) Ring of each device, kept for its next test.
+
+        :attribute ready (threading.Event) Set once every shard process has started up.
+    """
+
+    def __init__(self, size, samples=None):
+        self.size = max(1, size)
+        self.samples = samples or constants.SHARD_RING_SAMPLES
+        self.processes = []
+        self.connections = []
+        self.load = [0] * self.size
+        self.workers = {}
+        self.rings = {}
+        self.lock = threading.Lock()
+        self.thread = None
+        self.ready = threading.Event()
+
+    def ring(self, serial):
+        """
+            Returns the shared ring of a device, creating it on first use.
+
+            :param serial (str) Serial number of the device.
+
+        """
+
+        ring = self.rings.get(serial)
+        if ring is None:
+            ring = self.rings[serial] = SharedSampleRing(self.samples)
+        return ring
+
+    def release_ring(self, serial):
+        """
+            Frees the shared ring of a device that is no longer tested, e.g. removed from the
+            running tests. Its test must have ended.
+
+            :param serial (str) Serial number of the device.
+
+        """
+
+        ring = self.rings.pop(serial, None)
+        if ring is not None:
+            ring.close()
+
+    def start(self):
+        """
+            Spawns the shard processes and the listener thread, if they are not running.
+
+        """
+
+        if self.processes:
+            return
+        # spawned rather than forked: forking a process that runs Qt and receive threads is unsafe
+        context = multiprocessing.get_context("spawn")
+        settings = {name: value for name, value in vars(constants).items() if name.isupper()}
+        for i in range(self.size):
+            conn, child = context.Pipe()
+            process = context.Process(target=run_shard, args=(child, settings), name=f"shard-{i}", daemon=True)
+            process.start()
+            child.close()
+            self.processes.append(process)
+            self.connections.append(conn)
+        self.thread = threading.Thread(target=self.listen, name="ShardPool", daemon=True)
+        self.thread.start()
+
+    def submit_batch(self, workers):
+        """
+            Assigns tests to the shards and has them send the START commands.
+
+            :param workers (list of ShardedWorker) Workers whose tests should be started.
+
+        """
+
+        self.start()
+        batches = {}
+        with self.lock:
+            for worker in workers:
+                shard = self.load.index(min(self.load))
+                self.load[shard] += 1
+                worker.shard = shard
+                worker.engine = self
+                worker.running = True
+                self.workers[worker.device.serial] = worker
+                batches.setdefault(shard, []).append(worker.test())
+        for shard, tests in batches.items():
+            self.send(shard, "start", tests)
+
+    def submit(self, worker):
+        """
+            Assigns a test to a shard and has it send the START command.
+
+            :param worker (ShardedWorker) Worker whose test should be started.
+
+        """
+
+        self.submit_batch([worker])
+
+    def stop_batch(self, workers):
+        """
+            Has the shards send STOP commands for several running tests. Each test ends when its
+            device acknowledges the STOP, or after STOP_ACK_TIMEOUT_MS.
+
+            :param workers (list of ShardedWorker) Workers whose tests should be stopped.
+
+        """
+
+        now = time.perf_counter()
+        for worker in workers:
+            if worker.stop_sent is None:
+                worker.stop_sent = now
+        self.send_batch("stop", workers)
+
+    def cancel_batch(self, workers):
+        """
+            Has the shards end several tests without sending anything to the devices.
+
+            :param workers (list of ShardedWorker) Workers whose tests should be ended.
+
+        """
+
+        self.send_batch("cancel", workers)
+
+    def send_batch(self, command, workers):
+        """
+            Sends a command for several tests, one message per shard.
+
+            :param command (str) "stop" or "cancel".
+            :param workers (list of ShardedWorker) Workers the command is for.
+
+        """
+
+        batches = {}
+        for worker in workers:
+            if worker.running and worker.shard is not None:
+                batches.setdefault(worker.shard, []).append(worker.device.serial)
+        for shard, serials in batches.items():
+            self.send(shard, command, serials)
+
+    def send(self, shard, command, argument):
+        """
+            Sends a command to a shard process. Commands to a shard that has exited are dropped.
+
+        """
+
+        with self.lock:
+            try:
+                self.connections[shard].send((command, argument))
+            except (OSError, ValueError):
+                pass
+
+    def release(self, worker):
+        """
+            Forgets a test that has ended.
+
+            :param worker (ShardedWorker) Worker whose test ended.
+
+        """
+
+        with self.lock:
+            if self.workers.get(worker.device.serial) is worker:
+                del self.workers[worker.device.serial]
+                self.load[worker.shard] -= 1
+
+    def listen(self):
+        """
+            Listener thread: applies the events of every shard to their workers. The tests of a
+            shard that exits unexpectedly are ended with an error.
+
+        """
+
+        open_connections = list(self.connections)
+        starting = len(open_connections)
+        while open_connections:
+            for conn in wait(open_connections):
+                try:
+                    event = conn.recv()
+                except (EOFError, OSError):
+                    open_connections.remove(conn)
+                    shard = self.connections.index(conn)
+                    for worker in [w for w in list(self.workers.values()) if w.shard == shard]:
+                        worker.error = worker.error or "shard process exited"
+                        worker.finish_test()
+                    continue
+                if event[0] == "ready":
+                    starting -= 1
+                    if not starting:
+                        self.ready.set()
+                    continue
+                worker = self.workers.get(event[1])
+                if worker is not None:
+                    worker.handle_event(event)
+
+    def shutdown(self):
+        """
+            Ends the running tests, stops the shard processes and frees the rings.
+
+        """
+
+        for shard in range(len(self.connections)):
+            self.send(shard, "exit", None)
+        for process in self.processes:
+            process.join(constants.STOP_ACK_TIMEOUT_MS / 1000 + 1)
+            if process.is_alive():
+                process.terminate()
+        if self.thread is not None:
+            self.thread.join(1)
+            self.thread = None
+        for conn in self.connections:
+            conn.close()
+        self.processes = []
+        self.connections = []
+        for ring in self.rings.values():
+            ring.close()
+        self.rings = {}
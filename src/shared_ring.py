@@ -0,0 +1,153 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from sample_store import SampleStore
+
+# bytes before the columns: the number of samples written, padded to a cache line
+_HEADER = 64
+
+# segments still mapped by views in use when their ring was closed; closed once the views are gone
+_detached = []
+
+class SharedSampleRing(SampleStore):
+    """
+        Ring buffer of one device's samples in shared memory, written by the shard process that
+        receives the device's stream and read without copying by the GUI process.
+
+        Like a SampleStore with a capacity, every sample is written twice, so the newest samples
+        are always one contiguous slice of the columns and are handed out as views. The ring has
+        room for twice the samples the reader shows: the writer can get up to `samples` samples
+        ahead of the reader before it overwrites one the reader may still be plotting. The number
+        of samples written is kept in the segment too, so a reader can tell whether it was lapped.
+
+        The writing process adds samples with write(). In the reading process append() and
+        extend() copy nothing, since the samples are already in the ring; the reader shows new
+        samples once advance() is called for them, when their block has arrived.
+
+        :attribute samples (int) Maximum number of samples shown by the reader.
+
+        :attribute name (str) Name of the shared memory segment, used to attach to the ring from another process.
+
+        :attribute total (int) Number of samples written (writer) or made visible (reader) since the ring was created.
+    """
+
+    def __init__(self, samples, name=None, total=0):
+        self.samples = samples
+        self.capacity = 2 * samples    # slots of the ring; each column holds them twice
+        size = _HEADER + 3 * 2 * self.capacity * 8
+        self.shm = shared_memory.SharedMemory(name, create=name is None, size=size if name is None else 0)
+        self.name = self.shm.name
+        self.owner = name is None
+
+        buf = self.shm.buf
+        n = 2 * self.capacity
+        # frombuffer keeps the segment exported while any view of it exists, so it cannot be unmapped under a plot
+        self._written = np.frombuffer(buf, dtype=np.int64, count=1)
+        self._time = np.frombuffer(buf, dtype=np.int64, count=n, offset=_HEADER)
+        self._mv = np.frombuffer(buf, dtype=np.float64, count=n, offset=_HEADER + 8 * n)
+        self._ma = np.frombuffer(buf, dtype=np.float64, count=n, offset=_HEADER + 16 * n)
+        self.total = total
+        self._base = total
+
+    def __len__(self):
+        return min(self.total - self._base, self.samples)
+
+    def clear(self):
+        """
+            Hides every sample written so far. The shared memory is kept for the next test.
+
+        """
+
+        self._base = self.total
+
+    def _window(self):
+        # total is advanced by another thread, so it is read once for a consistent window
+        total = self.total
+        length = min(total - self._base, self.samples)
+        start = (total - length) % self.capacity
+        return slice(start, start + length)
+
+    def append(self, time_ms, mv, ma):
+        pass    # already written by the shard process, shown by advance()
+
+    def extend(self, time_ms, mv, ma):
+        pass    # already written by the shard process, shown by advance()
+
+    def write(self, time_ms, mv, ma):
+        """
+            Writes a batch of samples into the ring, in the writing process.
+
+            :param time_ms (sequence of int) Times in milliseconds.
+            :param mv (sequence of float) Voltages in millivolts.
+            :param ma (sequence of float) Currents in milliamps.
+
+        """
+
+        SampleStore.extend(self, time_ms, mv, ma)
+        self._written[0] = self.total
+
+    def advance(self, total):
+        """
+            Makes the samples written up to `total` visible, in the reading process.
+
+            :param total (int) Number of samples the writer reported written.
+
+        """
+
+        self.total = total
+
+    def views(self, start, stop):
+        """
+            Returns zero-copy views of the (time_ms, mv, ma) columns of samples start to stop,
+            counted from the first sample written. They are only valid until the writer wraps
+            around to them, so they must be used or copied at once.
+
+            :param start (int) Index of the first sample.
+            :param stop (int) Index after the last sample.
+
+        """
+
+        first = start % self.capacity
+        window = slice(first, first + stop - start)
+        return self._time[window], self._mv[window], self._ma[window]
+
+    def lapped(self, start):
+        """
+            Checks, after reading samples from `start` on, whether the writer has overwritten any
+            of them in the meantime.
+
+            :param start (int) Index of the first sample read.
+
+        """
+
+        return int(self._written[0]) - start > self.capacity
+
+    def nbytes(self):
+        """
+            Returns the size of the shared memory segment.
+
+        """
+
+        return self.shm.size
+
+    def close(self):
+        """
+            Detaches from the shared memory; the process that created it also removes it.
+            Returns False if views of the ring are still in use, in which case the memory is
+            released when they are gone.
+
+        """
+
+        if self.owner:
+            self.owner = False
+            self.shm.unlink()
+        self._written = self._time = self._mv = self._ma = None
+        _detached.append(self.shm)
+        for shm in list(_detached):
+            try:
+                shm.close()
+                _detached.remove(shm)
+            except BufferError:
+                pass
+        return self.shm not in _detached
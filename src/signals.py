@@ -0,0 +1,54 @@
+"""
+    Signals of the test workers, which the GUI and the headless runner both connect to.
+
+    With PyQt5 installed these are Qt's QObject, pyqtSignal and DirectConnection, so the GUI gets
+    queued delivery to its thread. Without it, e.g. on a server that only runs headless_runner.py,
+    plain Python stand-ins are used that call every connected slot directly from the emitting
+    thread, which is what the headless runner asks for with DirectConnection anyway.
+
+"""
+
+try:
+    from PyQt5.QtCore import QObject, pyqtSignal, Qt
+    DirectConnection = Qt.DirectConnection
+except ImportError:
+    DirectConnection = None
+
+    class _BoundSignal:
+        """
+            Signal of one object: the slots connected to it, called in order by emit().
+
+        """
+
+        def __init__(self):
+            self.slots = []
+
+        def connect(self, slot, type=None):
+            self.slots.append(slot)
+
+        def emit(self, *args):
+            for slot in self.slots:
+                slot(*args)
+
+    class pyqtSignal:
+        """
+            Declares a signal on a class, like PyQt5's pyqtSignal; each object gets its own.
+
+        """
+
+        def __init__(self, *types):
+            self.name = None
+
+        def __set_name__(self, owner, name):
+            self.name = name
+
+        def __get__(self, obj, owner=None):
+            if obj is None:
+                return self
+            # kept in the object's dict, which later lookups find before this descriptor
+            signal = obj.__dict__[self.name] = _BoundSignal()
+            return signal
+
+    class QObject:
+        def __init__(self, parent=None):
+            pass
@@ -0,0 +1,151 @@
+import selectors
+import socket
+import threading
+
+import constants
+
+class SocketPool:
+    """
+        A few UDP sockets shared by every device test, with datagrams demultiplexed by device address.
+
+        Each device is assigned one socket of the pool, and every command for the device (START,
+        STOP) is sent from it. A device streams its status messages to the address of the last
+        command it received, so control and data stay on one flow and a STOP no longer redirects
+        the stream away from the receiving socket.
+
+        Incoming datagrams are routed by source (ip, port) to the sink registered for that device.
+        A ReceiveEngine reads the pool sockets on its own thread and uses the workers as sinks.
+        Otherwise start() runs a reader thread that puts (payload, address) tuples into the
+        per-device queues registered as sinks.
+
+        :attribute sockets (list of socket.socket) Sockets of the pool.
+
+        :attribute thread (threading.Thread or None) Reader thread, if started.
+    """
+
+    def __init__(self, size=1):
+        self.sockets = []
+        for _ in range(max(1, size)):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setblocking(False)
+            # one socket receives the streams of many devices, so give it room for bursts
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+            self.sockets.append(sock)
+        self.routes = {}
+        self.endpoints = {}
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def endpoint(self, address):
+        """
+            Returns the socket a device is assigned to, assigning one on first use.
+
+            :param address (tuple of (str, int)) Device address.
+
+        """
+
+        sock = self.endpoints.get(address)
+        if sock is None:
+            with self.lock:
+                sock = self.endpoints.setdefault(address, self.sockets[len(self.endpoints) % len(self.sockets)])
+        return sock
+
+    def register(self, address, sink):
+        """
+            Routes the datagrams of a device to a sink, replacing any previous sink.
+
+            :param address (tuple of (str, int)) Device address.
+            :param sink (object) Receiver of the datagrams: a queue when the reader thread is used.
+
+        """
+
+        self.endpoint(address)
+        self.routes[address] = sink
+
+    def unregister(self, address, sink):
+        """
+            Stops routing the datagrams of a device to a sink. Does nothing if another sink has
+            been registered for the device since.
+
+            :param address (tuple of (str, int)) Device address.
+            :param sink (object) Sink passed to register.
+
+        """
+
+        with self.lock:
+            if self.routes.get(address) is sink:
+                del self.routes[address]
+
+    def sink(self, address):
+        """
+            Returns the sink registered for a device address, or None.
+
+            :param address (tuple of (str, int)) Source address of a datagram.
+
+        """
+
+        return self.routes.get(address)
+
+    def send(self, address, message):
+        """
+            Sends a command to a device from its assigned socket.
+
+            :param address (tuple of (str, int)) Device address.
+            :param message (bytes) Command datagram.
+
+        """
+
+        self.endpoint(address).sendto(message, address)
+
+    def start(self):
+        """
+            Starts the reader thread that delivers datagrams to queue sinks.
+
+        """
+
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="SocketPool", daemon=True)
+                self.thread.start()
+
+    def _run(self):
+        """
+            Reader thread loop: receives from every pool socket and queues each datagram for its device.
+
+        """
+
+        selector = selectors.DefaultSelector()
+        for sock in self.sockets:
+            selector.register(sock, selectors.EVENT_READ)
+        buffer = bytearray(constants.BUFFER_SIZE)
+        view = memoryview(buffer)
+
+        while True:
+            for key, _ in selector.select():
+                while True:
+                    try:
+                        nbytes, addr = key.fileobj.recvfrom_into(buffer)
+                    except (BlockingIOError, InterruptedError):
+                        break
+                    except OSError:
+                        break
+                    sink = self.routes.get(addr)
+                    if sink is not None:
+                        sink.put((bytes(view[:nbytes]), addr))
+
+
+_default_pool = None
+_default_lock = threading.Lock()
+
+def default_pool():
+    """
+        Returns the process-wide pool used by workers running in their own thread, starting it on first use.
+
+    """
+
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = SocketPool(constants.SOCKET_POOL_SIZE)
+            _default_pool.start()
+    return _default_pool
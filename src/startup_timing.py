@@ -0,0 +1,74 @@
+import os
+import sys
+import time
+
+def process_start():
+    """
+        Returns the time.perf_counter() value at which this process started, so that startup
+        milestones include the interpreter start-up and the imports. Falls back to the time this
+        module was imported where the process start time is not available.
+
+    """
+
+    now = time.perf_counter()
+    try:
+        with open("/proc/self/stat") as f:
+            # the fields after the executable name, which may itself contain spaces
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        started = int(fields[19]) / os.sysconf("SC_CLK_TCK")
+        return now - max(0.0, uptime - started)
+    except (OSError, ValueError, IndexError):
+        return now
+
+
+class StartupTimer:
+    """
+        Records how long the application took to reach each startup milestone, e.g. imports done,
+        first paint of the window or first discovery result, and reports them against a budget.
+
+        :attribute start (float) time.perf_counter() value the milestones are measured from.
+
+        :attribute marks (dict of str -> float) Milliseconds from start to each milestone reached, in order.
+
+        :attribute budget (dict of str -> float) Maximum milliseconds allowed per milestone; a milestone
+        reached later is reported with a warning.
+
+        :attribute report (bool) Whether milestones, and those over their budget, are printed as they are reached.
+    """
+
+    def __init__(self, start=None, budget=None, report=True):
+        self.start = process_start() if start is None else start
+        self.marks = {}
+        self.budget = dict(budget or {})
+        self.report = report
+
+    def mark(self, name):
+        """
+            Records a milestone the first time it is reached; later calls are ignored.
+
+            :param name (str) Name of the milestone.
+
+        """
+
+        if name in self.marks:
+            return
+        elapsed = 1000 * (time.perf_counter() - self.start)
+        self.marks[name] = elapsed
+        if not self.report:
+            return
+
+        limit = self.budget.get(name)
+        if limit is not None and elapsed > limit:
+            print(f"⚠️ Startup: {name} after {elapsed:.0f} ms, over its {limit:.0f} ms budget", file=sys.stderr)
+        else:
+            print(f"Startup: {name} after {elapsed:.0f} ms", file=sys.stderr)
+
+    def to_dict(self):
+        """
+            Returns the milestones reached so far as a JSON-serializable dict of milliseconds.
+
+        """
+
+        return {name: round(ms, 1) for name, ms in self.marks.items()}
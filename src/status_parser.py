@@ -0,0 +1,99 @@
+import re
+
+# STATUS_FORMAT of device_sim/device.c: "STATUS;TIME=%.0lf;MV=%.1lf;MA=%.1lf;"
+_SAMPLE_MATCH = re.compile(rb"STATUS;TIME=(-?\d+);MV=(-?\d+(?:\.(\d*))?);MA=(-?\d+(?:\.(\d*))?);").match
+
+# The messages format_record reproduces exactly: the whole datagram is the STATUS message, numbers
+# have no leading zeros and at most 15 significant digits, so they survive the round trip through a float
+_RECORD_NUMBER = rb"(-?(?:0|[1-9]\d{0,7})(?:\.(\d{1,7}))?)"
+_RECORD_MATCH = re.compile(rb"STATUS;TIME=(0|-?[1-9]\d{0,17});MV=" + _RECORD_NUMBER + rb";MA=" + _RECORD_NUMBER + rb";").fullmatch
+
+# printf template of every record format: format 1 + (MV decimals << 3) + MA decimals
+RECORD_TEMPLATES = [None] + [f"STATUS;TIME=%d;MV=%.{fmt >> 3}f;MA=%.{fmt & 7}f;" for fmt in range(64)]
+
+IDLE_MESSAGE = b"STATUS;STATE=IDLE;"
+
+def parse_sample(data):
+    """
+        Parses a data point from a raw STATUS datagram in the format sent by the device.
+
+        The numbers are converted straight from the matched bytes, without decoding the
+        datagram or splitting it into fields. Messages in any other format return None and
+        should be handed to parse_fields.
+
+        :param data (bytes-like) Raw datagram payload, e.g. a memoryview of a receive buffer.
+
+        :return (tuple of (int, float, float) or None) The (time in ms, mV, mA) values, or None if the format did not match.
+    """
+
+    match = _SAMPLE_MATCH(data)
+    if match is None:
+        return None
+    time_ms, mv, _, ma, _ = match.groups()
+    return int(time_ms), float(mv), float(ma)
+
+def parse_record(data):
+    """
+        Parses a data point from a raw STATUS datagram like parse_sample, and also works out
+        whether format_record can reproduce the message exactly from the parsed values, so it
+        can be logged as a compact record instead of as text.
+
+        :param data (bytes-like) Raw datagram payload.
+
+        :return (tuple of (int, float, float, int) or None) The (time in ms, mV, mA, record format) values,
+        with record format 0 when the message must be kept as text, or None if the format did not match.
+    """
+
+    match = _RECORD_MATCH(data)
+    if match is None:
+        sample = parse_sample(data)
+        return sample + (0,) if sample is not None else None
+    time_ms, mv, mv_decimals, ma, ma_decimals = match.groups()
+    fmt = 1 + (len(mv_decimals or b"") << 3) + len(ma_decimals or b"")
+    return int(time_ms), float(mv), float(ma), fmt
+
+def format_record(time_ms, mv, ma, fmt):
+    """
+        Renders a data point logged as a compact record back into its STATUS message.
+
+        :param time_ms (int) Time in milliseconds.
+        :param mv (float) Voltage in millivolts.
+        :param ma (float) Current in milliamps.
+        :param fmt (int) Nonzero record format returned by parse_record, which holds the number of decimals of MV and MA.
+
+        :return (str) The STATUS message as the device sent it.
+    """
+
+    return RECORD_TEMPLATES[fmt] % (time_ms, mv, ma)
+
+def parse_fields(message):
+    """
+        Generic parser for STATUS messages, accepting the TIME, MV and MA fields in any order
+        and in any numeric format.
+
+        :param message (str) Decoded status message.
+
+        :return (tuple of (int, float, float) or None) The (time in ms, mV, mA) values, or None if a field is
+        missing or not a number.
+    """
+
+    if not message.startswith("STATUS;"):
+        return None
+
+    time_ms = None
+    mv = None
+    ma = None
+    try:
+        for part in message.split(';'):
+            if part.startswith("TIME="):
+                time_ms = int(part.split('=')[1])
+            elif part.startswith("MV="):
+                mv = float(part.split('=')[1])
+            elif part.startswith("MA="):
+                ma = float(part.split('=')[1])
+    except (ValueError, IndexError):
+        return None    # a malformed message is logged, but carries no data point
+
+    if time_ms is None or mv is None or ma is None:
+        return None
+    return time_ms, mv, ma
@@ -0,0 +1,117 @@
+class StreamStats:
+    """
+        Health statistics of one device's sample stream, updated in O(1) per sample.
+
+        Missed samples are detected from the device's TIME field: samples are rate_ms apart
+        from TIME=rate_ms on, so the newest TIME tells how many should have arrived so far. The
+        count is recomputed from the totals rather than summed per gap, so a sample that arrives
+        late is no longer counted as missed and rounding errors do not add up.
+        Jitter is the RFC 3550 interarrival jitter, a running average of how much the spacing
+        between arrivals differs from the spacing between the TIME values, so it measures
+        delay variation added by the network and the receiving host rather than the rate.
+
+        :attribute rate_ms (int) Requested status rate in milliseconds.
+
+        :attribute samples (int) Number of samples received.
+
+        :attribute missed (int) Number of samples detected as lost.
+
+        :attribute out_of_order (int) Number of samples whose TIME did not increase.
+
+        :attribute jitter_ms (float) Interarrival jitter in milliseconds.
+    """
+
+    def __init__(self, rate_ms):
+        self.rate_ms = rate_ms
+        self.samples = 0
+        self.missed = 0
+        self.out_of_order = 0
+        self.jitter_ms = 0.0
+        self.first_arrival = None
+        self.last_arrival = None
+        self.last_time_ms = None    # newest TIME received; the first sample is expected at TIME=rate_ms
+
+    def add(self, time_ms, arrival):
+        """
+            Updates the statistics with one received sample.
+
+            :param time_ms (int) TIME value of the sample, in milliseconds.
+            :param arrival (float) time.perf_counter() value when the sample was received.
+
+        """
+
+        if self.last_time_ms is None:
+            self.last_time_ms = time_ms
+        else:
+            step = time_ms - self.last_time_ms
+            if step <= 0:
+                self.out_of_order += 1
+            else:
+                deviation = (arrival - self.last_arrival) * 1000 - step
+                self.jitter_ms += (abs(deviation) - self.jitter_ms) / 16
+                self.last_time_ms = time_ms
+
+        if self.first_arrival is None:
+            self.first_arrival = arrival
+        self.last_arrival = arrival
+        self.samples += 1
+        if self.rate_ms:
+            self.missed = max(0, round(self.last_time_ms / self.rate_ms) - self.samples)
+
+    def finish(self, expected_samples):
+        """
+            Counts the samples lost at the end of a test that ran to completion, which no
+            later sample reveals as a gap.
+
+            :param expected_samples (int) Number of samples the whole test should have produced.
+
+        """
+
+        self.missed = max(self.missed, expected_samples - self.samples)
+
+    def achieved_rate(self):
+        """
+            Returns the measured number of samples per second, or None before two samples arrived.
+
+        """
+
+        if self.samples < 2 or self.last_arrival <= self.first_arrival:
+            return None
+        return (self.samples - 1) / (self.last_arrival - self.first_arrival)
+
+    def loss_ratio(self):
+        """
+            Returns the fraction of samples lost, between 0 and 1.
+
+        """
+
+        total = self.samples + self.missed
+        return self.missed / total if total else 0.0
+
+    def summary(self):
+        """
+            Returns a one-line human-readable summary, e.g. for the log.
+
+        """
+
+        rate = self.achieved_rate()
+        rate_text = f"{rate:.1f} samples/s" if rate is not None else "- samples/s"
+        expected = 1000 / self.rate_ms if self.rate_ms else 0
+        return (f"{rate_text} (requested {expected:.1f}), jitter {self.jitter_ms:.2f} ms, "
+                f"{self.missed} missed ({100 * self.loss_ratio():.2f}%), {self.out_of_order} out of order")
+
+    def to_dict(self):
+        """
+            Returns the statistics as a JSON-serializable dict.
+
+        """
+
+        rate = self.achieved_rate()
+        return {
+            "rate_requested": 1000 / self.rate_ms if self.rate_ms else None,
+            "rate_achieved": round(rate, 3) if rate is not None else None,
+            "jitter_ms": round(self.jitter_ms, 3),
+            "missed": self.missed,
+            "loss_ratio": round(self.loss_ratio(), 6),
+            "out_of_order": self.out_of_order,
+        }
@@ -0,0 +1,220 @@
+import numpy as np
+
+import constants
+
+def limits_for(model):
+    """
+        Returns the pass/fail limits of a device model, see constants.TEST_LIMITS. Models without
+        their own entry use the "default" entry; keys missing from a model's entry are taken from it too.
+
+        :param model (str) Model of the device.
+
+    """
+
+    limits = dict(constants.TEST_LIMITS.get("default", {}))
+    if model != "default":
+        limits.update(constants.TEST_LIMITS.get(model, {}))
+    return limits
+
+
+class ChannelStats:
+    """
+        Summary statistics of one channel (mV or mA) of a finished test.
+
+        :attribute min (float) Lowest value.
+
+        :attribute max (float) Highest value.
+
+        :attribute mean (float) Mean value.
+
+        :attribute std (float) Standard deviation.
+
+        :attribute drift (float) Slope of the least-squares line through the samples, in units per second.
+
+        :attribute out_count (int) Number of samples outside the channel's limits.
+
+        :attribute out_events (int) Number of separate excursions outside the limits.
+
+        :attribute out_ms (float) Total time spent outside the limits, in milliseconds.
+    """
+
+    def __init__(self, time_ms, centred_t, values, low=None, high=None):
+        self.min = float(values.min())
+        self.max = float(values.max())
+        self.mean = float(values.mean())
+
+        # the deviations from the mean give both the standard deviation and the least-squares
+        # slope; the times are centred too, which keeps the sums well conditioned
+        deviation = values - self.mean
+        self.std = float(np.sqrt(np.dot(deviation, deviation) / len(values)))
+        denominator = float(np.dot(centred_t, centred_t))
+        self.drift = 1000 * float(np.dot(centred_t, deviation)) / denominator if denominator else 0.0
+
+        if low is None and high is None:
+            self.out_count = self.out_events = 0
+            self.out_ms = 0.0
+            return
+        out = np.zeros(len(values), dtype=bool)
+        if low is not None:
+            out |= values < low
+        if high is not None:
+            out |= values > high
+        self.out_count = int(np.count_nonzero(out))
+        if not self.out_count:
+            self.out_events = 0
+            self.out_ms = 0.0
+            return
+        # an excursion starts at every out-of-limits sample whose predecessor was within the limits
+        self.out_events = int(out[0]) + int(np.count_nonzero(out[1:] & ~out[:-1]))
+        # each sample stands for the interval up to the next one
+        self.out_ms = float(np.diff(time_ms)[out[:-1]].sum())
+
+    def to_dict(self):
+        """
+            Returns the statistics as a JSON-serializable dict.
+
+        """
+
+        return {
+            "min": self.min,
+            "max": self.max,
+            "mean": round(self.mean, 3),
+            "std": round(self.std, 3),
+            "drift_per_s": round(self.drift, 6),
+            "out_count": self.out_count,
+            "out_events": self.out_events,
+            "out_ms": self.out_ms,
+        }
+
+
+class RunAnalysis:
+    """
+        End-of-test analysis of a device's samples against the pass/fail limits of its model.
+        Every statistic is computed with whole-array NumPy operations, so a run of millions of
+        samples is evaluated in milliseconds.
+
+        :attribute samples (int) Number of samples analysed.
+
+        :attribute mv (ChannelStats or None) Voltage statistics, None without samples.
+
+        :attribute ma (ChannelStats or None) Current statistics, None without samples.
+
+        :attribute settle_ms (float or None) Time from the first sample until the voltage stays within
+        settle_band_mv of its final value, None if it never settles or no band is configured.
+
+        :attribute failures (list of str) Limits the run failed, empty if it passed.
+
+        :attribute partial (bool) Whether only the newest samples of the run were analysed.
+    """
+
+    def __init__(self, store, limits, partial=False):
+        self.samples = len(store)
+        self.partial = partial
+        self.mv = self.ma = None
+        self.settle_ms = None
+        self.failures = []
+
+        if not self.samples:
+            self.failures.append("no samples")
+            return
+
+        time_ms, mv_vals, ma_vals = store.arrays()
+        centred_t = time_ms - time_ms.mean()    # shared by both channels' drift
+        mv_low, mv_high = limits.get("mv") or (None, None)
+        ma_low, ma_high = limits.get("ma") or (None, None)
+        self.mv = ChannelStats(time_ms, centred_t, mv_vals, mv_low, mv_high)
+        self.ma = ChannelStats(time_ms, centred_t, ma_vals, ma_low, ma_high)
+
+        band = limits.get("settle_band_mv")
+        if band is not None:
+            # the final value is the median of the last tenth of the run
+            final = float(np.median(mv_vals[-max(1, self.samples // 10):]))
+            outside = np.abs(mv_vals - final) > band
+            if not outside.any():
+                self.settle_ms = 0.0
+            elif not outside[-1]:
+                last_out = self.samples - 1 - int(np.argmax(outside[::-1]))
+                self.settle_ms = float(time_ms[last_out + 1] - time_ms[0])
+
+        self.check(limits)
+
+    def check(self, limits):
+        """
+            Compares the statistics with the limits and records every limit the run fails.
+
+            :param limits (dict) Limits of the device's model, see constants.TEST_LIMITS.
+
+        """
+
+        allowed_ms = limits.get("max_out_of_limits_ms")
+        for name, stats in (("mV", self.mv), ("mA", self.ma)):
+            if stats.out_count and (not allowed_ms or stats.out_ms > allowed_ms):
+                self.failures.append(f"{name} out of limits {stats.out_events}x for {stats.out_ms:.0f} ms")
+
+        for name, stats, key in (("mV", self.mv, "max_mv_drift"), ("mA", self.ma, "max_ma_drift")):
+            max_drift = limits.get(key)
+            if max_drift is not None and abs(stats.drift) > max_drift:
+                self.failures.append(f"{name} drift {stats.drift:+.3f}/s exceeds {max_drift}/s")
+
+        max_settle = limits.get("max_settle_ms")
+        if max_settle is not None and limits.get("settle_band_mv") is not None:
+            if self.settle_ms is None:
+                self.failures.append("mV never settled")
+            elif self.settle_ms > max_settle:
+                self.failures.append(f"mV settled after {self.settle_ms:.0f} ms, limit {max_settle} ms")
+
+    def verdict(self):
+        """
+            Returns "PASS" or "FAIL", marked "(partial)" if only the newest samples were analysed.
+
+        """
+
+        verdict = "FAIL" if self.failures else "PASS"
+        return f"{verdict} (partial)" if self.partial else verdict
+
+    def summary(self):
+        """
+            Returns a one-line human-readable summary, e.g. for the log.
+
+        """
+
+        if self.mv is None:
+            return f"{self.verdict()}: no samples"
+        settle = f"{self.settle_ms:.0f} ms" if self.settle_ms is not None else "-"
+        text = (f"{self.verdict()}: {self.samples} samples, "
+                f"mV {self.mv.mean:.1f} ± {self.mv.std:.1f} [{self.mv.min:.1f}, {self.mv.max:.1f}] drift {self.mv.drift:+.3f}/s, "
+                f"mA {self.ma.mean:.1f} ± {self.ma.std:.1f} [{self.ma.min:.1f}, {self.ma.max:.1f}] drift {self.ma.drift:+.3f}/s, "
+                f"settled {settle}")
+        if self.failures:
+            text += " — " + "; ".join(self.failures)
+        return text
+
+    def to_dict(self):
+        """
+            Returns the analysis as a JSON-serializable dict.
+
+        """
+
+        return {
+            "verdict": "FAIL" if self.failures else "PASS",
+            "partial": self.partial,
+            "samples": self.samples,
+            "mv": self.mv.to_dict() if self.mv is not None else None,
+            "ma": self.ma.to_dict() if self.ma is not None else None,
+            "settle_ms": self.settle_ms,
+            "failures": list(self.failures),
+        }
+
+
+def analyze_run(store, model, partial=False):
+    """
+        Analyses a finished test's samples against the limits of the device's model.
+
+        :param store (SampleStore or ArchivedRun) Samples of the test.
+        :param model (str) Model of the device.
+        :param partial (bool, optional) Whether the store only holds the newest samples of the test.
+
+        :return (RunAnalysis) The analysis and verdict.
+    """
+
+    return RunAnalysis(store, limits_for(model), partial)
@@ -0,0 +1,79 @@
+import numpy as np
+
+from downsample import MinMaxDecimator, lttb
+
+def test_lttb_returns_every_index_when_nothing_to_drop():
+    assert list(lttb(np.arange(5), np.arange(5), 10)) == [0, 1, 2, 3, 4]
+    assert list(lttb(np.arange(5), np.arange(5), 2)) == [0, 1, 2, 3, 4]
+
+
+def test_lttb_keeps_the_ends_and_spikes():
+    x = np.arange(1000)
+    y = np.zeros(1000)
+    y[400] = 100.0
+    y[700] = -50.0
+
+    kept = lttb(x, y, 50)
+
+    assert len(kept) == 50
+    assert kept[0] == 0 and kept[-1] == 999
+    assert np.all(np.diff(kept) > 0)
+    assert 400 in kept and 700 in kept
+
+
+def test_minmax_keeps_every_bucket_extreme():
+    rng = np.random.default_rng(1)
+    values = rng.normal(size=4096)
+    decimator = MinMaxDecimator(target=64)
+
+    idx = decimator.update(values, 0)
+
+    assert np.all(np.diff(idx) >= 0)
+    assert values.argmax() in idx and values.argmin() in idx
+    assert len(idx) <= 4 * 64 + 4
+
+
+def test_minmax_incremental_matches_one_shot():
+    rng = np.random.default_rng(2)
+    values = rng.normal(size=3000)
+    one_shot = MinMaxDecimator(target=50)
+    incremental = MinMaxDecimator(target=50)
+
+    for n in range(100, 3001, 100):
+        got = incremental.update(values[:n], 0)
+    # both start with the bucket size of their first update, so compare the extremes they keep
+    expected = one_shot.update(values, 0)
+    assert values[got].max() == values[expected].max() == values.max()
+    assert values[got].min() == values[expected].min() == values.min()
+    assert len(got) <= 4 * 50 + 4
+
+
+def test_minmax_follows_a_ring_that_drops_old_samples():
+    decimator = MinMaxDecimator(target=8)
+    series = np.sin(np.arange(10000) / 50.0)
+    window = 256
+    for total in range(window, 10001, 64):
+        first = total - window
+        idx = decimator.update(series[first:total], first)
+        assert idx.min() >= first and idx.max() < total
+        assert len(idx) <= 4 * 8 + 4
+
+
+def test_minmax_resets_when_the_series_is_cleared():
+    decimator = MinMaxDecimator(target=4)
+    decimator.update(np.arange(100.0), 0)
+
+    assert len(decimator.update(np.empty(0), 0)) == 0
+    idx = decimator.update(np.array([3.0, 1.0, 2.0]), 0)
+    assert list(np.unique(idx)) == [0, 1, 2]    # one-sample buckets give their index as both min and max
+
+
+def test_set_target_drops_the_cache_only_when_it_changes():
+    decimator = MinMaxDecimator(target=4)
+    decimator.update(np.arange(100.0), 0)
+    size = decimator.bucket_size
+
+    decimator.set_target(4)
+    assert decimator.bucket_size == size
+    decimator.set_target(8)
+    assert decimator.bucket_size == 0
@@ -0,0 +1,63 @@
+import pytest
+
+import constants
+from limit_monitor import ChannelMonitor, LimitMonitor, rules_for
+
+
+def test_ewma_smooths_and_tracks_rate():
+    channel = ChannelMonitor(0.5)
+    channel.add(100.0, 0)
+    assert channel.ewma == 100.0
+    assert channel.rate == 0.0
+
+    channel.add(200.0, 10)
+    assert channel.ewma == 150.0
+    assert channel.rate == pytest.approx(5000.0)    # 50 units in 10 ms
+
+
+def test_single_spike_is_smoothed_away():
+    monitor = LimitMonitor({"mv": (0.0, 5000.0), "ewma_alpha": 0.1})
+    for t in range(0, 100, 10):
+        assert monitor.add(t, 4500.0, 0.0) is None
+    assert monitor.add(100, 9000.0, 0.0) is None
+
+
+def test_limits_raise_the_alarm_once():
+    monitor = LimitMonitor({"mv": (0.0, 5000.0), "ma": (-10.0, 10.0)})
+    assert monitor.add(0, 4500.0, 0.0) is None
+
+    alarm = monitor.add(10, 4500.0, -20.0)
+    assert alarm == "mA -20.0 below -10.0 at 10 ms"
+    assert monitor.alarm == alarm
+    assert monitor.add(20, 6000.0, -20.0) is None
+    assert monitor.alarm == alarm
+
+
+def test_rate_of_change():
+    monitor = LimitMonitor({"max_mv_rate": 100.0})
+    monitor.add(0, 1000.0, 0.0)
+    assert monitor.add(1000, 1050.0, 0.0) is None    # 50 mV/s
+    assert "changing +200.0/s" in monitor.add(1500, 1150.0, 0.0)
+
+
+def test_grace_period():
+    monitor = LimitMonitor({"mv": (0.0, 5000.0), "grace_ms": 100})
+    assert monitor.add(0, 9000.0, 0.0) is None
+    assert monitor.add(90, 9000.0, 0.0) is None
+    assert monitor.add(100, 9000.0, 0.0) == "mV 9000.0 above 5000.0 at 100 ms"
+
+
+def test_no_rules_no_checks():
+    monitor = LimitMonitor({"mv": None, "ma": (None, None), "max_ma_rate": None})
+    assert monitor.checks == []
+    assert monitor.add(0, 1e9, -1e9) is None
+
+
+def test_model_rules_override_the_default(monkeypatch):
+    monkeypatch.setattr(constants, "MONITOR_RULES", {
+        "default": {"grace_ms": 500, "ewma_alpha": 0.2},
+        "M002": {"ewma_alpha": 0.5, "mv": (0.0, 1.0)},
+    })
+
+    assert rules_for("M001") == {"grace_ms": 500, "ewma_alpha": 0.2}
+    assert rules_for("M002") == {"grace_ms": 500, "ewma_alpha": 0.5, "mv": (0.0, 1.0)}
@@ -0,0 +1,115 @@
+import status_parser
+from device_worker import SampleBlock
+from log_buffer import LogBuffer
+
+LINES = [
+    "▶️ Start Test: 2s @ 5ms",
+    "TEST;RESULT=STARTED;",
+    "STATUS;TIME=5;MV=4500.0;MA=100.0;",
+    "STATUS;TIME=10;MV=4493.25;MA=-7.5;",
+    "STATUS;TIME=15;MV=4500;MA=100.0;",      # no decimals, still a record
+    "STATUS;TIME=20;MV=04500.0;MA=100.0;",   # leading zero, kept as text
+    "STATUS;STATE=IDLE;",
+]
+
+def block_of(lines):
+    """
+        Builds the SampleBlock a batching DeviceWorker would emit for these messages.
+
+    """
+
+    block = SampleBlock()
+    for line in lines:
+        data = line.encode('latin-1')
+        sample = status_parser.parse_record(data)
+        fmt = sample[3] if sample is not None else 0
+        if not fmt:
+            block.text[len(block.log_formats)] = line
+        block.log_formats.append(fmt)
+        block.log_samples.append(len(block.time_ms))
+        if sample is not None:
+            block.time_ms.append(sample[0])
+            block.mv.append(sample[1])
+            block.ma.append(sample[2])
+    return block
+
+
+def test_text_lines():
+    buffer = LogBuffer()
+    buffer.extend(LINES)
+
+    assert len(buffer) == len(LINES)
+    assert list(buffer) == LINES
+    assert buffer[-1] == LINES[-1]
+    assert buffer[2:4] == LINES[2:4]
+
+
+def test_records_are_rendered_back_and_stored_without_text():
+    buffer = LogBuffer()
+    buffer.append(LINES[0])
+    for line in LINES[1:]:
+        sample = status_parser.parse_record(line.encode('latin-1'))
+        if sample is not None and sample[3]:
+            buffer.append_record(*sample)
+        else:
+            buffer.append(line)
+
+    assert list(buffer) == LINES
+    assert set(buffer._text) == {0, 1, 5, 6}
+
+
+def test_block_round_trip():
+    buffer = LogBuffer()
+    block = block_of(LINES[1:])
+
+    assert list(block.status_lines) == LINES[1:]
+    assert block.text_lines() == ["TEST;RESULT=STARTED;", "STATUS;TIME=20;MV=04500.0;MA=100.0;", "STATUS;STATE=IDLE;"]
+
+    buffer.extend_block(block)
+    assert list(buffer) == LINES[1:]
+
+
+def test_block_of_records_only_is_copied_as_columns():
+    lines = [f"STATUS;TIME={5 * i};MV={4500 + i}.5;MA=-{i}.25;" for i in range(1, 50)]
+    buffer = LogBuffer()
+    buffer.extend_block(block_of(lines))
+
+    assert list(buffer) == lines
+    assert not buffer._text
+
+
+def test_capacity_keeps_the_newest_lines():
+    buffer = LogBuffer(capacity=3)
+    buffer.extend(LINES)
+
+    assert len(buffer) == 3
+    assert buffer.first_index == len(LINES) - 3
+    assert list(buffer) == LINES[-3:]
+
+    buffer.extend_block(block_of(LINES[2:5]))
+    assert list(buffer) == LINES[2:5]
+
+
+def test_clear_and_copy():
+    buffer = LogBuffer(capacity=4)
+    buffer.extend(LINES)
+    copy = buffer.copy()
+    buffer.clear()
+
+    assert len(buffer) == 0
+    assert buffer.total == len(LINES)
+    assert list(copy) == LINES[-4:]
+
+    buffer.append("after clear")
+    assert list(buffer) == ["after clear"]
+
+
+def test_index_out_of_range():
+    buffer = LogBuffer()
+    buffer.append("only line")
+    try:
+        buffer[1]
+    except IndexError:
+        pass
+    else:
+        raise AssertionError("expected IndexError")
@@ -0,0 +1,80 @@
+import os
+
+import numpy as np
+import pytest
+
+from run_archive import ArchivedRun, RunArchive, read_header, write_run
+
+START = 1700000000.0
+
+def columns(count):
+    time_ms = np.arange(count) * 10
+    return time_ms, time_ms * 0.5, -time_ms * 0.25
+
+
+def test_write_and_read_round_trip(tmp_path):
+    path = str(tmp_path / "a.run")
+    time_ms, mv, ma = columns(1000)
+    write_run(path, "SN1", "M001", START, 10, 30, "completed", time_ms, mv, ma)
+
+    run = ArchivedRun(path)
+    assert len(run) == 1000
+    assert run.serial == "SN1"
+    assert run.start_time == START
+    assert run.info["model"] == "M001"
+    assert run.info["result"] == "completed"
+    assert (run.info["rate"], run.info["duration"]) == (10, 30)
+    assert run.mv_range() == (0.0, mv.max())
+    assert run.ma_range() == (ma.min(), 0.0)
+    for stored, expected in zip(run.arrays(), (time_ms, mv, ma)):
+        np.testing.assert_array_equal(stored, expected)
+    run.close()
+    assert not os.path.exists(path + ".partial")
+
+
+def test_empty_run(tmp_path):
+    path = str(tmp_path / "empty.run")
+    write_run(path, "SN1", "M001", START, 10, 30, "no_response", [], [], [])
+
+    run = ArchivedRun(path)
+    assert len(run) == 0
+    assert all(len(column) == 0 for column in run.arrays())
+    run.close()
+
+
+def test_mismatched_columns_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        write_run(str(tmp_path / "bad.run"), "SN1", "M001", START, 10, 30, "completed", [0, 10], [1.0], [1.0, 2.0])
+
+
+def test_foreign_and_truncated_files_are_rejected(tmp_path):
+    foreign = tmp_path / "foreign.run"
+    foreign.write_bytes(b"x" * 512)
+    with pytest.raises(ValueError):
+        read_header(str(foreign))
+
+    path = str(tmp_path / "cut.run")
+    write_run(path, "SN1", "M001", START, 10, 30, "completed", *columns(100))
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 8)
+    with pytest.raises(ValueError):
+        ArchivedRun(path)
+
+
+def test_archive_index(tmp_path):
+    archive = RunArchive(str(tmp_path))
+    archive.add("SN1", "M001", START, 10, 30, "completed", *columns(10))
+    archive.add("SN1", "M001", START, 10, 30, "stopped", *columns(20))    # same second
+    archive.add("SN2", "M002", START + 60, 10, 30, "completed", *columns(5))
+    (tmp_path / "notes.txt").write_text("not a run")
+
+    assert archive.serials() == ["SN1", "SN2"]
+    assert [info["serial"] for info in archive.runs()][0] == "SN2"
+    assert sorted(info["samples"] for info in archive.runs("SN1")) == [10, 20]
+
+    # a new archive object finds the same runs from the file headers
+    reopened = RunArchive(str(tmp_path))
+    assert len(reopened.runs()) == 3
+    run = reopened.open(reopened.runs("SN2")[0])
+    np.testing.assert_array_equal(run.time_ms, columns(5)[0])
+    run.close()
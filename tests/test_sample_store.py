@@ -0,0 +1,74 @@
+import numpy as np
+
+from sample_store import SampleStore
+
+def columns(store):
+    return [list(column) for column in store.arrays()]
+
+
+def test_unbounded_store_grows_and_keeps_every_sample():
+    store = SampleStore(initial_size=2)
+    for i in range(5):
+        store.append(i, 10.0 * i, -1.0 * i)
+    store.extend([5, 6, 7], [50.0, 60.0, 70.0], [-5.0, -6.0, -7.0])
+
+    assert len(store) == 8
+    assert store.total == 8
+    assert store.first_index == 0
+    assert store.evicted == 0
+    assert columns(store) == [list(range(8)), [10.0 * i for i in range(8)], [-1.0 * i for i in range(8)]]
+
+
+def test_ring_keeps_the_newest_samples_contiguous():
+    store = SampleStore(capacity=4)
+    for i in range(6):
+        store.append(i, float(i), float(-i))
+
+    assert len(store) == 4
+    assert store.first_index == 2
+    assert store.evicted == 2
+    assert list(store.time_ms) == [2, 3, 4, 5]
+    # the window is a view of the backing array, not a copy
+    assert store.time_ms.base is store._time
+
+
+def test_ring_extend_wraps_around():
+    store = SampleStore(capacity=4)
+    store.extend([0, 1, 2], [0.0, 1.0, 2.0], [0.0, 1.0, 2.0])
+    store.extend([3, 4, 5], [3.0, 4.0, 5.0], [3.0, 4.0, 5.0])
+
+    assert list(store.time_ms) == [2, 3, 4, 5]
+    assert list(store.mv) == [2.0, 3.0, 4.0, 5.0]
+
+
+def test_ring_extend_larger_than_capacity_keeps_the_tail():
+    store = SampleStore(capacity=3)
+    store.append(-1, 0.0, 0.0)
+    store.extend(np.arange(10), np.arange(10.0), np.arange(10.0))
+
+    assert store.total == 11
+    assert list(store.time_ms) == [7, 8, 9]
+    assert store.evicted == 8
+
+
+def test_clear_keeps_counting_and_resets_ranges():
+    store = SampleStore(capacity=4)
+    store.extend([1, 2], [5.0, 7.0], [-1.0, 3.0])
+    assert store.mv_range() == (5.0, 7.0)
+    assert store.ma_range() == (-1.0, 3.0)
+
+    store.clear()
+    assert len(store) == 0
+    assert store.total == 2
+    assert store.evicted == 0
+    assert store.mv_range() is None
+
+    store.append(3, 1.0, 1.0)
+    assert store.first_index == 2
+    assert list(store.time_ms) == [3]
+
+
+def test_empty_extend_is_a_no_op():
+    store = SampleStore()
+    store.extend([], [], [])
+    assert len(store) == 0 and store.total == 0
@@ -0,0 +1,85 @@
+import pytest
+
+from stream_stats import StreamStats
+
+def feed(stats, times, spacing_s=0.01):
+    for i, time_ms in enumerate(times):
+        stats.add(time_ms, 100.0 + i * spacing_s)
+
+
+def test_complete_stream_has_nothing_missed():
+    stats = StreamStats(10)
+    feed(stats, range(10, 1010, 10))
+    stats.finish(100)
+
+    assert stats.samples == 100
+    assert stats.missed == 0
+    assert stats.out_of_order == 0
+    assert stats.loss_ratio() == 0.0
+    assert stats.achieved_rate() == pytest.approx(100.0)
+
+
+def test_gaps_are_counted_as_missed():
+    stats = StreamStats(10)
+    feed(stats, [10, 20, 50, 60])    # 30 and 40 lost
+
+    assert stats.missed == 2
+    assert stats.loss_ratio() == pytest.approx(2 / 6)
+
+
+def test_late_sample_is_no_longer_missed():
+    stats = StreamStats(10)
+    feed(stats, [10, 20, 40, 30, 50])
+
+    assert stats.out_of_order == 1
+    assert stats.missed == 0
+
+
+def test_lost_first_sample_is_missed():
+    stats = StreamStats(10)
+    feed(stats, [20, 30])
+
+    assert stats.missed == 1
+
+
+def test_timing_jitter_does_not_add_up():
+    stats = StreamStats(10)
+    feed(stats, [10, 21, 29, 40, 51, 59, 70])
+
+    assert stats.missed == 0
+
+
+def test_finish_counts_samples_lost_at_the_end():
+    stats = StreamStats(10)
+    feed(stats, range(10, 810, 10))
+    stats.finish(100)
+
+    assert stats.missed == 20
+
+
+def test_jitter_measures_arrival_variation_only():
+    steady = StreamStats(10)
+    feed(steady, range(10, 1010, 10), spacing_s=0.010)
+    assert steady.jitter_ms == pytest.approx(0.0, abs=1e-6)
+
+    bursty = StreamStats(10)
+    for i, time_ms in enumerate(range(10, 1010, 10)):
+        bursty.add(time_ms, 100.0 + (i // 2) * 0.020)    # two samples per 20 ms burst
+    # every spacing is 10 ms off the TIME step; the RFC 3550 average converges to it
+    assert bursty.jitter_ms == pytest.approx(10.0, rel=0.01)
+
+
+def test_summary_and_dict():
+    stats = StreamStats(10)
+    feed(stats, [10, 20, 40])
+
+    assert "1 missed" in stats.summary()
+    assert stats.to_dict()["missed"] == 1
+    assert stats.to_dict()["rate_requested"] == 100.0
+
+
+def test_achieved_rate_needs_two_samples():
+    stats = StreamStats(10)
+    assert stats.achieved_rate() is None
+    stats.add(10, 1.0)
+    assert stats.achieved_rate() is None
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+import constants
+from sample_store import SampleStore
+from test_analytics import RunAnalysis, analyze_run, limits_for
+
+def store_of(time_ms, mv, ma=None):
+    store = SampleStore()
+    store.extend(time_ms, mv, ma if ma is not None else np.zeros(len(time_ms)))
+    return store
+
+
+def test_statistics_and_drift():
+    t = np.arange(0, 10000, 10)
+    mv = 4500.0 + 0.002 * t    # 2 mV per second
+    analysis = RunAnalysis(store_of(t, mv), {})
+
+    assert analysis.samples == 1000
+    assert analysis.mv.min == 4500.0
+    assert analysis.mv.mean == pytest.approx(mv.mean())
+    assert analysis.mv.std == pytest.approx(mv.std())
+    assert analysis.mv.drift == pytest.approx(2.0)
+    assert analysis.ma.drift == pytest.approx(0.0)
+    assert analysis.verdict() == "PASS"
+
+
+def test_out_of_limits_excursions():
+    t = np.arange(0, 100, 10)
+    mv = np.array([1, 1, 9, 9, 1, 1, 9, 1, 1, 1], dtype=float)
+    analysis = RunAnalysis(store_of(t, mv), {"mv": (0.0, 5.0)})
+
+    assert analysis.mv.out_count == 3
+    assert analysis.mv.out_events == 2
+    assert analysis.mv.out_ms == 30.0
+    assert analysis.verdict() == "FAIL"
+    assert "mV out of limits 2x for 30 ms" in analysis.failures[0]
+
+
+def test_time_allowed_out_of_limits():
+    t = np.arange(0, 100, 10)
+    mv = np.array([1, 9, 1, 1, 1, 1, 1, 1, 1, 1], dtype=float)
+
+    assert RunAnalysis(store_of(t, mv), {"mv": (0.0, 5.0), "max_out_of_limits_ms": 20}).verdict() == "PASS"
+    assert RunAnalysis(store_of(t, mv), {"mv": (0.0, 5.0), "max_out_of_limits_ms": 5}).verdict() == "FAIL"
+
+
+def test_drift_limit():
+    t = np.arange(0, 10000, 10)
+    analysis = RunAnalysis(store_of(t, 0.002 * t), {"max_mv_drift": 1.0})
+
+    assert analysis.verdict() == "FAIL"
+    assert "drift" in analysis.failures[0]
+
+
+def test_settling_time():
+    t = np.arange(0, 1000, 10)
+    mv = np.where(t < 300, 5000.0, 4500.0)
+    limits = {"settle_band_mv": 10.0, "max_settle_ms": 500}
+    analysis = RunAnalysis(store_of(t, mv), limits)
+
+    assert analysis.settle_ms == 300.0
+    assert analysis.verdict() == "PASS"
+    assert RunAnalysis(store_of(t, mv), dict(limits, max_settle_ms=200)).verdict() == "FAIL"
+
+
+def test_no_samples_fails():
+    analysis = RunAnalysis(SampleStore(), {})
+
+    assert analysis.verdict() == "FAIL"
+    assert analysis.summary() == "FAIL: no samples"
+
+
+def test_partial_runs_are_marked():
+    t = np.arange(0, 100, 10)
+    analysis = analyze_run(store_of(t, np.ones(10)), "default", partial=True)
+
+    assert analysis.verdict() == "PASS (partial)"
+    assert analysis.to_dict()["verdict"] == "PASS"
+    assert analysis.to_dict()["partial"] is True
+
+
+def test_model_limits_override_the_default(monkeypatch):
+    monkeypatch.setattr(constants, "TEST_LIMITS", {
+        "default": {"mv": (0.0, 10.0), "ma": (-1.0, 1.0)},
+        "M002": {"mv": (5.0, 6.0)},
+    })
+
+    assert limits_for("M001") == {"mv": (0.0, 10.0), "ma": (-1.0, 1.0)}
+    assert limits_for("M002") == {"mv": (5.0, 6.0), "ma": (-1.0, 1.0)}
+
+
+def test_default_limits_pass_every_run():
+    t = np.arange(0, 100, 10)
+    assert analyze_run(store_of(t, np.full(10, 1e6), np.full(10, -1e6)), "M001").verdict() == "PASS"